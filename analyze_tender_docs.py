@@ -1,9 +1,7 @@
 
 import os
-import json
 import time
 from dotenv import load_dotenv
-import google.generativeai as genai
 from deep_translator import GoogleTranslator
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -11,6 +9,8 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 
+from llm_providers import build_router
+
 # 1. Configuration & Setup
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -24,12 +24,11 @@ if not API_KEY:
         input_key = input("Or paste your API Key here and press Enter: ").strip()
         if input_key:
             API_KEY = input_key
-            genai.configure(api_key=API_KEY)
     except:
         pass
 
-if API_KEY:
-    genai.configure(api_key=API_KEY)
+# Same timeouts, retries and failover as the server (model from GEMINI_MODEL)
+llm = build_router("gemini")
 
 FILES_TO_PROCESS = [
     'CPP.pdf',
@@ -54,23 +53,6 @@ def extract_data_from_pdf(pdf_path):
         return None
 
     try:
-        # Uploading file to Gemini File API
-        print("  - Uploading to Gemini...")
-        sample_file = genai.upload_file(path=pdf_path, display_name=os.path.basename(pdf_path))
-        
-        # Wait for processing state
-        while sample_file.state.name == "PROCESSING":
-            time.sleep(2)
-            sample_file = genai.get_file(sample_file.name)
-            
-        if sample_file.state.name == "FAILED":
-            print("  - Gemini failed to process the file.")
-            return None
-
-        print("  - Analyzing...")
-        # Model w/ System Prompt
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
         prompt = """
         You are a Tender Analyst. Analyze this document and extract the following details into a strict JSON format.
         
@@ -92,21 +74,10 @@ def extract_data_from_pdf(pdf_path):
         Do not use code blocks. Just return the raw JSON object.
         """
 
-        response = model.generate_content([sample_file, prompt])
-        
-        # Cleanup JSON usage
-        clean_json = response.text.strip()
-        if clean_json.startswith("```json"):
-            clean_json = clean_json[7:]
-        if clean_json.endswith("```"):
-            clean_json = clean_json[:-3]
-            
-        try:
-            data = json.loads(clean_json)
-            return data
-        except json.JSONDecodeError:
-            print("  - Failed to parse JSON response.")
-            return None
+        # Upload, wait for processing and generate in one call
+        print("  - Uploading to Gemini and analyzing...")
+        # Parsed JSON; a reply that does not parse counts as a failed attempt and is retried
+        return llm.analyze_file(pdf_path, prompt, api_key=API_KEY or None)
 
     except Exception as e:
         print(f"Error extracting data from {pdf_path}: {e}")
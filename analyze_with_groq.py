@@ -2,9 +2,7 @@
 import os
 import json
 import time
-import pdfplumber
 from dotenv import load_dotenv
-from groq import Groq
 from deep_translator import GoogleTranslator
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -12,6 +10,10 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 
+from llm_providers import build_router
+from page_selection import select_context
+from pdf_extract import iter_page_texts
+
 # 1. Configuration
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -30,7 +32,9 @@ if not GROQ_API_KEY:
     print("Error: Cannot proceed without Groq API Key.")
     exit(1)
 
-client = Groq(api_key=GROQ_API_KEY)
+# Same timeouts, retries and failover as the server (model from GROQ_MODEL)
+os.environ["GROQ_API_KEY"] = GROQ_API_KEY  # GroqProvider reads it when the router builds it
+llm = build_router("groq")
 
 FILES_TO_PROCESS = [
     'CPP.pdf',
@@ -43,23 +47,15 @@ OUTPUT_DIR = "Analysis_Reports"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
-# 2. Text Extraction (Python Script via pdfplumber)
+# 2. Text Extraction (one page at a time, see pdf_extract.iter_page_texts)
 def extract_text_from_pdf(pdf_path):
     print(f"Extracting text from {os.path.basename(pdf_path)}...")
-    text_content = ""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if not pdf.pages:
-                return None
-            
-            # Limit to first 10 pages to avoid token overflow generally, or extract all and truncate later
-            # For these specific tenders, important info is usually in first 10-15 pages.
-            for i, page in enumerate(pdf.pages[:15]): 
-                text = page.extract_text()
-                if text:
-                    text_content += text + "\n"
-                    
-        return text_content
+        # Every page is read; the prompt gets the pages with the most tender-field signals
+        # (EMD, turnover, dates, eligibility, BOQ ...) that fit the budget, not just the first 15.
+        text_content, selection = select_context([text for _, text in iter_page_texts(pdf_path)])
+        print(f"Using pages {selection['analyzed_pages']} of {selection['total_pages']}")
+        return text_content or None
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return None
@@ -68,9 +64,7 @@ def extract_text_from_pdf(pdf_path):
 def analyze_with_groq(text):
     print("Analyzing text with Groq (Llama-3.3-70b)...")
     
-    # Truncate text if it's too massive (approx char count for 32k context might be around 100k chars safe)
-    # Llama 3.3 70b has 128k context, so we can be generous.
-    safe_text = text[:100000] 
+    # text comes from select_context, already within ANALYSIS_CHAR_BUDGET (Llama 3.3 70b has 128k context)
     
     system_prompt = """
     You are an expert Tender Analyst. Extract the following details from the tender document into a JSON format.
@@ -94,18 +88,7 @@ def analyze_with_groq(text):
     """
     
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Analyze this tender text:\n\n{safe_text}"}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
-        
-        result = completion.choices[0].message.content
-        return json.loads(result)
+        return llm.complete(system_prompt, f"Analyze this tender text:\n\n{text}", json_mode=True)
     except Exception as e:
         print(f"Groq API Error: {e}")
         return None
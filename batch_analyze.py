@@ -0,0 +1,272 @@
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import asyncio
+import argparse
+
+from dotenv import load_dotenv
+
+from execution import CPU_WORKERS, run_cpu, run_io, shutdown as shutdown_executors
+from page_selection import select_context
+from pdf_extract import EXTRACT_MAX_PAGES, extract_pages_parallel
+from report_pdf import generate_pdf_report
+from tender_analysis import llm, analyze_document_text, analyze_document_file
+
+# Batch analysis: a directory / glob of tenders through extract -> analyze -> render.
+# Each stage has its own worker count and the stages are joined by bounded queues, so a slow
+# LLM never lets extracted text pile up in memory. Every finished or failed file is appended
+# to a JSON-lines manifest; a rerun skips files that are done (and unchanged) and retries the rest.
+#
+#   python batch_analyze.py tenders/                    # every PDF in the directory
+#   python batch_analyze.py "tenders/**/*.pdf" --out Analysis_Reports --llm-workers 4
+
+load_dotenv()
+
+STAGES = ("extract", "analyze", "render")
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def input_root(pattern: str):
+    # Directory part before the first wildcard: tenders/**/*.pdf -> tenders
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    root = os.sep.join(parts) or "."
+    return root if os.path.isdir(root) else os.path.dirname(root) or "."
+
+
+def find_inputs(patterns):
+    """
+    {absolute path: report name}, sorted by path. The name is the path relative to the input
+    root without ".pdf" (tenders/a/bid.pdf under tenders/**/*.pdf -> a/bid), so same-named
+    files in different folders get their own reports; a name already taken gets a path hash.
+    """
+    files = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.pdf")
+        root = os.path.abspath(input_root(pattern))
+        for p in glob.glob(pattern, recursive=True):
+            path = os.path.abspath(p)
+            if path.lower().endswith(".pdf") and path not in files:
+                files[path] = os.path.splitext(os.path.relpath(path, root))[0]
+    taken = set()
+    for path in sorted(files):
+        name = files[path]
+        if name in taken:
+            name = f"{name}-{hashlib.sha1(path.encode()).hexdigest()[:8]}"
+        taken.add(name)
+        files[path] = name
+    return dict(sorted(files.items()))
+
+
+def report_paths(out_dir: str, name: str):
+    # a/bid -> out/a/Analysis_bid.pdf (+ .json); top-level files keep the old flat names
+    folder, base = os.path.split(name)
+    stem = os.path.join(out_dir, folder, f"Analysis_{base}")
+    return stem + ".pdf", stem + ".json"
+
+
+def file_stamp(path: str):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_manifest(path: str):
+    """Last record per input file."""
+    records = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                records[rec["file"]] = rec
+    return records
+
+
+def is_finished(rec, path: str, report: str):
+    # The report must be this file's own (an older flat-named run may have written another's)
+    return (rec is not None and rec.get("status") == "done"
+            and rec.get("stamp") == file_stamp(path)
+            and rec.get("report") == report and os.path.exists(report))
+
+
+class StageStats:
+    def __init__(self):
+        self.timings = {stage: [] for stage in STAGES}
+
+    def add(self, stage: str, seconds: float):
+        self.timings[stage].append(seconds)
+
+    def summary(self):
+        out = {}
+        for stage, values in self.timings.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            out[stage] = {
+                "count": len(values),
+                "total_s": round(sum(values), 2),
+                "mean_s": round(sum(values) / len(values), 3),
+                "p95_s": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+            }
+        return out
+
+
+def extract_for_batch(path: str, max_pages: int):
+    # One process-pool task per file: files run in parallel, pages within a file serially
+    # Returns (page count, prompt text from the best-scoring pages within the budget, selection)
+    pages = extract_pages_parallel(path, max_pages=max_pages, workers=1)
+    text, selection = select_context(pages)
+    return len(pages), text, selection
+
+
+def analyze_for_batch(text, path: str, api_key: str):
+    if text and len(text.strip()) > 50:
+        return analyze_document_text(text, api_key)
+    analysis, _ = analyze_document_file(path, api_key)  # scanned PDF: let the model read it
+    return analysis
+
+
+async def run_batch(files, args, api_key: str):
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST_NAME)
+    stats = StageStats()
+    counts = {"done": 0, "failed": 0}
+    manifest = open(manifest_path, "a", encoding="utf-8")
+
+    def record(item, status, stage=None, error=None):
+        counts[status] += 1
+        rec = {
+            "file": item["file"],
+            "stamp": item["stamp"],
+            "status": status,
+            "stage": stage,
+            "error": error,
+            "report": item.get("report"),
+            "pages": item.get("pages"),
+            "analyzed_pages": item.get("analyzed_pages"),
+            "timings": item["timings"],
+            "ts": time.time(),
+        }
+        manifest.write(json.dumps(rec) + "\n")
+        manifest.flush()
+        label = "OK  " if status == "done" else "FAIL"
+        print(f"[{label}] {item['name']}" + (f" ({stage}: {error})" if error else ""))
+
+    queues = {
+        "extract": asyncio.Queue(),
+        "analyze": asyncio.Queue(maxsize=args.llm_workers * 2),
+        "render": asyncio.Queue(maxsize=args.render_workers * 2),
+    }
+    next_stage = {"extract": "analyze", "analyze": "render", "render": None}
+
+    async def step(stage, item):
+        if stage == "extract":
+            item["pages"], item["text"], selection = await run_cpu(extract_for_batch, item["file"], args.max_pages)
+            item["analyzed_pages"] = selection["analyzed_pages"]
+        elif stage == "analyze":
+            analysis = await run_io("llm", analyze_for_batch, item.pop("text"), item["file"], api_key)
+            if not isinstance(analysis, dict):
+                raise ValueError("LLM returned no usable JSON")
+            item["analysis"] = analysis
+        else:
+            report, report_json = report_paths(args.out, item["name"])
+            os.makedirs(os.path.dirname(report), exist_ok=True)
+            analysis = item.pop("analysis")
+            with open(report_json, "w", encoding="utf-8") as f:
+                json.dump(analysis, f, indent=2, ensure_ascii=False)
+            await run_cpu(generate_pdf_report, analysis, report)
+            item["report"] = report
+
+    async def worker(stage):
+        queue = queues[stage]
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            t0 = time.perf_counter()
+            try:
+                await step(stage, item)
+            except Exception as e:
+                item["timings"][stage] = round(time.perf_counter() - t0, 3)
+                record(item, "failed", stage, str(e))
+                continue
+            elapsed = time.perf_counter() - t0
+            item["timings"][stage] = round(elapsed, 3)
+            stats.add(stage, elapsed)
+            following = next_stage[stage]
+            if following:
+                await queues[following].put(item)
+            else:
+                record(item, "done")
+
+    limits = {"extract": args.extract_workers, "analyze": args.llm_workers, "render": args.render_workers}
+    for path, name in files.items():
+        queues["extract"].put_nowait({"file": path, "name": name, "stamp": file_stamp(path), "timings": {}})
+
+    started = time.perf_counter()
+    try:
+        # Every stage runs from the start; a stage is told to stop once the one before it has drained
+        tasks = {stage: [asyncio.create_task(worker(stage)) for _ in range(limits[stage])] for stage in STAGES}
+        for stage in STAGES:
+            for _ in range(limits[stage]):
+                await queues[stage].put(None)
+            await asyncio.gather(*tasks[stage])
+    finally:
+        manifest.close()
+    wall = time.perf_counter() - started
+    return wall, counts, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a batch of tender PDFs into JSON + PDF reports.")
+    parser.add_argument("inputs", nargs="+", help="directories (all *.pdf inside) or glob patterns")
+    parser.add_argument("--out", default="Analysis_Reports", help="report directory (manifest.jsonl lives here)")
+    parser.add_argument("--extract-workers", type=int, default=CPU_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=4)
+    parser.add_argument("--render-workers", type=int, default=2)
+    parser.add_argument("--max-pages", type=int, default=EXTRACT_MAX_PAGES, help="pages extracted per file (0 = all)")
+    parser.add_argument("--force", action="store_true", help="reprocess files the manifest marks as done")
+    args = parser.parse_args()
+
+    api_key = (os.getenv("GEMINI_API_KEY") or "").strip()
+    if not llm.available(api_key):
+        print("Error: no LLM provider available; set GEMINI_API_KEY / GROQ_API_KEY or LLM_PROVIDERS=local.")
+        sys.exit(1)
+
+    files = find_inputs(args.inputs)
+    previous = {} if args.force else load_manifest(os.path.join(args.out, MANIFEST_NAME))
+    todo = {p: name for p, name in files.items()
+            if not is_finished(previous.get(p), p, report_paths(args.out, name)[0])}
+    retried = sum(1 for p in todo if previous.get(p, {}).get("status") == "failed")
+    print(f"Found {len(files)} PDF(s): {len(files) - len(todo)} already done, {len(todo)} to process ({retried} retries)")
+    if not todo:
+        return
+
+    wall, counts, stats = asyncio.run(run_batch(todo, args, api_key))
+    shutdown_executors()
+    print(json.dumps({
+        "files": len(todo),
+        "done": counts["done"],
+        "failed": counts["failed"],
+        "wall_s": round(wall, 2),
+        "files_per_min": round(counts["done"] / wall * 60, 2) if wall else 0,
+        "stages": stats.summary(),
+    }, indent=2))
+    if counts["failed"]:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
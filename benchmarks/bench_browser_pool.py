@@ -0,0 +1,78 @@
+"""
+Screenshot engine throughput: warm browser pool vs one Html2Image/Chromium spawn per report.
+
+    python benchmarks/bench_browser_pool.py --reports 40 --concurrency 4
+
+Renders the same synthetic reports through both paths (HTML -> PNG -> sliced PDF) with
+`--concurrency` requests in flight and reports sustained reports/minute and latency.
+Needs a Chromium binary (CHROME_BIN) and Playwright; a mode that cannot render is
+reported as skipped.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from synthetic import sample_analysis
+
+from browser_pool import BrowserPool
+from execution import run_io, run_cpu, shutdown
+import server
+
+
+async def bench_mode(name, render, htmls, concurrency):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i, html):
+        async with gate:
+            t0 = time.perf_counter()
+            png = await render(html)
+            await run_cpu(server.slice_screenshot_to_pdf, png, os.path.join(workdir, f"report_{i}.pdf"))
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i, html) for i, html in enumerate(htmls)))
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+    wall = time.perf_counter() - started
+    return {
+        "reports": len(latencies),
+        "wall_s": round(wall, 2),
+        "reports_per_min": round(len(latencies) / wall * 60, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+async def main(args):
+    htmls = [server.generate_formatted_html(sample_analysis(seed)) for seed in range(args.reports)]
+    result = {"reports": args.reports, "concurrency": args.concurrency}
+
+    result["spawn_per_request"] = await bench_mode(
+        "spawn", lambda html: run_io("render", server.spawn_screenshot, html), htmls, args.concurrency)
+
+    pool = BrowserPool(args.pool_size, max_renders=args.max_renders)
+    if pool.enabled:
+        result["warm_pool"] = await bench_mode("pool", pool.render, htmls, args.concurrency)
+        result["warm_pool"]["pool"] = pool.stats()
+        await pool.close()
+    else:
+        result["warm_pool"] = {"skipped": "playwright not installed"}
+
+    shutdown()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-renders", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
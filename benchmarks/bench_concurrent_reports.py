@@ -0,0 +1,128 @@
+"""
+Concurrency check for /api/generate-pdf: N simultaneous screenshot reports.
+
+    python benchmarks/bench_concurrent_reports.py --requests 50
+    python benchmarks/bench_concurrent_reports.py --real-render   # needs Chromium (CHROME_BIN)
+
+Every request carries its own report ID. By default Chromium is replaced by a stub that
+draws that ID into the screenshot as a bar of ID-dependent width, with an ID-dependent number
+of pages. Each returned PDF is decoded and checked against its own request. The temp
+directory is listed before and after to make sure nothing was left behind. Exits non-zero
+on any failure. Requires httpx (pip install httpx).
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+from synthetic import sample_analysis
+
+# Fresh report cache per run, otherwise reruns are served from .cache/reports and nothing renders
+os.environ.setdefault("REPORT_CACHE_DIR", tempfile.mkdtemp(prefix="bench-reports-"))
+
+import httpx
+import pdfplumber
+from PIL import Image, ImageDraw
+
+import server
+from page_slicing import A4_WIDTH, A4_HEIGHT
+
+BAR_TOP, BAR_HEIGHT, BAR_STEP = 20, 40, 20
+
+
+def expected_pages(report_id: int):
+    return report_id % 4 + 1
+
+
+def stub_png(report_id: int):
+    # Content on the first expected_pages(id) A4 pages; bar width encodes the ID
+    image = Image.new("RGB", (A4_WIDTH, 4 * A4_HEIGHT), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, BAR_TOP, 100 + report_id * BAR_STEP, BAR_TOP + BAR_HEIGHT), fill=(0, 0, 0))
+    for page in range(expected_pages(report_id)):
+        for y in range(page * A4_HEIGHT + 120, (page + 1) * A4_HEIGHT - 200, 36):
+            draw.text((220, y), f"report {report_id} line {y}", fill=(0, 0, 0))
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+async def stub_render(html_content):
+    report_id = int(re.search(r"BENCH-(\d+)", html_content).group(1))
+    await asyncio.sleep(0.05)  # a render takes a while; keep requests overlapping
+    return stub_png(report_id)
+
+
+def decode_report(pdf_bytes):
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        pages = len(pdf.pages)
+        stream = pdf.pages[0].images[0]["stream"].get_data()  # DCT (JPEG) page image
+    first = Image.open(io.BytesIO(stream)).convert("L")
+    row = [first.getpixel((x, BAR_TOP + BAR_HEIGHT // 2)) for x in range(first.width)]
+    bar = next((x for x, v in enumerate(row) if v > 128), len(row))
+    return pages, round((bar - 100) / BAR_STEP)
+
+
+def temp_entries():
+    return set(os.listdir(tempfile.gettempdir()))
+
+
+async def main(args):
+    if not args.real_render:
+        server.render_report_png = stub_render
+    payloads = []
+    for i in range(args.requests):
+        data = sample_analysis(i)
+        data["Tender_Reference"] = f"BENCH-{i}"
+        payloads.append(data)
+
+    before = temp_entries()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        async def one(data):
+            r = await client.post("/api/generate-pdf", json={"data": data, "engine": "screenshot"})
+            return r.status_code, r.content
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(one(d) for d in payloads))
+        wall = time.perf_counter() - started
+    await server.browser_pool.close()
+    server.shutdown_executors()
+    leftover = sorted(temp_entries() - before)
+
+    failures = []
+    for i, (status, body) in enumerate(responses):
+        if status != 200:
+            failures.append({"request": i, "status": status})
+            continue
+        if args.real_render:
+            continue
+        pages, report_id = decode_report(body)
+        if (pages, report_id) != (expected_pages(i), i):
+            failures.append({"request": i, "pages": pages, "decoded_id": report_id})
+    distinct = len({body for _, body in responses})
+
+    result = {
+        "requests": args.requests,
+        "renderer": "chromium" if args.real_render else "stub",
+        "wall_s": round(wall, 2),
+        "ok": len(responses) - len(failures),
+        "distinct_pdfs": distinct,
+        "failures": failures[:10],
+        "temp_files_left": leftover,
+    }
+    print(json.dumps(result, indent=2))
+    if failures or leftover or distinct != args.requests:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--real-render", action="store_true", help="render with the real browser pool / Html2Image")
+    asyncio.run(main(parser.parse_args()))
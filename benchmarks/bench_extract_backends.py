@@ -0,0 +1,90 @@
+"""
+Pages per second for each text extraction backend (pdfium, auto, pdfplumber).
+
+    python benchmarks/bench_extract_backends.py                          # sample tenders + synthetic fixtures
+    python benchmarks/bench_extract_backends.py --pdf CPP.pdf IREPS.pdf --repeats 5
+
+Sample tenders are the files analyze_tender_docs.py works on (CPP.pdf, IREPS.pdf ... in the
+repo root); whichever are present are measured, plus two synthetic fixtures: "text" (clauses
+only) and "boq" (ruled bill-of-quantities tables with a clause page every third page). Each
+backend extracts every page in one process, serially, so the numbers are per-core throughput.
+
+For every backend the JSON reports pages/sec (best of --repeats), how many pages "auto"
+handed to pdfplumber, and line fidelity: the share of pdfplumber's non-empty lines that
+appear verbatim in the backend's output (1.0 = nothing lost or re-flowed).
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from synthetic import ROOT, make_tender_pdf, make_boq_pdf
+
+import pypdfium2 as pdfium
+from pdf_extract import EXTRACT_BACKENDS, count_pages, extract_page_range, needs_layout
+
+SAMPLE_TENDERS = ["bid_summary (4).pdf", "CPP.pdf", "eprocurement.pdf", "GeM-Bidding-8551552.pdf", "IREPS.pdf"]
+
+
+def layout_pages(path: str):
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return sum(1 for i in range(len(pdf)) if needs_layout(pdf[i]))
+    finally:
+        pdf.close()
+
+
+def line_fidelity(reference, texts):
+    lines = [line.strip() for text in reference for line in text.splitlines() if line.strip()]
+    if not lines:
+        return None
+    produced = {line.strip() for text in texts for line in text.splitlines()}
+    return round(sum(line in produced for line in lines) / len(lines), 4)
+
+
+def measure(path: str, repeats: int):
+    n_pages = count_pages(path)
+    runs, outputs = {}, {}
+    for backend in EXTRACT_BACKENDS:
+        best = None
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            outputs[backend] = extract_page_range(path, 0, n_pages, backend)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        runs[backend] = {
+            "seconds": round(best, 3),
+            "pages_per_sec": round(n_pages / best, 1),
+            "chars": sum(len(t) for t in outputs[backend]),
+        }
+    for backend in EXTRACT_BACKENDS:
+        runs[backend]["line_fidelity"] = line_fidelity(outputs["pdfplumber"], outputs[backend])
+        runs[backend]["speedup"] = round(runs["pdfplumber"]["seconds"] / runs[backend]["seconds"], 1)
+    return {"pages": n_pages, "layout_pages": layout_pages(path), "backends": runs}
+
+
+def main(args):
+    workdir = tempfile.mkdtemp(prefix="bench-backends-")
+    fixtures = {}
+    paths = args.pdf if args.pdf is not None else [os.path.join(ROOT, name) for name in SAMPLE_TENDERS]
+    for path in paths:
+        if os.path.exists(path):
+            fixtures[os.path.basename(path)] = path
+    if not args.no_synthetic:
+        fixtures["synthetic-text"] = make_tender_pdf(os.path.join(workdir, "text.pdf"), args.pages, seed=1)
+        fixtures["synthetic-boq"] = make_boq_pdf(os.path.join(workdir, "boq.pdf"), args.pages, seed=2)
+
+    result = {"repeats": args.repeats, "documents": {}}
+    for name, path in fixtures.items():
+        result["documents"][name] = measure(path, args.repeats)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", nargs="*", help="PDFs to measure instead of the sample tenders in the repo root")
+    parser.add_argument("--pages", type=int, default=60, help="pages per synthetic fixture")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--no-synthetic", action="store_true", help="only measure the given / sample PDFs")
+    main(parser.parse_args())
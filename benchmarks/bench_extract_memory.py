@@ -0,0 +1,101 @@
+"""
+Peak RSS of text extraction on a large synthetic PDF, before and after streaming extraction.
+
+    python benchmarks/bench_extract_memory.py                 # 500-page tender
+    python benchmarks/bench_extract_memory.py --pages 300 --modes legacy pdfplumber
+
+Every mode runs in a fresh interpreter that imports the extraction libraries, records its RSS,
+extracts every page and reports the peak RSS (ru_maxrss) minus that baseline:
+
+  legacy      the old loop: `text_content += page.extract_text()` over pdf.pages, every
+              pdfplumber page keeping its parsed objects until the handle closes
+  pdfplumber  iter_page_texts(backend="pdfplumber"): one page at a time, page.close() after each
+  pdfium      iter_page_texts(backend="pdfium")
+  auto        iter_page_texts(backend="auto")
+
+The streaming modes feed the pages straight into the BM25 chunker, as the Q&A path does.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from synthetic import make_tender_pdf
+
+MODES = ("legacy", "pdfplumber", "pdfium", "auto")
+
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def legacy_extract(path: str):
+    import pdfplumber
+    text_content = ""
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if text: text_content += text + "\n"
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # before close() frees the pages
+    return text_content, peak
+
+
+def child(mode: str, path: str):
+    import pdfplumber  # noqa: F401 - both libraries count towards the baseline
+    import pypdfium2  # noqa: F401
+    from pdf_extract import iter_page_texts, join_pages
+    from retrieval import chunk_pages
+
+    baseline = rss_kb()
+    t0 = time.perf_counter()
+    if mode == "legacy":
+        text, peak = legacy_extract(path)
+        chunks = None
+    else:
+        page_texts = []
+
+        def pages():
+            for _, page_text in iter_page_texts(path, backend=mode):
+                page_texts.append(page_text)
+                yield page_text
+
+        chunks = len(chunk_pages(pages()))
+        text = join_pages(page_texts)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "seconds": round(time.perf_counter() - t0, 2),
+        "baseline_mb": round(baseline / 1024, 1),
+        "peak_growth_mb": round((peak - baseline) / 1024, 1),
+        "text_chars": len(text),
+        "chunks": chunks,
+    }))
+
+
+def main(args):
+    path = args.pdf or make_tender_pdf(os.path.join(tempfile.mkdtemp(prefix="bench-memory-"), "large.pdf"), args.pages)
+    result = {"pdf": os.path.basename(path), "pages": None if args.pdf else args.pages, "modes": {}}
+    for mode in args.modes:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, path],
+                             capture_output=True, text=True, check=True)
+        result["modes"][mode] = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode}: done", file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="use an existing PDF instead of a synthetic one")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+"""
+Parallel page-range extraction vs the serial pdfplumber walk.
+
+    python benchmarks/bench_extraction.py --pages 300 --workers 1 2 4 8
+
+Prints one JSON document with wall time and speedup per worker count, and checks
+that every parallel run returns exactly the serial text. Both sides use pdfplumber; for the
+PDFium backends see bench_extract_backends.py.
+
+The "server" entry times what run_analysis actually does: server.extract_document_pages on
+the shared CPU pool (CPU_WORKERS processes, min(EXTRACT_WORKERS, CPU_WORKERS) page ranges),
+with the pool already forked. Set those variables to compare pool sizes.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+from synthetic import make_tender_pdf
+
+import pdfplumber
+from pdf_extract import extract_text_parallel
+
+
+def serial_extract(path, max_pages):
+    # The pre-existing single-handle loop from server.extract_text_from_file_path
+    text_content = ""
+    with pdfplumber.open(path) as pdf:
+        pages = pdf.pages[:max_pages] if max_pages else pdf.pages
+        for page in pages:
+            text = page.extract_text()
+            if text: text_content += text + "\n"
+    return text_content
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def server_extract(path, max_pages):
+    # Imported late: server.py reads the environment at import time
+    os.environ["EXTRACT_MAX_PAGES"] = str(max_pages)
+    os.environ.setdefault("ANALYSIS_CACHE_DIR", tempfile.mkdtemp(prefix="bench-cache-"))
+    os.environ.setdefault("TM_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-tm-"), "tm.db"))
+    import server
+    from execution import CPU_WORKERS, run_cpu, shutdown
+    from pdf_extract import EXTRACT_WORKERS, join_pages
+
+    async def run():
+        await run_cpu(int)  # fork the pool outside the timed region, as a warm server would have
+        pages, wall = await timed_async(server.extract_document_pages(path, backend="pdfplumber"))
+        return join_pages(pages or []), wall
+    try:
+        text, wall = asyncio.run(run())
+    finally:
+        shutdown()
+    return text, wall, CPU_WORKERS, min(EXTRACT_WORKERS, CPU_WORKERS)
+
+
+async def timed_async(coro):
+    t0 = time.perf_counter()
+    out = await coro
+    return out, time.perf_counter() - t0
+
+
+def main(args):
+    path = args.pdf or make_tender_pdf(os.path.join(tempfile.mkdtemp(), "tender.pdf"), args.pages)
+    baseline, serial_s = timed(serial_extract, path, args.max_pages)
+    runs = []
+    for workers in args.workers:
+        text, wall = timed(extract_text_parallel, path, max_pages=args.max_pages, workers=workers, backend="pdfplumber")
+        runs.append({
+            "workers": workers,
+            "wall_s": round(wall, 3),
+            "speedup": round(serial_s / wall, 2),
+            "identical": text == baseline,
+        })
+    text, wall, pool, ranges = server_extract(path, args.max_pages)
+    server_run = {
+        "cpu_workers": pool,
+        "ranges": ranges,
+        "wall_s": round(wall, 3),
+        "speedup": round(serial_s / wall, 2),
+        "identical": text == baseline,
+    }
+    print(json.dumps({
+        "pdf": os.path.basename(path),
+        "pages": args.pages if not args.pdf else None,
+        "max_pages": args.max_pages,
+        "cpu_count": os.cpu_count(),
+        "serial_s": round(serial_s, 3),
+        "parallel": runs,
+        "server": server_run,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="use an existing PDF instead of a synthetic one")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--max-pages", type=int, default=0, help="page cap (0 = all pages)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    main(parser.parse_args())
@@ -0,0 +1,102 @@
+"""
+Analysis prompt page choice: relevance-ranked selection vs the old "first 20 pages".
+
+    python benchmarks/bench_page_selection.py                      # synthetic 300-page bundle
+    python benchmarks/bench_page_selection.py --pdf IREPS.pdf      # which pages a real tender gets
+
+The synthetic bundle is mostly general-conditions boilerplate with the pages that matter
+spread through it, as in IREPS / CPP documents: the NIT on page 1, EMD and eligibility
+clauses past page 40, the BOQ and the bid schedule near the end. The report shows which of
+those pages each strategy puts in the prompt, the prompt size and the selection time.
+"""
+import json
+import time
+import random
+import argparse
+
+from synthetic import ROOT  # noqa: F401 - puts the repo root on sys.path
+
+from page_selection import ANALYSIS_CHAR_BUDGET, select_context, select_pages
+from pdf_extract import iter_page_texts, join_pages
+
+BOILERPLATE = [
+    "The contractor shall take all precautions to avoid damage to adjoining property.",
+    "All materials brought to site shall be stacked in the manner directed by the engineer.",
+    "The works shall be carried out in accordance with the approved drawings and method statements.",
+    "Any dispute arising out of this contract shall be referred to the competent authority.",
+    "The contractor shall comply with all labour laws in force from time to time.",
+    "Site clearance and disposal of surplus earth shall be the responsibility of the contractor.",
+    "Watch and ward of the materials at site shall be arranged by the contractor at his own cost.",
+]
+
+KEY_PAGES = {
+    "nit": (1, ["NOTICE INVITING TENDER", "Tender No. NR/DLI/ENG/2025/118, Northern Railway",
+                "Estimated cost of work: Rs. 4,85,20,000", "Tender fee: Rs. 10,000"]),
+    "emd": (47, ["Clause 7.2 Earnest Money Deposit", "EMD of Rs. 3,92,600 shall be deposited online.",
+                 "Bid security in any other form will not be accepted."]),
+    "eligibility": (58, ["Clause 9.1 Eligibility criteria", "Average annual turnover of Rs. 7.28 crore in the last 3 years.",
+                         "Experience of similar work of 35% of the estimated cost."]),
+    "boq": (260, ["Schedule of Quantities (BOQ)", "Item 1 PSC sleepers BG - 12,000 Nos - Rs. 2,845.00",
+                  "Item 2 Elastic rail clips - 48,000 Nos - Rs. 41.00"]),
+    "dates": (291, ["Bid submission end date: 14-03-2025 15:00", "Bid opening date: 15-03-2025 15:30",
+                    "Pre-bid meeting: 04-03-2025 at 11:00"]),
+}
+
+
+def synthetic_pages(n_pages: int, seed: int = 0):
+    rng = random.Random(seed)
+    pages = []
+    for page_no in range(1, n_pages + 1):
+        lines = [f"GENERAL CONDITIONS OF CONTRACT - PART {page_no}"]
+        lines += [rng.choice(BOILERPLATE) for _ in range(38)]
+        pages.append(lines)
+    for name, (page_no, extra) in KEY_PAGES.items():
+        if page_no <= n_pages:
+            pages[page_no - 1][1:1] = extra
+    return ["\n".join(lines) for lines in pages]
+
+
+def first_n(pages, n: int = 20):
+    text = join_pages(pages[:n])[:ANALYSIS_CHAR_BUDGET]
+    return text, [i for i in range(1, min(n, len(pages)) + 1) if pages[i - 1]]
+
+
+def main(args):
+    if args.pdf:
+        pages = [text for _, text in iter_page_texts(args.pdf)]
+    else:
+        pages = synthetic_pages(args.pages)
+    budget = args.budget
+
+    t0 = time.perf_counter()
+    text, selection = select_context(pages, budget)
+    select_ms = (time.perf_counter() - t0) * 1000
+    _, scores = select_pages(pages, budget)
+    old_text, old_pages = first_n(pages)
+
+    result = {
+        "pages": len(pages),
+        "document_chars": sum(len(p) for p in pages),
+        "budget_chars": budget,
+        "first_20": {"prompt_chars": len(old_text), "pages": old_pages},
+        "ranked": {
+            "prompt_chars": selection["chars"],
+            "pages": selection["analyzed_pages"],
+            "select_ms": round(select_ms, 1),
+        },
+        "top_scores": sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:10],
+    }
+    if not args.pdf:
+        result["key_pages"] = {
+            name: {"page": page_no, "first_20": page_no in old_pages, "ranked": page_no in selection["analyzed_pages"]}
+            for name, (page_no, _) in KEY_PAGES.items() if page_no <= len(pages)
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="score an existing PDF instead of the synthetic bundle")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--budget", type=int, default=ANALYSIS_CHAR_BUDGET, help="prompt budget in characters")
+    main(parser.parse_args())
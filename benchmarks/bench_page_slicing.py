@@ -0,0 +1,89 @@
+"""
+Screenshot page-break planning: vectorized row profiles vs the old per-pixel getpixel scan.
+
+    python benchmarks/bench_page_slicing.py --runs 3
+
+Synthetic report screenshots (section titles, tables with a dark label column, blank tail)
+of 4 and 20 A4 pages are sliced by both planners; the report shows time per screenshot and
+checks that both choose exactly the same pages.
+"""
+import json
+import time
+import argparse
+
+from PIL import ImageOps
+
+from synthetic import synthetic_screenshot
+from page_slicing import A4_WIDTH, A4_HEIGHT, plan_page_breaks
+
+
+def legacy_page_breaks(image):
+    # The pre-NumPy loop from slice_screenshot_to_pdf, returning the kept (top, bottom) ranges
+    img_width, img_height = image.size
+    pages = []
+    current_y = 0
+    while current_y < img_height:
+        limit_y = min(current_y + A4_HEIGHT, img_height)
+        if limit_y == img_height:
+            page = image.crop((0, current_y, A4_WIDTH, limit_y))
+            if ImageOps.invert(page.convert("L")).getbbox():
+                pages.append((current_y, limit_y))
+            break
+        found_cut = -1
+        scan_end = max(current_y + 100, limit_y - 600)
+        for test_y in range(limit_y, scan_end, -2):
+            is_uniform = True
+            first_pixel = None
+            for x in range(200, 1040, 20):
+                b = sum(image.getpixel((x, test_y)))
+                if first_pixel is None:
+                    first_pixel = b
+                if abs(b - first_pixel) > 40:
+                    is_uniform = False
+                    break
+            if is_uniform:
+                if first_pixel > 650:
+                    found_cut = test_y
+                    break
+                found_cut = test_y
+        cut_y = found_cut if found_cut != -1 else limit_y
+        page = image.crop((0, current_y, A4_WIDTH, cut_y))
+        if ImageOps.invert(page.convert("L")).getbbox():
+            pages.append((current_y, cut_y))
+        current_y = cut_y
+    return pages
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(args):
+    result = {}
+    for pages in args.pages:
+        legacy_s, numpy_s, identical = [], [], True
+        for seed in range(args.runs):
+            image = synthetic_screenshot(pages, seed)
+            old, old_s = timed(legacy_page_breaks, image)
+            new, new_s = timed(plan_page_breaks, image)
+            legacy_s.append(old_s)
+            numpy_s.append(new_s)
+            identical = identical and old == new
+        result[f"{pages}_pages"] = {
+            "screenshot_px": [A4_WIDTH, pages * A4_HEIGHT],
+            "legacy_ms": round(min(legacy_s) * 1000, 1),
+            "numpy_ms": round(min(numpy_s) * 1000, 1),
+            "speedup": round(min(legacy_s) / min(numpy_s), 1),
+            "pdf_pages": len(new),
+            "identical_breaks": identical,
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[4, 20])
+    parser.add_argument("--runs", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,55 @@
+"""
+/api/generate-pdf: vector (ReportLab) engine vs the Chromium screenshot engine.
+
+    python benchmarks/bench_report_engines.py --runs 5
+
+Reports mean/min render time and PDF size per engine. The screenshot engine needs a
+Chromium binary (CHROME_BIN); it is reported as skipped when none is available.
+Requires httpx (pip install httpx).
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+from synthetic import sample_analysis
+
+# Fresh report cache per run, otherwise reruns are served from .cache/reports and nothing renders
+os.environ.setdefault("REPORT_CACHE_DIR", tempfile.mkdtemp(prefix="bench-reports-"))
+
+from fastapi.testclient import TestClient
+import server
+
+
+def bench_engine(client, engine, payloads):
+    times, sizes = [], []
+    for data in payloads:
+        t0 = time.perf_counter()
+        r = client.post("/api/generate-pdf", json={"data": data, "engine": engine})
+        elapsed = time.perf_counter() - t0
+        if r.status_code != 200:
+            return {"skipped": r.json().get("detail", r.status_code)}
+        times.append(elapsed)
+        sizes.append(len(r.content))
+    return {
+        "runs": len(times),
+        "mean_ms": round(statistics.mean(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+        "mean_kb": round(statistics.mean(sizes) / 1024, 1),
+    }
+
+
+def main(args):
+    payloads = [sample_analysis(seed) for seed in range(args.runs)]
+    with TestClient(server.app) as client:
+        result = {engine: bench_engine(client, engine, payloads) for engine in args.engines}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--engines", nargs="+", default=["vector", "screenshot"])
+    main(parser.parse_args())
@@ -0,0 +1,99 @@
+"""
+Report HTML generation per report: compiled template + cached assets vs the old builder.
+
+    python benchmarks/bench_report_html.py --reports 200
+
+The old builder re-read and base64-encoded "Bidalert template.png" and rebuilt the CSS and
+markup by string concatenation for every report; the compiled one substitutes escaped
+fields into a layout built once.
+"""
+import json
+import time
+import base64
+import argparse
+
+from synthetic import sample_analysis
+
+from report_html import CSS_TOP, CSS_BOTTOM, generate_formatted_html
+from report_pdf import TEMPLATE_IMAGE
+
+
+def legacy_formatted_html(data):
+    # The per-call work of the old generate_formatted_html (same CSS, same field lookups)
+    try:
+        with open(TEMPLATE_IMAGE, "rb") as img_file:
+            bg_base64 = base64.b64encode(img_file.read()).decode('utf-8')
+    except OSError:
+        bg_base64 = ""
+    if bg_base64:
+        bg_rule = "background-image: url('data:image/png;base64," + bg_base64 + "');"
+    else:
+        bg_rule = "background-color: #ffffff;"
+    full_css = CSS_TOP + bg_rule + CSS_BOTTOM
+
+    def should_show_value(val):
+        if not val or val is None:
+            return False
+        val_str = str(val).strip().lower()
+        hide_values = ['not specified', 'n/a', 'null', 'undefined', 'none']
+        return not any(hide in val_str for hide in hide_values)
+
+    def make_row(label, value):
+        if should_show_value(value):
+            return f"<tr><td>{label}</td><td>{value}</td></tr>"
+        return ""
+
+    dates_rows = ""
+    if isinstance(data.get('Important_Dates'), dict):
+        for date_label, date_value in data['Important_Dates'].items():
+            if should_show_value(date_value):
+                dates_rows += f"<tr><td>{date_label}</td><td>{date_value}</td></tr>"
+    elig = data.get('Eligibility', {})
+    fields = [
+        ('Tender Reference', 'Tender_Reference'), ('Issuing Authority', 'Issuing_Authority'),
+        ('Project Name', 'Project_Name'), ('Location', 'Location'), ('Scope of Work', 'Scope_of_Work'),
+        ('Contract Period', 'Contract_Period'), ('Technical Specifications', 'Technical_Specifications'),
+        ('Estimated Value', 'Estimated_Value'), ('EMD Amount', 'EMD_Amount'), ('Tender Fee', 'Tender_Fee'),
+        ('Payment Terms', 'Payment_Terms'), ('Submission Method', 'Submission_Method'),
+        ('Contact Details', 'Contact_Details'),
+    ]
+    rows = "".join(make_row(label, data.get(key, '')) for label, key in fields)
+    rows += make_row('Min Turnover', elig.get('Min_Turnover'))
+    rows += make_row('Experience Required', elig.get('Experience_Required'))
+    rows += make_row('Other Criteria', elig.get('Other_Eligibility_Criteria', ''))
+    rows += make_row('Required Docs', str(data.get('Required_Documents', ''))[:400] + '...' if data.get('Required_Documents') else '')
+    return f"""
+    <html><head>{full_css}</head><body><div class="page-container">
+    <h1>Bid Analysis Report</h1><p>{data.get('Executive_Summary', 'N/A')}</p>
+    <table>{rows}</table><table>{dates_rows}</table></div></body></html>
+    """
+
+
+def per_report_us(fn, payloads):
+    t0 = time.perf_counter()
+    for data in payloads:
+        fn(data)
+    return (time.perf_counter() - t0) / len(payloads) * 1e6
+
+
+def main(args):
+    payloads = [sample_analysis(seed) for seed in range(args.reports)]
+    t0 = time.perf_counter()
+    generate_formatted_html(payloads[0])  # first call encodes the template and compiles the CSS
+    first_us = (time.perf_counter() - t0) * 1e6
+    legacy = per_report_us(legacy_formatted_html, payloads)
+    compiled = per_report_us(generate_formatted_html, payloads)
+    print(json.dumps({
+        "reports": args.reports,
+        "html_kb": round(len(generate_formatted_html(payloads[0])) / 1024, 1),
+        "legacy_us_per_report": round(legacy, 1),
+        "compiled_first_call_us": round(first_us, 1),
+        "compiled_us_per_report": round(compiled, 1),
+        "speedup": round(legacy / compiled, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,177 @@
+"""
+Stage-level timings for the analyze -> ask -> translate -> report pipeline.
+
+    python benchmarks/bench_stages.py                              # 10/50/300 pages, text + image-only
+    python benchmarks/bench_stages.py --pages 10 --kinds text --repeats 5 --out stages.json
+
+Synthetic tender PDFs are generated per size and kind ("text" has a text layer, "image" is
+scanned pages only). The LLM is the offline local provider and GoogleTranslator is a stub, so
+only our own code is timed. Each stage runs --repeats times and reports min/median/max in ms:
+
+  document stages (per fixture): upload_save (ingest.spool_stream), extract (extract_text_from_file_path),
+      extract_parallel, prompt_assembly (cold BM25 index), analyze (stub LLM), parse_json
+  report stages (once): translate (recursive_translate, empty translation memory),
+      report_html, screenshot_slicing (4-page screenshot -> PDF), reportlab
+
+Pages are not capped (EXTRACT_MAX_PAGES=0) unless set in the environment. The JSON carries
+the git revision and machine details so runs can be diffed.
+"""
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from synthetic import ROOT, make_tender_pdf, make_scanned_pdf, sample_analysis, synthetic_screenshot
+
+os.environ.setdefault("EXTRACT_MAX_PAGES", "0")
+os.environ.setdefault("ANALYSIS_CACHE_DIR", tempfile.mkdtemp(prefix="bench-cache-"))
+os.environ.setdefault("TM_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-tm-"), "tm.db"))
+
+import server
+import tender_analysis
+from ingest import spool_stream
+from llm_providers import LLMRouter, LocalProvider, parse_json
+from page_selection import select_context
+from pdf_extract import extract_pages_parallel, join_pages
+from report_html import generate_formatted_html
+from report_pdf import generate_pdf_report
+from translation_memory import TranslationMemory
+
+QUESTION = "What is the EMD amount and the bid submission end date?"
+
+
+class StubTranslator:
+    latency = 0.0
+
+    def __init__(self, source="auto", target="en"):
+        self.target = target
+
+    def translate(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{self.target}] {text}"
+
+
+def measure(fn, repeats: int, setup=None):
+    """Run fn `repeats` times (setup() before each run, untimed); returns (last result, stats)."""
+    samples, out = [], None
+    for _ in range(repeats):
+        args = setup() if setup else ()
+        t0 = time.perf_counter()
+        out = fn(*args)
+        samples.append(time.perf_counter() - t0)
+    ms = [s * 1000 for s in samples]
+    return out, {
+        "runs": repeats,
+        "min_ms": round(min(ms), 2),
+        "median_ms": round(statistics.median(ms), 2),
+        "max_ms": round(max(ms), 2),
+    }
+
+
+def document_stages(path: str, repeats: int, workdir: str):
+    stages = {}
+
+    def save():
+        with open(path, "rb") as f:
+            spool_stream(f.read, os.path.join(workdir, "spool"), max_bytes=0).discard()
+
+    _, stages["upload_save"] = measure(save, repeats)
+    text, stages["extract"] = measure(server.extract_text_from_file_path, repeats, lambda: (path,))
+    pages, stages["extract_parallel"] = measure(extract_pages_parallel, repeats, lambda: (path,))
+    text = text or ""
+
+    keys = iter(range(repeats))  # fresh index key per run: time the index build, not the cache
+    _, stages["prompt_assembly"] = measure(
+        server.build_ask_prompt, repeats,
+        lambda: (QUESTION, join_pages(pages), pages, f"bench-{path}-{next(keys)}"),
+    )
+
+    if len(text.strip()) > 50:
+        prompt_text, _ = select_context(pages)  # as run_analysis does
+        analyze = lambda: server.analyze_document_text(prompt_text, "")
+    else:
+        analyze = lambda: server.analyze_document_file(path, "")[0]
+    analysis, stages["analyze"] = measure(analyze, repeats)
+
+    fenced = "```json\n" + json.dumps(analysis, indent=2) + "\n```"
+    _, stages["parse_json"] = measure(parse_json, repeats, lambda: (fenced,))
+    return {"pages": len(pages), "text_chars": len(text), "stages": stages}
+
+
+def report_stages(repeats: int, workdir: str):
+    stages = {}
+    counter = iter(range(repeats))
+
+    def fresh_memory():
+        # Every run starts from an empty translation memory so all leaves hit the translator
+        server.translation_memory = TranslationMemory(os.path.join(workdir, f"tm-{next(counter)}.db"), max_entries=50000)
+        return (sample_analysis(0), "hi")
+
+    _, stages["translate"] = measure(server.recursive_translate, repeats, fresh_memory)
+    _, stages["report_html"] = measure(generate_formatted_html, repeats, lambda: (sample_analysis(0),))
+
+    buf = io.BytesIO()
+    synthetic_screenshot(4, seed=0).save(buf, "PNG")
+    png = buf.getvalue()
+    _, stages["screenshot_slicing"] = measure(server.slice_screenshot_to_pdf, repeats, lambda: (png,))
+    _, stages["reportlab"] = measure(generate_pdf_report, repeats, lambda: (sample_analysis(0),))
+    return stages
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(args):
+    # server.py (ask) and tender_analysis.py (analyze_document_*) share one router
+    server.llm = tender_analysis.llm = LLMRouter([LocalProvider(latency=0)], retries=0)
+    server.GoogleTranslator = StubTranslator
+    workdir = tempfile.mkdtemp(prefix="bench-stages-")
+    makers = {"text": make_tender_pdf, "image": make_scanned_pdf}
+
+    result = {
+        "meta": {
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeats": args.repeats,
+            "extract_max_pages": int(os.environ["EXTRACT_MAX_PAGES"]),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "documents": {},
+    }
+    for kind in args.kinds:
+        for pages in args.pages:
+            path = makers[kind](os.path.join(workdir, f"{kind}_{pages}.pdf"), pages, seed=pages)
+            name = f"{kind}-{pages}"
+            result["documents"][name] = document_stages(path, args.repeats, workdir)
+            print(f"{name}: done", file=sys.stderr)
+    result["report"] = report_stages(args.repeats, workdir)
+    server.shutdown_executors()
+
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 300])
+    parser.add_argument("--kinds", nargs="+", choices=["text", "image"], default=["text", "image"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", help="also write the JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,103 @@
+"""
+Cold-start cost of server.py: import time and time to the first /health response.
+
+    python benchmarks/bench_startup.py                  # working tree
+    python benchmarks/bench_startup.py --ref HEAD~1     # ... compared against a git revision
+
+Each run is a fresh interpreter. "import" is `import server` timed inside the child;
+"first_health" starts uvicorn on a free port and polls /health from process launch until
+the first 200. With --ref the revision is exported (git archive) to a temp directory and
+measured the same way. Caches point at throwaway directories.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+
+from synthetic import ROOT
+
+IMPORT_SNIPPET = "import time; t0 = time.perf_counter(); import server; print(time.perf_counter() - t0)"
+
+
+def child_env(workdir: str):
+    env = dict(os.environ)
+    for name in ("ANALYSIS_CACHE_DIR", "DOC_STORE_DIR", "JOBS_DIR", "REPORT_CACHE_DIR", "PROFILE_DIR"):
+        env[name] = os.path.join(workdir, name.lower())
+    env["TM_PATH"] = os.path.join(workdir, "tm.db")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_import(tree: str, env):
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=tree, env=env,
+                         capture_output=True, text=True, timeout=120)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_first_health(tree: str, env, timeout: float = 60):
+    port = free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=tree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - t0
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("server did not answer /health")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def measure(tree: str, runs: int):
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = child_env(workdir)
+    time_import(tree, env)  # first run compiles .pyc / fills the OS page cache; not counted
+    imports = [time_import(tree, env) for _ in range(runs)]
+    health = [time_first_health(tree, env) for _ in range(runs)]
+    return {
+        "import_ms": round(statistics.median(imports) * 1000, 1),
+        "first_health_ms": round(statistics.median(health) * 1000, 1),
+        "runs": runs,
+    }
+
+
+def export_revision(ref: str):
+    tree = tempfile.mkdtemp(prefix="bench-startup-ref-")
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", tree], input=archive, check=True)
+    return tree
+
+
+def main(args):
+    result = {"current": measure(ROOT, args.runs)}
+    if args.ref:
+        result[args.ref] = measure(export_revision(args.ref), args.runs)
+        for key in ("import_ms", "first_health_ms"):
+            result[f"{key}_saved"] = round(result[args.ref][key] - result["current"][key], 1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="git revision to compare against (e.g. HEAD before a change)")
+    main(parser.parse_args())
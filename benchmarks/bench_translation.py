@@ -0,0 +1,88 @@
+"""
+/api/translate translator-call counts: old per-leaf recursion vs translation memory.
+
+    python benchmarks/bench_translation.py --requests 20 --langs hi te ta
+
+GoogleTranslator is replaced by a counting stub (sleeps --latency per call), so no
+network is used. The translation memory lives in a throwaway directory.
+"""
+import os
+import copy
+import json
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic import sample_analysis
+
+os.environ["TM_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-tm-"), "tm.db")
+
+import server
+
+CALLS = {"n": 0}
+
+
+class CountingTranslator:
+    latency = 0.02
+
+    def __init__(self, source="auto", target="en"):
+        self.target = target
+
+    def translate(self, text):
+        CALLS["n"] += 1
+        time.sleep(self.latency)
+        return f"[{self.target}] {text}"
+
+
+def legacy_translate(data, target_lang):
+    # The pre-translation-memory recursion: every non-empty string leaf is one translator call
+    translator = CountingTranslator(source='auto', target=target_lang)
+    if isinstance(data, dict):
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            futures = {k: executor.submit(legacy_translate, v, target_lang) for k, v in data.items()}
+            return {k: f.result() for k, f in futures.items()}
+    elif isinstance(data, list):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            return list(executor.map(lambda item: legacy_translate(item, target_lang), data))
+    elif isinstance(data, str) and data.strip():
+        return translator.translate(data[:4500])
+    return data
+
+
+def run(fn, payloads, langs):
+    CALLS["n"] = 0
+    t0 = time.perf_counter()
+    for payload in payloads:
+        for lang in langs:
+            fn(copy.deepcopy(payload), lang)  # recursive_translate writes in place
+    return CALLS["n"], time.perf_counter() - t0
+
+
+def main(args):
+    CountingTranslator.latency = args.latency
+    server.GoogleTranslator = CountingTranslator
+    payloads = [sample_analysis(seed) for seed in range(args.requests)]
+    n_requests = len(payloads) * len(args.langs)
+
+    legacy_calls, legacy_s = run(legacy_translate, payloads, args.langs)
+    tm_calls, tm_s = run(server.recursive_translate, payloads, args.langs)
+    warm_calls, warm_s = run(server.recursive_translate, payloads, args.langs)
+
+    per_request = lambda calls: round(calls / n_requests, 1)
+    print(json.dumps({
+        "requests": n_requests,
+        "languages": args.langs,
+        "legacy": {"translator_calls": legacy_calls, "calls_per_request": per_request(legacy_calls), "wall_s": round(legacy_s, 2)},
+        "translation_memory_cold": {"translator_calls": tm_calls, "calls_per_request": per_request(tm_calls), "wall_s": round(tm_s, 2)},
+        "translation_memory_warm": {"translator_calls": warm_calls, "calls_per_request": per_request(warm_calls), "wall_s": round(warm_s, 2)},
+        "tm_stats": server.translation_memory.stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="distinct analyses to translate")
+    parser.add_argument("--langs", nargs="+", default=["hi", "te", "ta"])
+    parser.add_argument("--latency", type=float, default=0.02, help="stub translator latency (s)")
+    main(parser.parse_args())
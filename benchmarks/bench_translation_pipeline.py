@@ -0,0 +1,88 @@
+"""
+Nested-payload translation: legacy pool-per-container recursion vs the flattened pipeline.
+
+    python benchmarks/bench_translation_pipeline.py --concurrent 8 --depth 3 --breadth 6
+
+Runs `--concurrent` translate requests at once and reports wall time, translator calls and
+the peak number of live threads. Every request uses distinct strings so the translation
+memory cannot hide the difference.
+"""
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_translation import CountingTranslator, legacy_translate, CALLS
+
+import server
+from execution import STAGE_LIMITS
+
+
+def nested_payload(request_no: int, depth: int, breadth: int):
+    # Analysis-shaped nesting: dicts of dicts with lists of short strings at the bottom
+    def build(level, prefix):
+        if level == depth:
+            return [f"{prefix} document {i} (req {request_no})" for i in range(breadth)]
+        return {f"Field_{i}": build(level + 1, f"{prefix}.{i}") for i in range(breadth)}
+    payload = build(1, "clause")
+    payload["Submission_Method"] = "Online"
+    return payload
+
+
+class ThreadPeak:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.002)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run(fn, payloads, lang):
+    CALLS["n"] = 0
+    with ThreadPeak() as peak:
+        t0 = time.perf_counter()
+        # Outer threads stand in for concurrent HTTP requests
+        with ThreadPoolExecutor(max_workers=len(payloads)) as requests:
+            list(requests.map(lambda p: fn(p, lang), payloads))
+        wall = time.perf_counter() - t0
+    return {"wall_s": round(wall, 3), "translator_calls": CALLS["n"], "peak_threads": peak.peak}
+
+
+def main(args):
+    CountingTranslator.latency = args.latency
+    server.GoogleTranslator = CountingTranslator
+    legacy = run(legacy_translate, [nested_payload(i, args.depth, args.breadth) for i in range(args.concurrent)], "hi")
+    flat = run(server.recursive_translate, [nested_payload(i + 10_000, args.depth, args.breadth) for i in range(args.concurrent)], "hi")
+    leaves = len(server.collect_leaves([nested_payload(0, args.depth, args.breadth)]))
+    print(json.dumps({
+        "concurrent_requests": args.concurrent,
+        "depth": args.depth,
+        "breadth": args.breadth,
+        "leaves_per_request": leaves,
+        "translate_workers": STAGE_LIMITS["translate"],
+        "legacy": legacy,
+        "flattened": flat,
+    }, indent=2))
+    server.shutdown_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrent", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--breadth", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub translator latency (s)")
+    main(parser.parse_args())
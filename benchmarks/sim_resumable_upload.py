@@ -0,0 +1,167 @@
+"""
+Interrupted-transfer harness for the resumable upload API (/api/uploads).
+
+    python benchmarks/sim_resumable_upload.py                          # 5 trials, 30% of chunks hit a fault
+    python benchmarks/sim_resumable_upload.py --pages 400 --chunk-kb 128 --fault-rate 0.5 --trials 20
+
+Runs the app in-process (TestClient, offline local LLM) and uploads a synthetic tender PDF
+chunk by chunk while injecting the failures a field-office link produces:
+
+  drop      the chunk never reaches the server (connection died before the body was sent)
+  truncate  only part of the chunk arrives, with the full chunk's checksum
+  corrupt   one byte flipped in transit
+  lost_ack  the server stored the chunk but the response was lost; the client re-sends it
+  restart   the server process restarts between chunks (sessions are reloaded from disk)
+
+After every failure the client does what a real one would: GET /api/uploads/{id} and carry on
+from the returned offset. Each trial completes the upload, and the harness checks that the
+analysis doc_id matches the file's SHA-256 and that no session or spool files are left over.
+Requires httpx (pip install httpx).
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+
+from synthetic import make_tender_pdf
+
+WORKDIR = tempfile.mkdtemp(prefix="sim-resumable-")
+os.environ.setdefault("LLM_PROVIDERS", "local")
+os.environ.setdefault("STARTUP_WARMUP", "0")
+for name in ("ANALYSIS_CACHE_DIR", "DOC_STORE_DIR", "JOBS_DIR", "UPLOAD_DIR", "RESUMABLE_DIR"):
+    os.environ.setdefault(name, os.path.join(WORKDIR, name.lower()))
+os.environ.setdefault("TM_PATH", os.path.join(WORKDIR, "tm.db"))
+
+from fastapi.testclient import TestClient
+
+import server
+from ingest import ResumableUploads
+
+FAULTS = ("drop", "truncate", "corrupt", "lost_ack", "restart")
+
+
+def sha256(data: bytes):
+    return hashlib.sha256(data).hexdigest()
+
+
+def put_chunk(client, upload_id, offset, body, checksum):
+    return client.put(f"/api/uploads/{upload_id}", params={"offset": offset}, content=body,
+                      headers={"X-Chunk-SHA256": checksum, "Content-Type": "application/octet-stream"})
+
+
+def upload_with_faults(client, data: bytes, chunk_size: int, fault_rate: float, rng: random.Random):
+    stats = {"chunks": 0, "requests": 0, "bytes_sent": 0, "faults": {f: 0 for f in FAULTS}, "conflicts": 0}
+    r = client.post("/api/uploads", json={"filename": "bundle.pdf", "size": len(data), "sha256": sha256(data)})
+    assert r.status_code == 201, r.text
+    upload_id = r.json()["upload_id"]
+    offset = 0
+
+    while offset < len(data):
+        chunk = data[offset:offset + chunk_size]
+        checksum = sha256(chunk)
+        fault = rng.choice(FAULTS) if rng.random() < fault_rate else None
+        if fault:
+            stats["faults"][fault] += 1
+
+        if fault == "drop":
+            pass
+        elif fault in ("truncate", "corrupt"):
+            if fault == "truncate":
+                body = chunk[: max(1, len(chunk) // 3)]
+            else:
+                pos = rng.randrange(len(chunk))
+                body = chunk[:pos] + bytes([chunk[pos] ^ 0xFF]) + chunk[pos + 1:]
+            r = put_chunk(client, upload_id, offset, body, checksum)
+            stats["requests"] += 1
+            stats["bytes_sent"] += len(body)
+            assert r.status_code == 400, f"{fault}: expected 400, got {r.status_code} {r.text}"
+        else:
+            if fault == "restart":
+                server.resumable_uploads = ResumableUploads(server.resumable_uploads.directory)
+            r = put_chunk(client, upload_id, offset, chunk, checksum)
+            stats["requests"] += 1
+            stats["bytes_sent"] += len(chunk)
+            assert r.status_code == 200, r.text
+            stats["chunks"] += 1
+            if fault == "lost_ack":
+                # Client never saw the 200; it re-sends the same chunk, which must be acknowledged again
+                r = put_chunk(client, upload_id, offset, chunk, checksum)
+                stats["requests"] += 1
+                stats["bytes_sent"] += len(chunk)
+                assert r.status_code == 200, f"duplicate chunk: {r.status_code} {r.text}"
+                # ... and a stale offset that is not an exact duplicate is refused with the real offset
+                r = put_chunk(client, upload_id, offset, chunk[:-1], sha256(chunk[:-1]))
+                stats["requests"] += 1
+                assert r.status_code == 409 and "Upload-Offset" in r.headers, r.text
+                stats["conflicts"] += 1
+
+        if fault or rng.random() < 0.1:
+            # Resume from the server's committed offset, as a client does after any error
+            r = client.get(f"/api/uploads/{upload_id}")
+            stats["requests"] += 1
+            offset = int(r.headers["Upload-Offset"])
+        else:
+            offset = int(r.headers["Upload-Offset"])
+
+    r = client.post(f"/api/uploads/{upload_id}/complete")
+    stats["requests"] += 1
+    assert r.status_code == 200, r.text
+    return upload_id, r.json(), stats
+
+
+def leftovers():
+    found = []
+    for name in ("UPLOAD_DIR", "RESUMABLE_DIR"):
+        directory = os.environ[name]
+        if os.path.isdir(directory):
+            found += [e.name for e in os.scandir(directory) if e.is_file()]
+    return found
+
+
+def main(args):
+    pdf = make_tender_pdf(os.path.join(WORKDIR, "bundle.pdf"), args.pages, seed=args.seed)
+    with open(pdf, "rb") as f:
+        data = f.read()
+    digest = sha256(data)
+    chunk_size = args.chunk_kb * 1024
+    trials = []
+
+    with TestClient(server.app) as client:
+        for trial in range(args.trials):
+            rng = random.Random(args.seed + trial)
+            t0 = time.perf_counter()
+            upload_id, analysis, stats = upload_with_faults(client, data, chunk_size, args.fault_rate, rng)
+            stats["seconds"] = round(time.perf_counter() - t0, 3)
+            stats["overhead"] = round(stats["bytes_sent"] / len(data), 3)
+            stats["doc_id_ok"] = analysis.get("doc_id") == digest[:32]
+            stats["status_after_complete"] = client.get(f"/api/uploads/{upload_id}").status_code
+            trials.append(stats)
+            print(f"trial {trial}: {sum(stats['faults'].values())} faults, ok={stats['doc_id_ok']}", file=sys.stderr)
+
+    result = {
+        "file_bytes": len(data),
+        "pages": args.pages,
+        "chunk_bytes": chunk_size,
+        "fault_rate": args.fault_rate,
+        "trials": trials,
+        "faults_total": {f: sum(t["faults"][f] for t in trials) for f in FAULTS},
+        "all_ok": all(t["doc_id_ok"] and t["status_after_complete"] == 404 for t in trials) and not leftovers(),
+        "leftover_files": leftovers(),
+    }
+    print(json.dumps(result, indent=2))
+    if not result["all_ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=150)
+    parser.add_argument("--chunk-kb", type=int, default=16)
+    parser.add_argument("--fault-rate", type=float, default=0.3)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,170 @@
+import os
+import sys
+import random
+
+# Make the repo root importable when scripts are run as `python benchmarks/<script>.py`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from page_slicing import A4_WIDTH, A4_HEIGHT
+
+CLAUSES = [
+    "Bidder shall submit EMD of Rs. {n},000 through online mode only.",
+    "Minimum average annual turnover of Rs. {n} Lakhs during the last three financial years.",
+    "The bid submission end date is {d}-0{m}-2025 at 15:00 hrs.",
+    "Refer to Para {n}.{m} of Section III for experience criteria.",
+    "Annexure-{m}: Format of undertaking on company letter head.",
+    "Supply of PSC sleepers as per RDSO specification T-{n} in BG sections.",
+    "Payment of {n}% shall be released on receipt and acceptance of material.",
+    "The contract period shall be {m} months from the date of issue of LOA.",
+]
+
+
+def tender_line(rng: random.Random):
+    clause = rng.choice(CLAUSES)
+    return clause.format(n=rng.randint(10, 999), m=rng.randint(1, 9), d=rng.randint(10, 28))
+
+
+def make_tender_pdf(path: str, pages: int, seed: int = 0, lines_per_page: int = 44, inject=None):
+    """
+    Write a text-layer tender PDF with `pages` pages of clause-like lines.
+    inject: optional {page_no: [extra lines]} appended at the bottom of those pages.
+    """
+    inject = inject or {}
+    rng = random.Random(seed)
+    c = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    for page_no in range(1, pages + 1):
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(40, height - 40, f"SECTION {page_no}: TENDER DOCUMENT (synthetic seed {seed})")
+        c.setFont("Helvetica", 9)
+        y = height - 70
+        for i in range(lines_per_page):
+            c.drawString(40, y, f"{page_no}.{i + 1} {tender_line(rng)}")
+            y -= 16
+        for extra in inject.get(page_no, []):
+            c.drawString(40, y, extra)
+            y -= 16
+        c.showPage()
+    c.save()
+    return path
+
+
+def make_scanned_pdf(path: str, pages: int, seed: int = 0, lines_per_page: int = 44):
+    """Image-only variant of make_tender_pdf: every page is a greyscale scan, no text layer."""
+    rng = random.Random(seed)
+    c = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    for page_no in range(1, pages + 1):
+        scan = Image.new("L", (A4_WIDTH // 2, A4_HEIGHT // 2), 255)
+        draw = ImageDraw.Draw(scan)
+        draw.text((30, 25), f"SECTION {page_no}: TENDER DOCUMENT (scan seed {seed})", fill=0)
+        for i in range(lines_per_page):
+            draw.text((30, 50 + 18 * i), f"{page_no}.{i + 1} {tender_line(rng)}", fill=0)
+        c.drawImage(ImageReader(scan), 0, 0, width=width, height=height)
+        c.showPage()
+    c.save()
+    return path
+
+
+def make_boq_pdf(path: str, pages: int, seed: int = 0, rows: int = 36, text_pages_every: int = 3):
+    """
+    Tender with ruled BOQ tables: every `text_pages_every`-th page is plain clauses (as in
+    make_tender_pdf), the rest are a gridded schedule of quantities, one item per row.
+    """
+    rng = random.Random(seed)
+    c = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    cols = [40, 75, 330, 395, 450, 555]
+    for page_no in range(1, pages + 1):
+        c.setFont("Helvetica-Bold", 12)
+        if text_pages_every and page_no % text_pages_every == 0:
+            c.drawString(40, height - 40, f"SECTION {page_no}: CONDITIONS OF CONTRACT (seed {seed})")
+            c.setFont("Helvetica", 9)
+            for i in range(44):
+                c.drawString(40, height - 70 - 16 * i, f"{page_no}.{i + 1} {tender_line(rng)}")
+        else:
+            c.drawString(40, height - 40, f"SCHEDULE {page_no}: BILL OF QUANTITIES (seed {seed})")
+            c.setFont("Helvetica", 8)
+            ys = [height - 60 - 20 * i for i in range(rows + 2)]
+            c.grid(cols, ys)
+            header = ["S.No", "Item description", "Qty", "Unit", "Rate (Rs.)"]
+            for r in range(rows + 1):
+                cells = header if r == 0 else [
+                    str((page_no - 1) * rows + r),
+                    rng.choice(["PSC sleeper BG", "Elastic rail clip", "GFN liner", "Rubber pad", "Ballast 65mm"])
+                    + f" as per RDSO T-{rng.randint(10, 99)}",
+                    str(rng.randint(10, 9999)), rng.choice(["Nos", "Cum", "MT", "Set"]),
+                    f"{rng.randint(100, 99999)}.00",
+                ]
+                for x, cell in zip(cols, cells):
+                    c.drawString(x + 3, ys[r] - 14, cell)
+        c.showPage()
+    c.save()
+    return path
+
+
+def synthetic_screenshot(pages: int, seed: int):
+    """A report-like screenshot: section titles, tables with a dark label column, blank tail."""
+    rng = random.Random(seed)
+    height = pages * A4_HEIGHT
+    image = Image.new("RGB", (A4_WIDTH, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    y = 150
+    content_end = int(height * rng.uniform(0.75, 0.95))
+    while y < content_end:
+        draw.text((70, y), "SECTION TITLE", fill=(44, 82, 130))
+        y += 40
+        for _ in range(rng.randint(3, 8)):
+            lines = rng.randint(1, 7)
+            row_h = 18 * lines + 36
+            draw.rectangle((60, y, 450, y + row_h), fill=(45, 55, 72))        # th
+            draw.rectangle((450, y, A4_WIDTH - 60, y + row_h), fill=(250, 250, 250))  # td
+            draw.text((80, y + 18), "Field label", fill=(255, 255, 255))
+            for k in range(lines):
+                draw.text((470, y + 18 + 18 * k), "Tender value text " * rng.randint(2, 8), fill=(0, 0, 0))
+            draw.line((60, y + row_h, A4_WIDTH - 60, y + row_h), fill=(226, 232, 240), width=2)
+            y += row_h + 2
+        y += 30
+    return image
+
+
+def sample_analysis(seed: int = 0):
+    """An analysis dict shaped like analyze_document_text output, with the usual repetition."""
+    rng = random.Random(seed)
+    docs = ["PAN Card", "GST Registration Certificate", "EMD Exemption Certificate", "Experience Certificate",
+            "Audited Balance Sheet", "Affidavit on Non-Judicial Stamp Paper", "MSME Certificate", "Power of Attorney"]
+    return {
+        "Executive_Summary": f"Supply of PSC sleepers for BG sections (lot {rng.randint(1, 99)}). "
+                             "Bids are invited online from eligible manufacturers.",
+        "Tender_Reference": f"GEM/2025/B/{rng.randint(1000000, 9999999)}",
+        "Issuing_Authority": "Northern Railway",
+        "Project_Name": "Supply of PSC Sleepers",
+        "Location": "New Delhi",
+        "Scope_of_Work": "• PSC sleepers for BG\n• Monoblock & curve types\n• RDSO spec compliance",
+        "Contract_Period": "12 Months",
+        "Technical_Specifications": "As per RDSO specification T-39",
+        "Estimated_Value": "Not Specified",
+        "EMD_Amount": f"Rs. {rng.randint(1, 9)},00,000",
+        "Tender_Fee": "Not Specified",
+        "Payment_Terms": "Not Specified",
+        "Important_Dates": {
+            "Bid_Submission_Deadline": f"{rng.randint(10, 28)}-03-2025",
+            "Bid_Opening_Date": f"{rng.randint(10, 28)}-03-2025",
+            "Pre_Bid_Meeting": "Not Specified",
+        },
+        "Eligibility": {
+            "Min_Turnover": "Not Specified",
+            "Experience_Required": "Not Specified",
+            "Other_Eligibility_Criteria": "EMD Exemption",
+        },
+        "Required_Documents": rng.sample(docs, 6),
+        "Submission_Method": "Online",
+        "Contact_Details": "Not Specified",
+    }
@@ -0,0 +1,188 @@
+import os
+import asyncio
+import importlib.util
+
+# Warm headless Chromium pool for the screenshot report engine.
+# A fixed number of slots, each holding at most one long-lived browser. A render borrows a slot
+# (so at most `size` renders run at once), loads the HTML string with set_content and returns
+# the PNG bytes - nothing is written to disk. A browser is relaunched after `max_renders`
+# renders, once its process tree grows past `max_rss_mb`, or after a render step (new page,
+# set_content, screenshot) overruns `render_timeout` seconds.
+
+CHROME_BIN = os.getenv("CHROME_BIN", "")
+LAUNCH_ARGS = ['--no-sandbox', '--disable-gpu', '--disable-dev-shm-usage']
+VIEWPORT = (1240, 7016)  # same capture size as the Html2Image path: 4 * A4 height at 150 dpi
+CLOSE_TIMEOUT = 10  # seconds for page / browser close; a wedged browser must not hold a slot
+
+_MARKER = "--bidanalyzer-pool"  # tags our browser processes so their memory can be found in /proc
+
+
+def process_tree_rss(marker: str):
+    """Resident memory (bytes) of every process whose command line contains marker, plus descendants."""
+    if not os.path.isdir("/proc"):
+        return 0
+    parents, rss, roots = {}, {}, set()
+    page = os.sysconf("SC_PAGE_SIZE")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read().rsplit(b")", 1)[1].split()
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue  # exited while we were looking
+        parents[pid] = int(stat[1])
+        rss[pid] = int(stat[21]) * page
+        if marker.encode() in cmdline:
+            roots.add(pid)
+    total = 0
+    for pid in rss:
+        p = pid
+        while p and p not in roots:
+            p = parents.get(p)
+        if p:
+            total += rss[pid]
+    return total
+
+
+class BrowserWorker:
+    def __init__(self, browser, marker: str):
+        self.browser = browser
+        self.marker = marker
+        self.renders = 0
+
+    async def render(self, html: str, viewport, timeout: float):
+        # One deadline across the steps; each raises asyncio.TimeoutError once it has passed
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        remaining = lambda: max(0.0, deadline - loop.time())
+        page = await asyncio.wait_for(
+            self.browser.new_page(viewport={"width": viewport[0], "height": viewport[1]}), remaining())
+        try:
+            await asyncio.wait_for(page.set_content(html, wait_until="load"), remaining())
+            png = await asyncio.wait_for(page.screenshot(type="png"), remaining())
+        finally:
+            await asyncio.wait_for(page.close(), CLOSE_TIMEOUT)
+        self.renders += 1
+        return png
+
+    def rss_mb(self):
+        return process_tree_rss(self.marker) / (1024 * 1024)
+
+    async def close(self):
+        try:
+            await asyncio.wait_for(self.browser.close(), CLOSE_TIMEOUT)
+        except Exception as e:
+            print(f"Browser close failed: {e}")
+
+
+class BrowserPool:
+    def __init__(self, size: int, max_renders: int = 100, max_rss_mb: int = 768, render_timeout: float = 60,
+                 executable_path: str = None, viewport=VIEWPORT):
+        self.size = size
+        self.max_renders = max_renders
+        self.max_rss_mb = max_rss_mb
+        self.render_timeout = render_timeout
+        self.executable_path = executable_path if executable_path is not None else (CHROME_BIN or None)
+        self.viewport = viewport
+        # Playwright is optional (without it reports fall back to one Html2Image spawn per request)
+        # and only imported when the first browser starts
+        self.enabled = size > 0 and importlib.util.find_spec("playwright") is not None
+        self.renders = 0
+        self.launches = 0
+        self.recycled = {"renders": 0, "memory": 0, "timeout": 0, "error": 0}
+        self._playwright = None
+        self._slots = None
+        self._workers = set()
+        self._start_lock = None
+
+    async def _ensure_started(self):
+        if self._slots is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._slots is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self._slots = asyncio.Queue()
+                for _ in range(self.size):
+                    self._slots.put_nowait(None)  # browsers launch lazily, on first use of a slot
+
+    async def _launch(self):
+        marker = f"{_MARKER}={os.getpid()}-{self.launches}"
+        browser = await self._playwright.chromium.launch(
+            executable_path=self.executable_path,
+            args=LAUNCH_ARGS + [marker],
+        )
+        self.launches += 1
+        worker = BrowserWorker(browser, marker)
+        self._workers.add(worker)
+        return worker
+
+    async def _retire(self, worker: BrowserWorker, reason: str):
+        self.recycled[reason] += 1
+        self._workers.discard(worker)
+        await worker.close()
+
+    def _recycle_reason(self, worker: BrowserWorker):
+        if self.max_renders and worker.renders >= self.max_renders:
+            return "renders"
+        if self.max_rss_mb and worker.rss_mb() > self.max_rss_mb:
+            return "memory"
+        return None
+
+    async def render(self, html: str):
+        """Render an HTML string to PNG bytes on a pooled browser."""
+        try:
+            await self._ensure_started()
+        except Exception:
+            self.enabled = False  # no Playwright driver here; callers fall back to spawning
+            raise
+        slots = self._slots
+        worker = await slots.get()
+        try:
+            if worker is None:
+                try:
+                    worker = await self._launch()
+                except Exception:
+                    if not self.launches:
+                        self.enabled = False  # never managed to start a browser: stop trying
+                    raise
+            png = await worker.render(html, self.viewport, self.render_timeout)
+            self.renders += 1
+            reason = self._recycle_reason(worker)
+            if reason:
+                await self._retire(worker, reason)
+                worker = None
+            return png
+        except Exception as e:
+            # A crashed or wedged browser is dropped; the slot relaunches on next use
+            if worker is not None:
+                await self._retire(worker, "timeout" if isinstance(e, asyncio.TimeoutError) else "error")
+                worker = None
+            raise
+        finally:
+            slots.put_nowait(worker)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "browsers": len(self._workers),
+            "renders": self.renders,
+            "launches": self.launches,
+            "recycled": dict(self.recycled),
+        }
+
+    async def close(self):
+        for worker in list(self._workers):
+            await worker.close()
+        self._workers.clear()
+        self._slots = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
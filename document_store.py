@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import threading
+
+
+def json_array(items):
+    """Encode an iterable as a JSON array one item at a time (pages may come from a generator)."""
+    yield b"["
+    for i, item in enumerate(items):
+        yield (b"," if i else b"") + json.dumps(item, ensure_ascii=False).encode("utf-8")
+    yield b"]"
+
+
+class DocumentStore:
+    """
+    Server-side document sessions: extracted text + analysis kept on disk under a doc_id.
+    Entries expire `ttl_seconds` after their last access (sliding TTL).
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, sweep_interval: int = 300):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, doc_id: str, ext: str):
+        # doc ids are hex digests; refuse anything that could escape the store directory
+        if not doc_id or not all(c in "0123456789abcdef" for c in doc_id):
+            raise KeyError(doc_id)
+        return os.path.join(self.directory, f"{doc_id}{ext}")
+
+    def put(self, doc_id: str, text: str, analysis=None, pages=None):
+        # text=None: written from pages (join_pages layout), so callers never build the joined copy
+        if text is None:
+            text_payload = ((page + "\n").encode("utf-8") for page in pages if page)
+        else:
+            text_payload = text.encode("utf-8")
+        with self._lock:
+            self._write(self._path(doc_id, ".txt"), text_payload)
+            if analysis is not None:
+                self._write(self._path(doc_id, ".json"), json.dumps(analysis, ensure_ascii=False).encode("utf-8"))
+            if pages is not None:
+                self._write(self._path(doc_id, ".pages.json"), json_array(pages))
+        self.sweep()
+        return doc_id
+
+    def _write(self, path: str, payload):
+        # payload: bytes, or an iterable of bytes written piece by piece
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            if isinstance(payload, bytes):
+                f.write(payload)
+            else:
+                f.writelines(payload)
+        os.replace(tmp_path, path)
+
+    def _read(self, doc_id: str, ext: str):
+        try:
+            path = self._path(doc_id, ext)
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, "rb") as f:
+                payload = f.read()
+        except (OSError, KeyError):
+            return None
+        self._touch(doc_id)
+        return payload
+
+    def _touch(self, doc_id: str):
+        # Sliding expiry: any access keeps text and analysis alive together
+        for ext in (".txt", ".json", ".pages.json"):
+            try: os.utime(self._path(doc_id, ext), None)
+            except OSError: pass
+
+    def refresh(self, doc_id: str):
+        """True if the document is still stored (and extends its TTL)."""
+        try:
+            path = self._path(doc_id, ".txt")
+            alive = time.time() - os.path.getmtime(path) <= self.ttl_seconds
+        except (OSError, KeyError):
+            return False
+        if alive:
+            self._touch(doc_id)
+        return alive
+
+    def get_text(self, doc_id: str):
+        payload = self._read(doc_id, ".txt")
+        return payload.decode("utf-8") if payload is not None else None
+
+    def get_pages(self, doc_id: str):
+        """Per-page text (index 0 = page 1), or None if the document had no text layer."""
+        payload = self._read(doc_id, ".pages.json")
+        return json.loads(payload.decode("utf-8")) if payload is not None else None
+
+    def get_analysis(self, doc_id: str):
+        payload = self._read(doc_id, ".json")
+        return json.loads(payload.decode("utf-8")) if payload is not None else None
+
+    def sweep(self, force: bool = False):
+        # Opportunistic eviction, at most once per sweep_interval
+        now = time.time()
+        if not force and now - self._last_sweep < self.sweep_interval:
+            return 0
+        self._last_sweep = now
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl_seconds:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,96 @@
+import os
+import asyncio
+import threading
+from functools import partial
+from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from profiler import follow
+
+# Execution layer: keeps blocking work off the uvicorn event loop.
+# CPU-bound work (PDF extraction, image slicing) -> one bounded process pool.
+# I/O-bound provider calls (Gemini, translator, Chromium) -> one bounded thread pool per stage,
+# so a burst of slow Gemini uploads cannot starve translations or report renders.
+
+# Extraction fans page ranges out over this pool, so by default it is as wide as EXTRACT_WORKERS
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1))))
+
+STAGE_LIMITS = {
+    "llm": int(os.getenv("LLM_WORKERS", "8")),              # generate_content, file upload + polling
+    "ask": int(os.getenv("ASK_WORKERS", "4")),              # /api/ask answers, never queued behind analyses
+    "translate": int(os.getenv("TRANSLATE_WORKERS", "16")), # GoogleTranslator requests, process-wide cap
+    "index": int(os.getenv("INDEX_WORKERS", "2")),          # Q&A chunking + BM25 index builds (in-process cache)
+    "ingest": int(os.getenv("INGEST_WORKERS", "4")),        # streaming uploads into spool files
+    "render": int(os.getenv("RENDER_WORKERS", "2")),        # Chromium screenshots (memory heavy)
+    "storage": int(os.getenv("STORAGE_WORKERS", "4")),      # disk cache / document store reads and writes
+}
+
+_cpu_pool = None
+_io_pools = {}
+_fork_lock = threading.Lock()  # held while the CPU pool forks and while preload() imports
+
+
+def _get_cpu_pool():
+    # Created lazily so importing server.py stays cheap and workers fork from a fully loaded module
+    global _cpu_pool
+    if _cpu_pool is None:
+        with _fork_lock:
+            if _cpu_pool is None:
+                pool = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+                pool.submit(int)  # fork the workers now, while no import is half done
+                _cpu_pool = pool
+    return _cpu_pool
+
+
+def preload(modules):
+    """
+    Import heavy modules ahead of first use (background warm-up after startup).
+    Shares the fork lock with the CPU pool, so workers are never forked from a half-imported
+    module; workers forked afterwards inherit everything loaded here.
+    """
+    with _fork_lock:
+        for name in modules:
+            try:
+                import_module(name)
+            except ImportError as e:
+                print(f"Warm-up: {name} not available ({e})")
+
+
+def _get_io_pool(stage: str):
+    pool = _io_pools.get(stage)
+    if pool is None:
+        if stage not in STAGE_LIMITS:
+            raise ValueError(f"Unknown execution stage: {stage}")
+        pool = ThreadPoolExecutor(max_workers=STAGE_LIMITS[stage], thread_name_prefix=f"io-{stage}")
+        _io_pools[stage] = pool
+    return pool
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run a picklable, module-level function in the shared process pool."""
+    loop = asyncio.get_running_loop()
+    # First call may wait for a running preload(): do that off the event loop
+    pool = _cpu_pool or await loop.run_in_executor(None, _get_cpu_pool)
+    return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+
+
+async def run_io(stage: str, fn, *args, **kwargs):
+    """Run a blocking I/O call in the thread pool reserved for `stage`."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_pool(stage), follow(partial(fn, *args, **kwargs)))
+
+
+def submit_io(stage: str, fn, *args, **kwargs):
+    """Synchronous counterpart of run_io for non-async callers; returns a concurrent Future.
+    Never call .result() on it from a thread of the same stage pool."""
+    return _get_io_pool(stage).submit(follow(partial(fn, *args, **kwargs)))
+
+
+def shutdown():
+    global _cpu_pool
+    for pool in _io_pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _io_pools.clear()
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+
+# Upload ingestion, the first stage of every analysis.
+# The upload is streamed in chunks into a uniquely named spool file while its SHA-256 and size
+# are computed on the fly. The size cap is enforced as bytes arrive, the PDF header is checked
+# as soon as the first kilobyte is in and the page count right after the copy, so oversized or
+# non-PDF uploads are turned away before any extraction or LLM work starts.
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", ".cache/uploads")
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "100"))
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+MAX_UPLOAD_PAGES = int(os.getenv("MAX_UPLOAD_PAGES", "0"))  # 0 = no cap
+CHUNK_SIZE = 1024 * 1024
+PDF_MAGIC = b"%PDF-"
+HEADER_WINDOW = 1024  # PDF readers accept the header anywhere in the first 1 KB
+STALE_SPOOL_SECONDS = 6 * 3600
+
+# Resumable uploads (init -> PUT chunks at byte offsets -> complete) for bundles too large to
+# survive one multipart POST over a flaky link. Each session is a .part file plus a JSON
+# sidecar holding the committed offset and per-chunk SHA-256s, so it survives restarts.
+RESUMABLE_DIR = os.getenv("RESUMABLE_DIR", os.path.join(UPLOAD_DIR, "resumable"))
+RESUMABLE_CHUNK_MB = float(os.getenv("RESUMABLE_CHUNK_MB", "4"))      # suggested to clients
+RESUMABLE_MAX_CHUNK_MB = float(os.getenv("RESUMABLE_MAX_CHUNK_MB", "16"))
+RESUMABLE_TTL_HOURS = float(os.getenv("RESUMABLE_TTL_HOURS", "24"))  # since the last chunk
+
+
+class UploadRejected(Exception):
+    """Upload refused during ingestion; status_code is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SpooledUpload:
+    def __init__(self, path: str, sha256: str, size: int, filename: str):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.filename = filename
+        self.pages = None
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def check_header(head: bytes):
+    if PDF_MAGIC not in head[:HEADER_WINDOW]:
+        raise UploadRejected(415, "Only PDF documents are supported (missing %PDF header).")
+
+
+def check_size(size: int, max_bytes: int = MAX_UPLOAD_BYTES):
+    if max_bytes and size > max_bytes:
+        raise UploadRejected(413, f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit.")
+
+
+def check_pages(pages: int, max_pages: int = MAX_UPLOAD_PAGES):
+    if not pages:
+        raise UploadRejected(422, "The PDF has no readable pages.")
+    if max_pages and pages > max_pages:
+        raise UploadRejected(413, f"The PDF has {pages} pages; the limit is {max_pages}.")
+
+
+def spool_stream(read, directory: str = UPLOAD_DIR, max_bytes: int = MAX_UPLOAD_BYTES,
+                 filename: str = "upload.pdf", chunk_size: int = CHUNK_SIZE):
+    """
+    Copy read(n) chunks into a new spool file under `directory`, hashing as they pass.
+    Returns a SpooledUpload; on rejection the partial file is removed and UploadRejected raised.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}.pdf")
+    sha = hashlib.sha256()
+    size, head, header_ok = 0, b"", False
+    try:
+        with open(path, "xb") as out:
+            for chunk in iter(lambda: read(chunk_size), b""):
+                size += len(chunk)
+                check_size(size, max_bytes)
+                if not header_ok:
+                    head += chunk[:HEADER_WINDOW - len(head)]
+                    if len(head) >= HEADER_WINDOW:
+                        check_header(head)
+                        header_ok = True
+                sha.update(chunk)
+                out.write(chunk)
+        if not size:
+            raise UploadRejected(400, "The uploaded file is empty.")
+        if not header_ok:
+            check_header(head)  # files smaller than the header window
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return SpooledUpload(path, sha.hexdigest(), size, os.path.basename(filename or "upload.pdf"))
+
+
+def sweep_spool(directory: str = UPLOAD_DIR, max_age: float = STALE_SPOOL_SECONDS):
+    """Remove spool files a crashed or killed process left behind."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+class ResumableUploads:
+    """
+    Chunked upload sessions. Chunks are appended strictly in order: a PUT must start at the
+    committed offset, except an exact re-send of an already stored chunk, which is acknowledged
+    again (the client lost our response). Each chunk is checked against its SHA-256 before it
+    is written and fsynced before the offset advances, so the offset never covers bad bytes.
+    """
+
+    def __init__(self, directory: str = RESUMABLE_DIR, max_bytes: int = MAX_UPLOAD_BYTES,
+                 chunk_size: int = int(RESUMABLE_CHUNK_MB * 1024 * 1024),
+                 max_chunk: int = int(RESUMABLE_MAX_CHUNK_MB * 1024 * 1024),
+                 ttl_seconds: float = RESUMABLE_TTL_HOURS * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.max_chunk = max_chunk
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._session_locks = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, upload_id: str, ext: str):
+        # ids are uuid hex; refuse anything else so the id can't escape the directory
+        if len(upload_id) != 32 or not all(c in "0123456789abcdef" for c in upload_id):
+            raise UploadRejected(404, "Upload not found.")
+        return os.path.join(self.directory, upload_id + ext)
+
+    def _session_lock(self, upload_id: str):
+        with self._lock:
+            return self._session_locks.setdefault(upload_id, threading.Lock())
+
+    def _load(self, upload_id: str):
+        try:
+            with open(self._path(upload_id, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadRejected(404, "Upload not found or expired.")
+
+    def _save(self, state: dict):
+        path = self._path(state["upload_id"], ".json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def create(self, filename: str, size: int, sha256: str = None):
+        if not size or size < 0:
+            raise UploadRejected(400, "Declare the total upload size in bytes.")
+        check_size(size, self.max_bytes)
+        upload_id = uuid.uuid4().hex
+        open(self._path(upload_id, ".part"), "xb").close()
+        state = {
+            "upload_id": upload_id,
+            "filename": os.path.basename(filename or "upload.pdf"),
+            "size": size,
+            "sha256": (sha256 or "").lower() or None,
+            "offset": 0,
+            "chunks": [],  # [offset, length, sha256] per committed chunk
+            "created_at": time.time(),
+        }
+        self._save(state)
+        return self.describe(state)
+
+    def describe(self, state: dict):
+        return {
+            "upload_id": state["upload_id"],
+            "filename": state["filename"],
+            "size": state["size"],
+            "offset": state["offset"],
+            "chunks": len(state["chunks"]),
+            "chunk_size": self.chunk_size,
+            "max_chunk": self.max_chunk,
+            "complete": state["offset"] == state["size"],
+        }
+
+    def status(self, upload_id: str):
+        return self.describe(self._load(upload_id))
+
+    def write_chunk(self, upload_id: str, offset: int, data: bytes, checksum: str):
+        if not checksum:
+            raise UploadRejected(400, "Missing chunk checksum (X-Chunk-SHA256).")
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != checksum.strip().lower():
+            raise UploadRejected(400, "Chunk checksum mismatch; resend the chunk.")
+        with self._session_lock(upload_id):
+            state = self._load(upload_id)
+            if offset < state["offset"]:
+                if [offset, len(data), digest] in state["chunks"]:
+                    return self.describe(state)  # duplicate of a stored chunk
+                raise UploadRejected(409, f"Offset {offset} does not match the committed offset {state['offset']}.")
+            if offset != state["offset"]:
+                raise UploadRejected(409, f"Offset {offset} does not match the committed offset {state['offset']}.")
+            if not data:
+                raise UploadRejected(400, "Empty chunk.")
+            if len(data) > self.max_chunk:
+                raise UploadRejected(413, f"Chunks are limited to {self.max_chunk} bytes.")
+            if offset + len(data) > state["size"]:
+                raise UploadRejected(413, "Chunk runs past the declared upload size.")
+            if offset == 0 and (len(data) >= HEADER_WINDOW or len(data) == state["size"]):
+                check_header(data)
+            with open(self._path(upload_id, ".part"), "r+b") as f:
+                f.seek(offset)
+                f.write(data)
+                f.truncate()  # drop bytes a crash left past the committed offset
+                f.flush()
+                os.fsync(f.fileno())
+            state["offset"] = offset + len(data)
+            state["chunks"].append([offset, len(data), digest])
+            self._save(state)
+            return self.describe(state)
+
+    def complete(self, upload_id: str, directory: str = UPLOAD_DIR):
+        """
+        Verify size (and the declared whole-file digest) and move the file into `directory`
+        as a SpooledUpload for the normal analyze path. The session is gone afterwards.
+        """
+        with self._session_lock(upload_id):
+            state = self._load(upload_id)
+            if state["offset"] != state["size"]:
+                raise UploadRejected(409, f"Upload incomplete: {state['offset']} of {state['size']} bytes received.")
+            part = self._path(upload_id, ".part")
+            sha = hashlib.sha256()
+            with open(part, "rb") as f:
+                check_header(f.read(HEADER_WINDOW))
+                f.seek(0)
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    sha.update(chunk)
+            sha_hex = sha.hexdigest()
+            if state["sha256"] and state["sha256"] != sha_hex:
+                self._remove(upload_id)
+                raise UploadRejected(422, "Reassembled file does not match the declared SHA-256.")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{upload_id}.pdf")
+            shutil.move(part, path)
+            self._remove(upload_id)
+        return SpooledUpload(path, sha_hex, state["size"], state["filename"])
+
+    def abort(self, upload_id: str):
+        with self._session_lock(upload_id):
+            self._load(upload_id)  # 404 for unknown ids
+            self._remove(upload_id)
+
+    def _remove(self, upload_id: str):
+        for ext in (".part", ".json"):
+            try:
+                os.remove(self._path(upload_id, ext))
+            except OSError:
+                pass
+        with self._lock:
+            self._session_locks.pop(upload_id, None)
+
+    def sweep(self):
+        """Drop sessions that have not received a chunk within the TTL."""
+        return sweep_spool(self.directory, self.ttl_seconds)
@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+
+from execution import run_io
+
+# Background analysis jobs.
+# The queue lives in SQLite so queued/interrupted jobs survive a restart; a fixed number of
+# asyncio workers drain it. Progress events are persisted too, so an SSE client that
+# reconnects (or connects late) gets the full history replayed. Finished jobs and their events
+# are pruned `ttl_seconds` after their last update, at startup and every `prune_interval`.
+# SQLite work runs on the "storage" pool; writes are chained so they still commit in the order
+# they were reported, and SSE waiters are woken only once an event is committed.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,          -- queued | running | done | failed
+    stage TEXT,
+    detail TEXT,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    stage TEXT NOT NULL,
+    detail TEXT,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+TERMINAL = ("done", "failed")
+
+
+class JobManager:
+    def __init__(self, db_path: str, workers: int, handler, ttl_seconds: int = 24 * 3600, prune_interval: int = 3600):
+        """handler: async fn(job: dict, report) -> JSON-serialisable result."""
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.workers = workers
+        self.handler = handler
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval = prune_interval
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at)")
+        self._lock = threading.Lock()
+        self._secrets = {}     # job_id -> api key; never written to disk
+        self._latest = {}      # job_id -> seq of the newest event committed by this process
+        self._changed = {}     # job_id -> asyncio.Event, set when _latest moves
+        self._writes = None    # tail of the write chain
+        self._wakeup = None
+        self._tasks = []
+
+    # --- persistence -------------------------------------------------------------------------
+
+    def _execute(self, sql: str, args=()):
+        with self._lock:
+            return self._db.execute(sql, args)
+
+    async def submit(self, payload: dict, secret: str = None):
+        job_id = uuid.uuid4().hex
+        if secret:
+            self._secrets[job_id] = secret
+        await self._chain(job_id, "queued", "", payload=json.dumps(payload))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str):
+        row = self._execute(
+            "SELECT id, status, stage, detail, payload, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "stage": row[2],
+            "detail": row[3],
+            "payload": json.loads(row[4]),
+            "result": json.loads(row[5]) if row[5] else None,
+            "error": row[6],
+            "created_at": row[7],
+            "updated_at": row[8],
+        }
+
+    def events_since(self, job_id: str, seq: int = 0):
+        rows = self._execute(
+            "SELECT seq, ts, stage, detail FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, seq),
+        ).fetchall()
+        return [{"seq": r[0], "ts": r[1], "stage": r[2], "detail": r[3]} for r in rows]
+
+    def secret(self, job_id: str):
+        return self._secrets.get(job_id)
+
+    def prune(self):
+        """Delete finished jobs (and their events) last updated more than ttl_seconds ago; returns their ids."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = f"SELECT id FROM jobs WHERE status IN ({', '.join('?' * len(TERMINAL))}) AND updated_at < ?"
+        args = (*TERMINAL, cutoff)
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            removed = [row[0] for row in self._db.execute(expired, args).fetchall()]
+            self._db.execute(f"DELETE FROM job_events WHERE job_id IN ({expired})", args)
+            self._db.execute(f"DELETE FROM jobs WHERE id IN ({expired})", args)
+        return removed
+
+    # --- progress ---------------------------------------------------------------------------
+
+    def report(self, job_id: str, stage: str, detail: str = ""):
+        """Record a progress event. Must be called on the event loop thread; returns without waiting for the write."""
+        self._chain(job_id, stage, detail).add_done_callback(_log_failed_write)
+
+    def _chain(self, job_id: str, stage: str, detail: str, **changes):
+        # Queue one _record call behind the previous write; the returned task resolves once it is committed
+        prev = self._writes
+
+        async def write():
+            if prev is not None:
+                await asyncio.wait([prev])
+            seq = await run_io("storage", self._record, job_id, stage, detail, **changes)
+            self._notify(job_id, seq)
+
+        self._writes = asyncio.ensure_future(write())
+        return self._writes
+
+    def _record(self, job_id: str, stage: str, detail: str, payload: str = None, finish: tuple = None):
+        # One transaction: the new job row (payload) or final status (finish), plus the event
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            if payload is not None:
+                self._db.execute(
+                    "INSERT INTO jobs (id, status, stage, payload, created_at, updated_at) VALUES (?, 'queued', 'queued', ?, ?, ?)",
+                    (job_id, payload, now, now),
+                )
+            if finish is not None:
+                self._db.execute("UPDATE jobs SET status = ?, result = ?, error = ? WHERE id = ?", (*finish, job_id))
+            seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)).fetchone()[0]
+            self._db.execute("INSERT INTO job_events (job_id, seq, ts, stage, detail) VALUES (?, ?, ?, ?, ?)",
+                             (job_id, seq, now, stage, detail))
+            self._db.execute("UPDATE jobs SET stage = ?, detail = ?, updated_at = ? WHERE id = ?", (stage, detail, now, job_id))
+        return seq
+
+    def _notify(self, job_id: str, seq: int = None):
+        if seq is None:
+            self._latest.pop(job_id, None)
+        else:
+            self._latest[job_id] = seq
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_change(self, job_id: str, seq: int, timeout: float):
+        """Return once an event after `seq` is committed (at once if one already is), or after `timeout`."""
+        if self._latest.get(job_id, 0) > seq:
+            return
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # --- workers ----------------------------------------------------------------------------
+
+    def _claim_next(self):
+        with self._lock:
+            row = self._db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+            if row is None:
+                return None
+            claimed = self._db.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), row[0]),
+            ).rowcount
+        return self.get(row[0]) if claimed else None
+
+    async def _finish(self, job_id: str, status: str, result=None, error: str = None):
+        self._secrets.pop(job_id, None)
+        await self._chain(job_id, status, error or "",
+                          finish=(status, json.dumps(result) if result is not None else None, error))
+
+    async def _worker(self):
+        while True:
+            job = await run_io("storage", self._claim_next)
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            job_id = job["job_id"]
+            self.report(job_id, "running")
+            try:
+                result = await self.handler(job, lambda stage, detail="": self.report(job_id, stage, detail))
+                await self._finish(job_id, "done", result=result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                await self._finish(job_id, "failed", error=str(e))
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        # Jobs that were running when the process died go back to the queue
+        requeued = (await run_io("storage", self._execute, "UPDATE jobs SET status = 'queued' WHERE status = 'running'")).rowcount
+        if requeued:
+            print(f"Requeued {requeued} interrupted job(s)")
+        self._wakeup.set()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._pruner()))
+
+    async def _pruner(self):
+        while True:
+            removed = await run_io("storage", self.prune)
+            for job_id in removed:
+                self._notify(job_id)  # open event streams see the job gone and close
+            if removed:
+                print(f"Pruned {len(removed)} finished job(s)")
+            await asyncio.sleep(self.prune_interval)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._writes is not None:
+            await asyncio.wait([self._writes])  # let queued progress events commit
+
+
+def _log_failed_write(task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Job event not recorded: {task.exception()}")
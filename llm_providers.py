@@ -0,0 +1,416 @@
+import os
+import re
+import json
+import time
+import random
+import mimetypes
+import threading
+from collections import OrderedDict
+
+try:
+    from groq import Groq
+except ImportError:  # optional: only needed when "groq" is in LLM_PROVIDERS
+    Groq = None
+
+from retrieval import tokenize
+from metrics import LLM_CALLS, track_stage
+
+# LLM provider layer.
+# Every backend exposes the same two calls: complete(system, user) for prompts and
+# analyze_file(path, prompt) for documents the model has to read itself (scanned PDFs).
+# LLMRouter wraps an ordered list of providers with per-call timeouts, retries with jittered
+# exponential backoff, and failover: a provider that keeps failing or has become slow is moved
+# behind the healthy ones until it recovers. "local" is a deterministic stand-in for offline
+# load tests (LLM_PROVIDERS=local).
+
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS", "gemini,groq")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))            # seconds per provider call
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))                # extra attempts per provider
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+LLM_SLOW_SECONDS = float(os.getenv("LLM_SLOW_SECONDS", "60"))   # EWMA latency above this = degraded
+LLM_COOLDOWN_SECONDS = float(os.getenv("LLM_COOLDOWN_SECONDS", "60"))
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_CLIENT_CACHE = 32  # per-key SDK clients kept alive (one per distinct X-API-Key)
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+LOCAL_LLM_LATENCY = float(os.getenv("LOCAL_LLM_LATENCY", "0"))  # simulated seconds per call
+
+
+class ProviderUnavailable(Exception):
+    """Provider cannot be used at all (missing key / SDK / capability); never retried."""
+
+
+class ProviderError(Exception):
+    pass
+
+
+REJECTED_STATUS = (400, 401, 403, 404, 422)  # bad key / permission / invalid request
+
+
+def is_rejected(e: Exception):
+    """
+    The provider refused this request (auth, permission, invalid argument). Retrying cannot help
+    and it says nothing about the provider's health: often it is one user's bad X-API-Key.
+    google.api_core errors carry the HTTP status in .code, groq / openai-style ones in .status_code.
+    """
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(e, "code", None)
+    return isinstance(status, int) and status in REJECTED_STATUS
+
+
+def parse_json(text: str):
+    clean = text.strip()
+    if clean.startswith("```json"): clean = clean[7:]
+    elif clean.startswith("```"): clean = clean[3:]
+    if clean.endswith("```"): clean = clean[:-3]
+    return json.loads(clean)
+
+
+# --- backends -------------------------------------------------------------------------------
+
+def _genai():
+    # google.generativeai takes ~0.7 s to import; only pay for it on the first Gemini call
+    import google.generativeai as genai
+    return genai
+
+
+class GeminiProvider:
+    name = "gemini"
+    supports_files = True
+
+    def __init__(self, model: str = GEMINI_MODEL, api_key: str = None):
+        self.model = model
+        self.api_key = (api_key if api_key is not None else os.getenv("GEMINI_API_KEY") or "").strip()
+        self._clients = OrderedDict()  # key -> (generative client, file client)
+        self._lock = threading.Lock()
+
+    def available(self, api_key=None):
+        return bool(api_key or self.api_key)
+
+    def _clients_for(self, api_key):
+        # Never genai.configure(): that sets one process-wide client, and calls from concurrent
+        # pool threads with different X-API-Keys would race on it. Each key gets its own clients.
+        key = api_key or self.api_key
+        if not key:
+            raise ProviderUnavailable("Gemini API key missing")
+        with self._lock:
+            clients = self._clients.get(key)
+            if clients is not None:
+                self._clients.move_to_end(key)
+                return clients
+        genai = _genai()
+        from google.ai import generativelanguage as glm
+        from google.generativeai.client import FileServiceClient
+        options = {"api_key": key}
+        clients = (glm.GenerativeServiceClient(client_options=options), FileServiceClient(client_options=options))
+        with self._lock:
+            self._clients[key] = clients
+            while len(self._clients) > GEMINI_CLIENT_CACHE:
+                self._clients.popitem(last=False)
+        return clients
+
+    def _model(self, generative_client):
+        model = _genai().GenerativeModel(self.model)
+        model._client = generative_client  # otherwise it falls back to the shared default client
+        return model
+
+    def complete(self, system: str, user: str, json_mode: bool, api_key=None, timeout: float = LLM_TIMEOUT):
+        generative_client, _ = self._clients_for(api_key)
+        parts = [system, user] if system else [user]
+        return self._model(generative_client).generate_content(parts, request_options={"timeout": timeout}).text
+
+    def analyze_file(self, file_path: str, prompt: str, api_key=None, timeout: float = LLM_TIMEOUT, progress=None):
+        generative_client, file_client = self._clients_for(api_key)
+        genai = _genai()
+        deadline = time.monotonic() + timeout
+        if progress: progress("uploading", self.name)
+        mime_type = mimetypes.guess_type(file_path)[0] or "application/pdf"
+        sample_file = genai.types.File(file_client.create_file(path=file_path, mime_type=mime_type, display_name="Tender_Doc"))
+
+        polls = 0
+        with track_stage("gemini_poll"):
+            while sample_file.state.name == "PROCESSING":
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Gemini file processing timed out")
+                polls += 1
+                if progress: progress("polling", f"attempt {polls}")
+                time.sleep(1)
+                sample_file = genai.types.File(file_client.get_file(name=sample_file.name))
+
+        if sample_file.state.name == "FAILED":
+            raise ValueError("Gemini failed to process the file upload.")
+
+        if progress: progress("generating", self.name)
+        remaining = max(1.0, deadline - time.monotonic())
+        return self._model(generative_client).generate_content([sample_file, prompt], request_options={"timeout": remaining}).text
+
+
+class GroqProvider:
+    name = "groq"
+    supports_files = False
+
+    def __init__(self, model: str = GROQ_MODEL, api_key: str = None):
+        self.model = model
+        self.api_key = (api_key if api_key is not None else os.getenv("GROQ_API_KEY") or "").strip()
+        self._client = None
+
+    def available(self, api_key=None):
+        return Groq is not None and bool(self.api_key)
+
+    def complete(self, system: str, user: str, json_mode: bool, api_key=None, timeout: float = LLM_TIMEOUT):
+        if not self.available():
+            raise ProviderUnavailable("Groq SDK or GROQ_API_KEY missing")
+        if self._client is None:
+            # Retries are the router's job
+            self._client = Groq(api_key=self.api_key, max_retries=0)
+        messages = ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": user}]
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        completion = self._client.chat.completions.create(
+            model=self.model, messages=messages, temperature=0.1, timeout=timeout, **kwargs
+        )
+        return completion.choices[0].message.content
+
+    def analyze_file(self, *args, **kwargs):
+        raise ProviderUnavailable("Groq cannot read files")
+
+
+_MONEY = r"(?:Rs\.?|INR|₹)\s*[\d,]+(?:\.\d+)?(?:\s*(?:Lakhs?|Crores?))?"
+_PATTERNS = {
+    "Tender_Reference": r"\b(GEM/\d{4}/B/\d+|(?:Tender|NIT|Bid)\s*(?:No|Number|Ref)\.?\s*[:\-]?\s*[\w/\-.]+)",
+    "EMD_Amount": r"EMD[^.\n]{0,40}?(" + _MONEY + ")",
+    "Tender_Fee": r"(?:Tender|Document)\s+Fee[^.\n]{0,40}?(" + _MONEY + ")",
+    "Estimated_Value": r"(?:Estimated|Approximate)\s+(?:Value|Cost)[^.\n]{0,40}?(" + _MONEY + ")",
+    "Contract_Period": r"(?:contract|completion)\s+period[^.\n]{0,30}?(\d+\s*(?:months?|days?|years?))",
+    "Min_Turnover": r"turnover[^.\n]{0,40}?(" + _MONEY + ")",
+}
+_DATE = re.compile(r"\b(\d{1,2}[-/.]\d{1,2}[-/.]\d{4})\b")
+
+
+def local_analysis(text: str):
+    """Deterministic analysis JSON (same schema as the real prompt) from regex hits in the text."""
+    found = {}
+    for field, pattern in _PATTERNS.items():
+        m = re.search(pattern, text, re.IGNORECASE)
+        found[field] = (m.group(1) if m else "Not Specified").strip()
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+|\n", text) if len(s.strip()) > 20]
+    dates = _DATE.findall(text)
+    return {
+        "Executive_Summary": " ".join(sentences[:2])[:400] or "Not Specified",
+        "Tender_Reference": found["Tender_Reference"],
+        "Issuing_Authority": "Not Specified",
+        "Project_Name": sentences[0][:120] if sentences else "Not Specified",
+        "Location": "Not Specified",
+        "Scope_of_Work": "\n".join("• " + s[:120] for s in sentences[:3]) or "Not Specified",
+        "Contract_Period": found["Contract_Period"],
+        "Technical_Specifications": "Not Specified",
+        "Estimated_Value": found["Estimated_Value"],
+        "EMD_Amount": found["EMD_Amount"],
+        "Tender_Fee": found["Tender_Fee"],
+        "Payment_Terms": "Not Specified",
+        "Important_Dates": {
+            "Bid_Submission_Deadline": dates[0] if dates else "Not Specified",
+            "Bid_Opening_Date": dates[1] if len(dates) > 1 else "Not Specified",
+            "Pre_Bid_Meeting": "N/A",
+        },
+        "Eligibility": {
+            "Min_Turnover": found["Min_Turnover"],
+            "Experience_Required": "Not Specified",
+            "Other_Eligibility_Criteria": "Not Specified",
+        },
+        "Required_Documents": [],
+        "Submission_Method": "Online" if re.search(r"\bonline\b", text, re.IGNORECASE) else "Not Specified",
+        "Contact_Details": "Not Specified",
+    }
+
+
+def local_answer(prompt: str):
+    """Extractive answer: the context line sharing most terms with the question."""
+    context, _, question = prompt.rpartition("Question:")
+    question = question.strip().splitlines()[0] if question.strip() else ""
+    terms = set(tokenize(question))
+    best, best_score, page = "", 0, None
+    current_page = None
+    for line in context.splitlines():
+        tag = re.match(r"\s*\[Page (\d+)\]", line)
+        if tag:
+            current_page = tag.group(1)
+        score = len(terms & set(tokenize(line)))
+        if score > best_score:
+            best, best_score, page = line.strip(), score, current_page
+    if not best:
+        return "The answer is not in the provided context."
+    return best + (f" (Page {page})" if page else "")
+
+
+class LocalProvider:
+    name = "local"
+    supports_files = True
+
+    def __init__(self, latency: float = LOCAL_LLM_LATENCY):
+        self.model = "local-extractive"
+        self.latency = latency
+
+    def available(self, api_key=None):
+        return True
+
+    def complete(self, system: str, user: str, json_mode: bool, api_key=None, timeout: float = LLM_TIMEOUT):
+        if self.latency:
+            time.sleep(self.latency)
+        return json.dumps(local_analysis(user)) if json_mode else local_answer(user)
+
+    def analyze_file(self, file_path: str, prompt: str, api_key=None, timeout: float = LLM_TIMEOUT, progress=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return json.dumps(local_analysis(os.path.basename(file_path)))
+
+
+PROVIDERS = {"gemini": GeminiProvider, "groq": GroqProvider, "local": LocalProvider}
+
+
+# --- routing --------------------------------------------------------------------------------
+
+class _Health:
+    def __init__(self):
+        self.ewma = None          # seconds, successful calls only
+        self.failures = 0         # consecutive
+        self.down_until = 0.0
+        self.calls = 0
+        self.errors = 0
+
+
+class LLMRouter:
+    def __init__(self, providers, timeout: float = LLM_TIMEOUT, retries: int = LLM_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX,
+                 slow_after: float = LLM_SLOW_SECONDS, cooldown: float = LLM_COOLDOWN_SECONDS):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = list(providers)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.slow_after = slow_after
+        self.cooldown = cooldown
+        self._health = {p.name: _Health() for p in self.providers}
+        self._lock = threading.Lock()
+
+    def signature(self):
+        # Goes into analysis cache keys: a different provider chain may answer differently
+        return ",".join(f"{p.name}:{p.model}" for p in self.providers)
+
+    def available(self, api_key=None):
+        return any(p.available(api_key) for p in self.providers)
+
+    def _ordered(self, api_key, need_files: bool):
+        now = time.monotonic()
+        healthy, degraded = [], []
+        with self._lock:
+            for p in self.providers:
+                if (need_files and not p.supports_files) or not p.available(api_key):
+                    continue
+                h = self._health[p.name]
+                if h.down_until > now or (h.ewma is not None and h.ewma > self.slow_after):
+                    degraded.append((h.ewma or 0.0, p))
+                else:
+                    healthy.append(p)
+        # Configured order among healthy providers; degraded ones last, fastest first
+        return healthy + [p for _, p in sorted(degraded, key=lambda d: d[0])]
+
+    def _record(self, name: str, elapsed: float = None, failed: bool = False):
+        with self._lock:
+            h = self._health[name]
+            h.calls += 1
+            if failed:
+                h.errors += 1
+                h.failures += 1
+                if h.failures >= 3:
+                    h.down_until = time.monotonic() + self.cooldown
+            else:
+                h.failures = 0
+                h.down_until = 0.0
+                h.ewma = elapsed if h.ewma is None else 0.3 * elapsed + 0.7 * h.ewma
+
+    def _run(self, call, api_key, need_files: bool, progress=None):
+        candidates = self._ordered(api_key, need_files)
+        if not candidates:
+            raise ProviderError("No LLM provider available (check API keys / LLM_PROVIDERS)")
+        errors = []
+        for provider in candidates:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    # Full jitter: spreads retries from concurrent requests
+                    time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))))
+                    if progress: progress("retrying", f"{provider.name} attempt {attempt + 1}")
+                t0 = time.monotonic()
+                try:
+                    result = call(provider)
+                except ProviderUnavailable as e:
+                    errors.append(f"{provider.name}: {e}")
+                    break
+                except Exception as e:
+                    if is_rejected(e):
+                        # Not retried and not counted against the provider's health (no cooldown
+                        # for everyone because of one bad key); the next provider may still accept it
+                        LLM_CALLS.observe(time.monotonic() - t0, provider.name, "rejected")
+                        errors.append(f"{provider.name}: {e}")
+                        print(f"LLM {provider.name} rejected the request: {e}")
+                        break
+                    LLM_CALLS.observe(time.monotonic() - t0, provider.name, "error")
+                    self._record(provider.name, failed=True)
+                    errors.append(f"{provider.name}: {e}")
+                    print(f"LLM {provider.name} attempt {attempt + 1} failed: {e}")
+                    continue
+                elapsed = time.monotonic() - t0
+                LLM_CALLS.observe(elapsed, provider.name, "ok")
+                self._record(provider.name, elapsed)
+                if elapsed > self.slow_after:
+                    print(f"LLM {provider.name} slow: {elapsed:.1f}s")
+                return result
+            if progress and provider is not candidates[-1]:
+                progress("failover", provider.name)
+        raise ProviderError("All LLM providers failed: " + "; ".join(errors[-4:]))
+
+    def complete(self, system: str, user: str, json_mode: bool = False, api_key=None, progress=None):
+        """Text answer, or the parsed object when json_mode is set (bad JSON counts as a failure)."""
+        def call(provider):
+            if progress: progress("generating", provider.name)
+            text = provider.complete(system, user, json_mode, api_key=api_key, timeout=self.timeout)
+            if not json_mode:
+                return text
+            if progress: progress("parsing", provider.name)
+            return parse_json(text)
+        return self._run(call, api_key, need_files=False, progress=progress)
+
+    def analyze_file(self, file_path: str, prompt: str, api_key=None, progress=None):
+        def call(provider):
+            text = provider.analyze_file(file_path, prompt, api_key=api_key, timeout=self.timeout, progress=progress)
+            if progress: progress("parsing", provider.name)
+            return parse_json(text)
+        return self._run(call, api_key, need_files=True, progress=progress)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    "calls": h.calls,
+                    "errors": h.errors,
+                    "ewma_latency_s": round(h.ewma, 3) if h.ewma is not None else None,
+                    "down": h.down_until > time.monotonic(),
+                }
+                for name, h in self._health.items()
+            }
+
+
+def build_router(names: str = None, **kwargs):
+    """LLMRouter from a comma-separated provider list (defaults to LLM_PROVIDERS)."""
+    providers = []
+    for name in (names or LLM_PROVIDERS).split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {name}. Use one of: {', '.join(PROVIDERS)}")
+        providers.append(PROVIDERS[name]())
+    return LLMRouter(providers, **kwargs)
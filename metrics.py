@@ -0,0 +1,181 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# In-process metrics in the Prometheus text exposition format (served at /metrics).
+# Every label combination is its own series with its own lock, so recording is a bisect plus a
+# few integer bumps under an uncontended lock; the registry lock is only taken the first time a
+# series appears. CPU-pool work runs in child processes, so stages are timed around the await
+# in the parent, never inside the worker.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _get(self, labels):
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, self._new_series())
+        return series
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, series in sorted(self._series.items()):
+            lines.extend(self._render_series(labels, series))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _Value()
+
+    def inc(self, *labels, amount=1):
+        series = self._get(labels)
+        with series.lock:
+            series.value += amount
+
+    def _render_series(self, labels, series):
+        yield f"{self.name}{_labels(self.labelnames, labels)} {_number(series.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        series = self._get(labels)
+        with series.lock:
+            series.value = value
+
+
+class _Buckets:
+    __slots__ = ("counts", "sum", "lock")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_series(self):
+        return _Buckets(len(self.buckets) + 1)  # last slot is +Inf
+
+    def observe(self, value: float, *labels):
+        series = self._get(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with series.lock:
+            series.counts[idx] += 1
+            series.sum += value
+
+    def _render_series(self, labels, series):
+        with series.lock:
+            counts, total = list(series.counts), series.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="%s"' % _number(bound)
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+        yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+def register_collector(fn):
+    """fn() -> [(name, kind, help, labelnames, {label tuple: value})], read at scrape time.
+    For values other objects already count (cache hits, pool sizes)."""
+    _collectors.append(fn)
+    return fn
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+            continue
+        for name, kind, help, labelnames, samples in families:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_labels(labelnames, labels)} {_number(value)}" for labels, value in sorted(samples.items())]
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- application metrics ------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter("bidanalyzer_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("bidanalyzer_http_request_duration_seconds", "Time to response headers by route template.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("bidanalyzer_http_requests_in_flight", "HTTP requests currently being handled.")
+STAGE_LATENCY = Histogram("bidanalyzer_stage_duration_seconds", "Pipeline stage latency.", ("stage",))
+STAGE_IN_FLIGHT = Gauge("bidanalyzer_stage_in_flight", "Pipeline stage calls currently running.", ("stage",))
+LLM_CALLS = Histogram("bidanalyzer_llm_call_duration_seconds", "Single provider attempts (retries count separately).", ("provider", "outcome"))
+STAGE_ERRORS = Counter("bidanalyzer_stage_errors_total", "Pipeline stage calls that raised.", ("stage",))
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Time a pipeline stage (works around sync code and around awaits)."""
+    STAGE_IN_FLIGHT.inc(stage)
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - t0, stage)
+        STAGE_IN_FLIGHT.dec(stage)
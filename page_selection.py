@@ -0,0 +1,87 @@
+import os
+import re
+import string
+
+# Relevance-ranked page selection for the analysis prompt.
+# Instead of the first N pages, every page is scored for tender-field signals (EMD, turnover,
+# bid dates, eligibility, BOQ, annexures, clause numbers ...) and the prompt is built from the
+# highest-scoring pages that fit in ANALYSIS_CHAR_BUDGET, kept in document order. Documents
+# that fit whole go in unchanged; otherwise each chosen page is tagged "--- Page N ---" so the
+# model (and the reader of analyzed_pages) knows where the gaps are.
+
+ANALYSIS_CHAR_BUDGET = int(os.getenv("ANALYSIS_CHAR_BUDGET", "100000"))  # ~25k tokens
+SIGNAL_CAP = 3          # repeats of one signal beyond this add nothing (boilerplate pages)
+FIRST_PAGE_BONUS = 5.0  # cover / NIT page: reference, authority, title
+
+# (phrases, weight). Pages are lower-cased with punctuation and whitespace runs collapsed to one
+# space, so phrases are matched with plain str.count (C speed, where a case-insensitive regex
+# per signal was ~5x slower). Leading/trailing spaces in a phrase act as word boundaries.
+PAGE_SIGNALS = [
+    ((" emd ", " earnest money", " bid security"), 5.0),
+    ((" estimated cost", " estimated value", " advertised value", " put to tender"), 4.0),
+    ((" turnover", " net worth", " financial standing", " financial capacity"), 4.0),
+    ((" bid submission", " bid opening", " bid due", " closing date", " due date", " end date", " last date"), 4.0),
+    ((" tender no ", " tender number", " tender id ", " tender ref", " nit no ", " reference no ", " gem 20"), 3.0),
+    ((" eligibility", " qualifying criteria", " qualification criteria", " similar work", " similar nature", " experience"), 3.0),
+    ((" tender fee", " document fee", " document cost", " cost of tender"), 3.0),
+    ((" performance security", " performance guarantee", " security deposit"), 3.0),
+    ((" contract period", " completion period", " delivery period"), 3.0),
+    ((" bill of quantities", " boq ", " schedule of rates", " schedule of quantities", " price bid"), 3.0),
+    ((" annexure", " appendix", " proforma"), 2.0),
+    ((" pre bid", " prebid", " payment terms"), 2.0),
+    ((" rs ", " inr ", " lakh", " crore", "₹"), 1.0),
+]
+# Shapes a phrase can't express, run on the raw page text
+PATTERN_SIGNALS = [
+    (re.compile(r"\b\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}\b"), 1.0),                  # dates
+    (re.compile(r"^\s*(?:clause\s+)?\d+(?:\.\d+)+\s", re.I | re.M), 0.5),     # clause numbers
+]
+SEPARATORS = str.maketrans({c: " " for c in string.punctuation + "\u2013\u2014\u2018\u2019\u201c\u201d\u2022"})
+
+
+def score_page(text: str, page_number: int = 0):
+    if not text or not text.strip():
+        return 0.0
+    normalized = " " + " ".join(text.lower().translate(SEPARATORS).split()) + " "
+    score = sum(weight * min(sum(normalized.count(p) for p in phrases), SIGNAL_CAP) for phrases, weight in PAGE_SIGNALS)
+    score += sum(weight * min(len(pattern.findall(text)), SIGNAL_CAP) for pattern, weight in PATTERN_SIGNALS)
+    return score + (FIRST_PAGE_BONUS if page_number == 1 else 0.0)
+
+
+def page_marker(page_number: int):
+    return f"--- Page {page_number} ---\n"
+
+
+def select_pages(pages, budget: int = ANALYSIS_CHAR_BUDGET):
+    """
+    pages: page texts (index 0 = page 1). Returns (chosen page numbers in document order,
+    {page number: score}). Pages are taken best-first (ties: earlier page) while they fit.
+    """
+    scores = {n: score_page(text, n) for n, text in enumerate(pages, start=1)}
+    nonempty = [n for n, text in enumerate(pages, start=1) if text and text.strip()]
+    if sum(len(pages[n - 1]) + 1 for n in nonempty) <= budget:
+        return nonempty, scores
+
+    chosen, used = [], 0
+    for n in sorted(nonempty, key=lambda n: (-scores[n], n)):
+        size = len(page_marker(n)) + len(pages[n - 1]) + 1
+        if used + size <= budget:
+            chosen.append(n)
+            used += size
+    if not chosen and nonempty:
+        chosen = [min(nonempty, key=lambda n: (-scores[n], n))]  # one page bigger than the budget
+    return sorted(chosen), scores
+
+
+def select_context(pages, budget: int = ANALYSIS_CHAR_BUDGET):
+    """
+    Prompt text for the analysis plus a report of the choice:
+    {"analyzed_pages": [...], "total_pages": n, "chars": len(text)}.
+    """
+    chosen, _ = select_pages(pages, budget)
+    if len(chosen) == sum(1 for text in pages if text and text.strip()):
+        text = "".join(pages[n - 1] + "\n" for n in chosen)  # same layout as join_pages
+    else:
+        text = "".join(page_marker(n) + pages[n - 1] + "\n" for n in chosen)
+    text = text[:budget]  # only bites when a single page is larger than the budget
+    return text, {"analyzed_pages": chosen, "total_pages": len(pages), "chars": len(text)}
@@ -0,0 +1,85 @@
+import numpy as np
+from PIL import Image, ImageOps
+
+# Page-break planning for the screenshot report engine.
+# The break heuristic only ever reads 42 sample columns of the tall screenshot, so those are
+# pulled out once into a (rows, 42, 3) array and profiled in a single vectorized pass:
+# per-row uniformity / whiteness for cut points, and per-row "ink" for blank-page detection.
+# Cut points and blank checks are then lookups into the profiles instead of per-pixel
+# getpixel calls and a grayscale/invert/getbbox pass over every page.
+
+A4_WIDTH = 1240
+A4_HEIGHT = 1754
+
+SAMPLE_START, SAMPLE_STOP, SAMPLE_STEP = 200, 1040, 20  # centre 70% of the row, ignores side backgrounds
+UNIFORM_TOLERANCE = 40             # max brightness (R+G+B) difference from the first sample
+WHITE_BRIGHTNESS = 650             # uniform rows brighter than this are preferred cuts
+SCAN_UP = 600                      # how far above the A4 limit to look for a break
+MIN_PAGE = 100                     # never cut closer than this to the page top
+
+
+def sample_columns(image):
+    """(height, 42, 3) uint8 array of the sampled columns x = 200, 220, ..., 1020."""
+    width, height = image.size
+    count = len(range(SAMPLE_START, SAMPLE_STOP, SAMPLE_STEP))
+    # NEAREST samples output column i at box_left + (i + 0.5) * step, i.e. exactly 200 + 20 * i;
+    # much cheaper than converting the whole screenshot to an array
+    box = (SAMPLE_START - SAMPLE_STEP // 2, 0, SAMPLE_START - SAMPLE_STEP // 2 + count * SAMPLE_STEP, height)
+    return np.asarray(image.resize((count, height), Image.NEAREST, box=box))
+
+
+def row_profiles(samples):
+    """
+    Returns (uniform, white, ink_prefix):
+      uniform[y]     the sampled centre band of row y is uniform in brightness
+      white[y]       ... and it is light (a whitespace row)
+      ink_prefix[y]  number of rows above y with a sampled pixel that is not white in grayscale
+    """
+    wide = samples.astype(np.int32)
+    brightness = wide.sum(axis=2)
+    first = brightness[:, :1]
+    uniform = (np.abs(brightness - first) <= UNIFORM_TOLERANCE).all(axis=1)
+    white = uniform & (first[:, 0] > WHITE_BRIGHTNESS)
+
+    # Same integer ITU-R 601 transform PIL uses for convert("L"), so ink agrees with getbbox
+    luma = (wide[..., 0] * 19595 + wide[..., 1] * 38470 + wide[..., 2] * 7471 + 0x8000) >> 16
+    ink = (luma != 255).any(axis=1)
+    ink_prefix = np.concatenate(([0], np.cumsum(ink)))
+    return uniform, white, ink_prefix
+
+
+def find_cut(uniform, white, current_y: int, limit_y: int):
+    # Scan upwards in 2px steps: the first white row wins, otherwise the highest uniform row
+    scan_end = max(current_y + MIN_PAGE, limit_y - SCAN_UP)
+    ys = np.arange(limit_y, scan_end, -2)
+    if not len(ys):
+        return limit_y
+    hits = np.flatnonzero(white[ys])
+    if len(hits):
+        return int(ys[hits[0]])
+    hits = np.flatnonzero(uniform[ys])
+    if len(hits):
+        return int(ys[hits[-1]])
+    return limit_y  # Fallback to hard cut
+
+
+def page_has_content(image, top: int, bottom: int):
+    # Exact check on the full A4-wide crop: any pixel that is not white in grayscale
+    return ImageOps.invert(image.crop((0, top, A4_WIDTH, bottom)).convert("L")).getbbox() is not None
+
+
+def plan_page_breaks(image):
+    """(top, bottom) row ranges of the non-blank A4 pages to cut from an RGB screenshot."""
+    height = image.size[1]
+    uniform, white, ink_prefix = row_profiles(sample_columns(image))
+
+    pages = []
+    current_y = 0
+    while current_y < height:
+        limit_y = min(current_y + A4_HEIGHT, height)
+        cut_y = limit_y if limit_y == height else find_cut(uniform, white, current_y, limit_y)
+        # Ink in the samples settles it; only sample-blank pages (usually the tail) get the full check
+        if ink_prefix[cut_y] > ink_prefix[current_y] or page_has_content(image, current_y, cut_y):
+            pages.append((current_y, cut_y))
+        current_y = cut_y
+    return pages
@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Page-range text extraction. Each worker opens its own handle on a contiguous slice of
+# pages; results are stitched back together in page order.
+# Backends: "pdfium" reads the text layer straight from PDFium (pypdfium2, already installed
+# with pdfplumber), which is dozens of times faster than pdfplumber's full character layout.
+# "pdfplumber" is the old behaviour. "auto" (default) uses PDFium but hands pages with ruled
+# tables (BOQs, fee schedules) to pdfplumber, which keeps a table row on one line where PDFium
+# splits it at wide cell gaps. Both libraries are imported where they are used: these functions
+# run in the CPU pool, so the API process itself never has to load them at startup.
+
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "0"))   # 0 = no cap; page_selection bounds the prompt
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+MIN_PAGES_PER_WORKER = 4  # below this, process startup/handle opening costs more than it saves
+EXTRACT_BACKEND = os.getenv("EXTRACT_BACKEND", "auto")
+EXTRACT_BACKENDS = ("auto", "pdfium", "pdfplumber")
+# "auto" layout test: straight path segments on the page. Ruled tables need at least
+# LAYOUT_MIN_RULES; above LAYOUT_MAX_RULES it is a drawing, where pdfplumber is slow and gains nothing.
+LAYOUT_MIN_RULES = int(os.getenv("EXTRACT_LAYOUT_MIN_RULES", "16"))
+LAYOUT_MAX_RULES = 4000
+
+
+def resolve_backend(name: str = None):
+    """Validated backend name; None means EXTRACT_BACKEND. Raises ValueError for unknown names."""
+    backend = (name or EXTRACT_BACKEND).strip().lower()
+    if backend not in EXTRACT_BACKENDS:
+        raise ValueError(f"Unknown extraction backend '{name}' (expected one of: {', '.join(EXTRACT_BACKENDS)})")
+    return backend
+
+
+def count_pages(file_path: str):
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def plan_page_ranges(n_pages: int, workers: int):
+    """Split [0, n_pages) into at most `workers` contiguous (start, stop) ranges."""
+    if n_pages <= 0:
+        return []
+    workers = max(1, min(workers, n_pages // MIN_PAGES_PER_WORKER or 1))
+    step, extra = divmod(n_pages, workers)
+    ranges, start = [], 0
+    for i in range(workers):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def pdfium_text(page):
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_range()
+    finally:
+        textpage.close()
+    # PDFium ends lines with CRLF and marks hyphens at line breaks with U+0002
+    return text.replace("\r\n", "\n").replace("\r", "\n").replace("\x02", "-").strip()
+
+
+def ruling_segments(page, limit: int = LAYOUT_MAX_RULES):
+    """Path segments on the page (lines, rectangles, curves), counted up to just past `limit`."""
+    import pypdfium2.raw as pdfium_c
+    total = 0
+    for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH], max_depth=2):
+        total += max(0, pdfium_c.FPDFPath_CountSegments(obj.raw))
+        if total > limit:
+            break
+    return total
+
+
+def needs_layout(page):
+    return LAYOUT_MIN_RULES <= ruling_segments(page) <= LAYOUT_MAX_RULES
+
+
+def iter_page_texts(file_path: str, start: int = 0, stop: int = None, backend: str = None):
+    """
+    Yield (page_number, text) for pages [start, stop) (page_number is 1-based), reading one page
+    at a time. Each page's parsed objects are released before the next page is read, so memory
+    stays flat however long the document is; nothing is kept once the caller moves on.
+    """
+    backend = resolve_backend(backend)
+    if backend == "pdfplumber":
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            for index, page in enumerate(pdf.pages[start:stop], start=start):
+                try:
+                    text = page.extract_text() or ""
+                finally:
+                    page.close()  # drops the cached chars/objects/layout of this page
+                yield index + 1, text
+        return
+
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(file_path)
+    plumber = None  # opened on the first page that needs the layout pass
+    try:
+        stop = len(pdf) if stop is None else min(stop, len(pdf))
+        for index in range(start, stop):
+            page = pdf[index]
+            try:
+                layout = backend == "auto" and needs_layout(page)
+                text = "" if layout else pdfium_text(page)
+            finally:
+                page.close()
+            if layout:
+                if plumber is None:
+                    import pdfplumber
+                    plumber = pdfplumber.open(file_path)
+                plumber_page = plumber.pages[index]
+                try:
+                    text = plumber_page.extract_text() or ""
+                finally:
+                    plumber_page.close()
+            yield index + 1, text
+    finally:
+        pdf.close()
+        if plumber is not None:
+            plumber.close()
+
+
+def extract_page_range(file_path: str, start: int, stop: int, backend: str = None):
+    """Worker entry point: text of pages [start, stop) from a fresh handle, one string per page."""
+    return [text for _, text in iter_page_texts(file_path, start, stop, backend)]
+
+
+def join_pages(texts):
+    # Same layout the serial extractor always produced: non-empty pages, newline-terminated
+    return "".join(text + "\n" for text in texts if text)
+
+
+def extract_pages_parallel(file_path: str, max_pages: int = None, workers: int = None, executor=None, backend: str = None):
+    """Extract page texts in page order using up to `workers` processes."""
+    backend = resolve_backend(backend)
+    max_pages = EXTRACT_MAX_PAGES if max_pages is None else max_pages
+    workers = EXTRACT_WORKERS if workers is None else workers
+
+    n_pages = count_pages(file_path)
+    if max_pages:
+        n_pages = min(n_pages, max_pages)
+    ranges = plan_page_ranges(n_pages, workers)
+    if len(ranges) <= 1:
+        return extract_page_range(file_path, 0, n_pages, backend)
+
+    own_pool = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=len(ranges))
+    try:
+        futures = [pool.submit(extract_page_range, file_path, a, b, backend) for a, b in ranges]
+        texts = []
+        for f in futures:
+            texts.extend(f.result())
+        return texts
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def extract_text_parallel(file_path: str, max_pages: int = None, workers: int = None, executor=None, backend: str = None):
+    return join_pages(extract_pages_parallel(file_path, max_pages, workers, executor, backend))
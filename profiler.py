@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import contextvars
+from collections import Counter
+
+# On-demand request profiling.
+# While one request runs, a background thread samples Python stacks every few milliseconds.
+# io-* stage pool threads are sampled only while they run a call submitted by the profiled
+# request (run_io / submit_io wrap calls with follow()). The event loop and the anyio threads
+# for sync routes are shared by every request, so those samples are process-wide; the saved
+# metadata says so. Stacks are written in the collapsed format ("root;caller;callee count"),
+# which speedscope.app, flamegraph.pl and inferno all read. Nothing here runs unless a request
+# asks for it. Work in the CPU process pool happens in child processes and shows up only as
+# the event loop awaiting it.
+
+PROFILE_SUFFIX = ".collapsed"
+THREAD_SCOPE = {"event-loop": "process-wide", "AnyIO": "process-wide", "io-*": "profiled request only"}
+
+_active = contextvars.ContextVar("active_profiler", default=None)  # set for the profiled request's tasks
+
+
+def follow(call):
+    """Wrap a call bound for a pool thread so the submitting request's profiler samples that thread while it runs."""
+    profiler = _active.get()
+    if profiler is None:
+        return call
+
+    def run():
+        ident = threading.get_ident()
+        profiler.attached.add(ident)
+        try:
+            return call()
+        finally:
+            profiler.attached.discard(ident)
+    return run
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def is_idle(stack):
+    # Pool threads parked waiting for work are not part of any request
+    leaf = stack[-1]
+    return leaf.startswith("_worker (thread.py:") or any(f.startswith("get (queue.py:") for f in stack)
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, thread_prefixes=("AnyIO", "io-")):
+        self.interval = interval
+        self.loop_ident = threading.get_ident()  # created on the event loop thread
+        self.thread_prefixes = thread_prefixes
+        self.samples = Counter()
+        self.attached = set()  # io-* thread idents currently running this request's work
+        self.ticks = 0
+        self._token = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = self.stopped = None
+
+    def _sample(self):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            name = "event-loop" if ident == self.loop_ident else names.get(ident, "")
+            if ident == me or not name.startswith(self.thread_prefixes + ("event-loop",)):
+                continue
+            if name.startswith("io-") and ident not in self.attached:
+                continue  # another request's stage work
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            if stack and not is_idle(stack):
+                # Pool threads are numbered (io-llm_0, io-llm_1 ...); fold them into one root
+                self.samples[";".join([name.rsplit("_", 1)[0]] + stack)] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            self._sample()
+
+    def start(self):
+        # Tasks created from here on (the request) inherit the context, and with it this profiler
+        self._token = _active.set(self)
+        self.started = time.time()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.time()
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        return self
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """Collapsed-stack files plus a small JSON sidecar, one pair per profiled request."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, profile_id: str):
+        # ids are uuid hex; refuse anything else so the id can't escape the directory
+        if len(profile_id) != 32 or not all(c in "0123456789abcdef" for c in profile_id):
+            return None
+        return os.path.join(self.directory, profile_id + PROFILE_SUFFIX)
+
+    def save(self, profiler: SamplingProfiler, meta: dict):
+        profile_id = uuid.uuid4().hex
+        base = os.path.join(self.directory, profile_id)
+        with open(base + PROFILE_SUFFIX, "w", encoding="utf-8") as f:
+            f.write(profiler.collapsed())
+        meta = dict(meta, id=profile_id, started=profiler.started,
+                    duration_s=round(profiler.stopped - profiler.started, 4),
+                    interval_s=profiler.interval, ticks=profiler.ticks,
+                    samples=sum(profiler.samples.values()), thread_scope=THREAD_SCOPE)
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return profile_id
+
+    def meta(self, profile_id: str):
+        path = self.path(profile_id)
+        if not path:
+            return None
+        try:
+            with open(path[: -len(PROFILE_SUFFIX)] + ".json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
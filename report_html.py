@@ -0,0 +1,187 @@
+import os
+import base64
+from html import escape
+
+from report_layout import TEMPLATE_IMAGE, report_sections
+
+# HTML layout for the screenshot report engine.
+# The page skeleton (bound str.format templates) and CSS are compiled once; the background template is base64-encoded once
+# and only re-read when the file changes. Rendering a report is field substitution with every
+# value HTML-escaped. Sections and row filtering come from report_layout.report_sections, so both
+# engines show the same fields.
+
+CSS_TOP = """
+    <style>
+        body {
+            font-family: 'Segoe UI', Tahoma, sans-serif;
+            margin: 0; padding: 0;
+            background-color: #ffffff;
+        }
+
+        .page-container {
+            position: relative;
+            width: 1240px;
+            min-height: 1754px;
+    """
+
+CSS_BOTTOM = """
+            background-repeat: no-repeat;
+            background-size: 1240px 1754px; /* A4 dimensions */
+            box-sizing: border-box;
+            padding: 100px 80px 60px 80px;
+            display: flex;
+            flex-direction: column;
+        }
+
+        h1 {
+            text-align: center;
+            color: #1a202c;
+            font-size: 3.5rem;
+            margin: 0 0 40px 0;
+            font-weight: 900;
+            text-transform: uppercase;
+            letter-spacing: 2px;
+            text-shadow: 2px 2px 4px rgba(255,255,255,1);
+        }
+
+        .exec-summary {
+            background: rgba(255, 255, 255, 0.95);
+            padding: 30px 35px;
+            border-radius: 12px;
+            margin-bottom: 35px;
+            border-left: 8px solid #4c51bf;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.08);
+        }
+        .exec-summary h4 { color: #4c51bf; margin: 0 0 15px 0; font-size: 1.8rem; border-bottom: 2px solid #e2e8f0; padding-bottom: 10px; }
+        .exec-summary p { font-size: 1.4rem; line-height: 1.6; color: #1a202c; font-weight: 500; margin: 0; }
+
+        .section-header {
+            color: #2c5282;
+            font-size: 1.8rem;
+            font-weight: 800;
+            margin: 25px 0 15px 0;
+            border-bottom: 3px solid #aecdbf;
+            padding-bottom: 8px;
+            text-transform: uppercase;
+            page-break-after: avoid;
+        }
+
+        table {
+            width: 100%;
+            border-collapse: separate;
+            border-spacing: 0;
+            margin-bottom: 20px;
+            font-size: 1.4rem;
+            border-radius: 8px;
+            overflow: hidden;
+            page-break-inside: avoid;
+        }
+        th { background: #2d3748; color: white; padding: 18px 20px; text-align: left; font-weight: 700; width: 35%; border-bottom: 2px solid #ed8936; }
+        td { background: rgba(255, 255, 255, 0.95); color: #000; padding: 18px 20px; border-bottom: 2px solid #e2e8f0; font-weight: 500; }
+        tr:last-child td { border-bottom: none; }
+
+        /* Force page break before certain sections if needed */
+        .page-break-before {
+            page-break-before: always;
+            margin-top: 0;
+        }
+    </style>
+    """
+
+PAGE = """
+    <html>
+    <head>{css}</head>
+    <body>
+        <div class="page-container">
+            <h1>Bid Analysis Report</h1>
+
+            <div class="exec-summary">
+                <h4>Executive Summary</h4>
+                <p>{summary}</p>
+            </div>
+{sections}
+        </div>
+    </body>
+    </html>
+    """.format
+
+SECTION = """
+            <div class="section-header">{title}</div>
+            <table{style}>
+                <tr><th>Field</th><th>Value</th></tr>
+                {rows}
+            </table>
+""".format
+
+ROW = "<tr><td>{label}</td><td>{value}</td></tr>".format
+
+# Extra spacing keeps these tables clear of the background template's footer
+SECTION_STYLES = {
+    "Financials": ' style="margin-bottom: 60px;"',
+    "Important Dates": ' style="margin-bottom: 80px;"',
+    "Eligibility Criteria": ' style="margin-bottom: 60px;"',
+}
+# Long free-text fields are cut so the report fits the fixed-height screenshot
+VALUE_LIMITS = {"Required Docs": 400}
+
+_assets = {}  # path -> ((mtime_ns, size), base64 text)
+_css = {}     # asset stamp -> compiled <style> block
+
+
+def asset_base64(path: str):
+    """(stamp, base64 text) of a file, re-read only when its mtime/size changes; (None, "") if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, ""
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _assets.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "rb") as f:
+            cached = (stamp, base64.b64encode(f.read()).decode("ascii"))
+        _assets[path] = cached
+    return cached
+
+
+def page_css():
+    stamp, bg_base64 = asset_base64(TEMPLATE_IMAGE)
+    css = _css.get(stamp)
+    if css is None:
+        if bg_base64:
+            bg_rule = "background-image: url('data:image/png;base64," + bg_base64 + "');"
+        else:
+            bg_rule = "background-color: #ffffff;"
+        _css.clear()  # only the current template version is worth keeping
+        css = _css[stamp] = CSS_TOP + bg_rule + CSS_BOTTOM
+    return css
+
+
+def warm_assets():
+    page_css()
+
+
+def format_value(value, limit: int = 0):
+    if isinstance(value, list):
+        text = "\n".join("• " + str(item) for item in value)
+    elif isinstance(value, dict):
+        text = "\n".join(f"{k}: {v}" for k, v in value.items())
+    else:
+        text = str(value)
+    if limit and len(text) > limit:
+        text = text[:limit] + "..."
+    return escape(text).replace("\n", "<br>")
+
+
+def generate_formatted_html(data):
+    sections = []
+    for title, rows in report_sections(data):
+        rendered = "".join(
+            ROW(label=escape(label), value=format_value(value, VALUE_LIMITS.get(label, 0)))
+            for label, value in rows
+        )
+        sections.append(SECTION(title=escape(title), style=SECTION_STYLES.get(title, ""), rows=rendered))
+    return PAGE(
+        css=page_css(),
+        summary=format_value(data.get('Executive_Summary', 'N/A')),
+        sections="".join(sections),
+    )
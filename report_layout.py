@@ -0,0 +1,63 @@
+import re
+
+# Report content shared by both engines (report_html for screenshots, report_pdf for vector PDFs):
+# which sections and rows a report has, and which values are hidden. No rendering library is
+# imported here, so the API server can load it without pulling in ReportLab.
+
+TEMPLATE_IMAGE = "Bidalert template.png"
+
+HIDE_VALUES = ('not specified', 'n/a', 'null', 'undefined', 'none')
+_HIDDEN = re.compile("|".join(re.escape(hide) for hide in HIDE_VALUES))  # one scan instead of five
+
+
+def should_show_value(val):
+    if not val or val is None:
+        return False
+    return _HIDDEN.search(str(val).lower()) is None
+
+
+def _eligibility(data, key):
+    elig = data.get('Eligibility')
+    if isinstance(elig, dict):
+        return elig.get(key, '')
+    return data.get(key, '')
+
+
+def report_sections(data):
+    """
+    The report layout shared by the engines: [(section title, [(label, value), ...])].
+    Rows with empty / "Not Specified"-style values are dropped.
+    """
+    dates = data.get('Important_Dates')
+    date_rows = list(dates.items()) if isinstance(dates, dict) else []
+    sections = [
+        ("Basic Information", [
+            ("Tender Reference", data.get('Tender_Reference', '')),
+            ("Issuing Authority", data.get('Issuing_Authority', '')),
+            ("Project Name", data.get('Project_Name', '')),
+            ("Location", data.get('Location', '')),
+        ]),
+        ("Project Details", [
+            ("Scope of Work", data.get('Scope_of_Work', '')),
+            ("Contract Period", data.get('Contract_Period', '')),
+            ("Technical Specifications", data.get('Technical_Specifications', '')),
+        ]),
+        ("Financials", [
+            ("Estimated Value", data.get('Estimated_Value', '')),
+            ("EMD Amount", data.get('EMD_Amount', '')),
+            ("Tender Fee", data.get('Tender_Fee', '')),
+            ("Payment Terms", data.get('Payment_Terms', '')),
+        ]),
+        ("Important Dates", [(label.replace('_', ' '), value) for label, value in date_rows]),
+        ("Eligibility Criteria", [
+            ("Min Turnover", _eligibility(data, 'Min_Turnover')),
+            ("Experience Required", _eligibility(data, 'Experience_Required')),
+            ("Other Criteria", _eligibility(data, 'Other_Eligibility_Criteria')),
+            ("Required Docs", data.get('Required_Documents', '')),
+        ]),
+        ("Submission Information", [
+            ("Submission Method", data.get('Submission_Method', '')),
+            ("Contact Details", data.get('Contact_Details', '')),
+        ]),
+    ]
+    return [(title, [(label, value) for label, value in rows if should_show_value(value)]) for title, rows in sections]
@@ -0,0 +1,127 @@
+import io
+import os
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
+
+from report_layout import TEMPLATE_IMAGE, report_sections, should_show_value  # noqa: F401  (re-exported)
+
+# Vector report engine: renders the same sections as generate_formatted_html straight to
+# PDF text/vector objects with ReportLab. No browser, searchable output, real page breaks.
+
+# Optional TTF for non-Latin reports (e.g. NotoSans for Hindi/Telugu); Helvetica otherwise
+REPORT_FONT_PATH = os.getenv("REPORT_FONT_PATH", "")
+
+
+_font_name = None
+
+
+def _font():
+    global _font_name
+    if _font_name is None:
+        _font_name = "Helvetica"
+        if REPORT_FONT_PATH and os.path.exists(REPORT_FONT_PATH):
+            pdfmetrics.registerFont(TTFont("ReportFont", REPORT_FONT_PATH))
+            _font_name = "ReportFont"
+    return _font_name
+
+
+def _markup(value):
+    # Paragraph text is XML-ish markup: escape it, keep line breaks, render lists as bullets
+    if isinstance(value, list):
+        return "<br/>".join("• " + escape(str(item)) for item in value)
+    if isinstance(value, dict):
+        return "<br/>".join(f"<b>{escape(str(k))}:</b> {escape(str(v))}" for k, v in value.items())
+    return escape(str(value)).replace("\n", "<br/>")
+
+
+def _styles():
+    font = _font()
+    bold = "Helvetica-Bold" if font == "Helvetica" else font
+    base = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle('RTitle', parent=base['Heading1'], fontName=bold, fontSize=24, leading=30,
+                                textColor=colors.HexColor('#1a202c'), alignment=1, spaceAfter=18),
+        "summary_head": ParagraphStyle('RSumHead', parent=base['Heading4'], fontName=bold, fontSize=13,
+                                       textColor=colors.HexColor('#4c51bf'), spaceAfter=6),
+        "summary": ParagraphStyle('RSummary', parent=base['Normal'], fontName=font, fontSize=10.5, leading=15,
+                                  textColor=colors.HexColor('#1a202c')),
+        "section": ParagraphStyle('RSection', parent=base['Heading3'], fontName=bold, fontSize=13, leading=16,
+                                  textColor=colors.HexColor('#2c5282'), spaceBefore=14, spaceAfter=6),
+        "th": ParagraphStyle('RTh', parent=base['Normal'], fontName=bold, fontSize=10, textColor=colors.white),
+        "label": ParagraphStyle('RLabel', parent=base['Normal'], fontName=bold, fontSize=10, leading=13),
+        "cell": ParagraphStyle('RCell', parent=base['Normal'], fontName=font, fontSize=10, leading=13),
+    }
+
+
+def _section_table(rows, st, width):
+    tdata = [[Paragraph("Field", st["th"]), Paragraph("Value", st["th"])]]
+    for label, value in rows:
+        tdata.append([Paragraph(escape(label), st["label"]), Paragraph(_markup(value), st["cell"])])
+    t = Table(tdata, colWidths=[width * 0.35, width * 0.65], repeatRows=1)
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
+        ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.HexColor('#ed8936')),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.Color(1, 1, 1, alpha=0.95)),
+        ('LINEBELOW', (0, 1), (-1, -2), 0.75, colors.HexColor('#e2e8f0')),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('PADDING', (0, 0), (-1, -1), 7),
+    ]))
+    return t
+
+
+def generate_pdf_report(data, filename=None, language='en'):
+    """
+    Render the analysis report as a vector PDF.
+    filename: path or writable file object; None returns the PDF bytes.
+    """
+    out = filename if filename is not None else io.BytesIO()
+    has_bg = os.path.exists(TEMPLATE_IMAGE)
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=A4,
+        rightMargin=50, leftMargin=50,
+        topMargin=120 if has_bg else 40,  # Push content down to avoid header
+        bottomMargin=60,
+        title="Bid Analysis Report",
+        lang=language,
+    )
+    st = _styles()
+
+    def add_background(canvas, doc):
+        if has_bg:
+            canvas.drawImage(TEMPLATE_IMAGE, 0, 0, width=A4[0], height=A4[1])
+
+    story = [Paragraph("Bid Analysis Report", st["title"])]
+
+    summary = Table(
+        [[[Paragraph("Executive Summary", st["summary_head"]),
+           Paragraph(_markup(data.get('Executive_Summary', 'N/A')), st["summary"])]]],
+        colWidths=[doc.width],
+    )
+    summary.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.Color(1, 1, 1, alpha=0.95)),
+        ('LINEBEFORE', (0, 0), (0, -1), 5, colors.HexColor('#4c51bf')),
+        ('PADDING', (0, 0), (-1, -1), 12),
+    ]))
+    story += [summary, Spacer(1, 10)]
+
+    for title, rows in report_sections(data):
+        if not rows:
+            continue
+        header = Paragraph(title.upper(), st["section"])
+        table = _section_table(rows, st, doc.width)
+        # Keep the heading with the start of its table; long tables still split across pages
+        story.append(KeepTogether([header, table]) if len(rows) <= 6 else header)
+        if len(rows) > 6:
+            story.append(table)
+
+    doc.build(story, onFirstPage=add_background, onLaterPages=add_background)
+    if filename is None:
+        return out.getvalue()
+    return filename
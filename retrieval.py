@@ -0,0 +1,136 @@
+import re
+import math
+import threading
+from collections import Counter, OrderedDict
+
+# Clause-aware chunking + in-process BM25 for /api/ask.
+# Chunks never cross a page boundary, so every hit carries an exact page citation.
+
+CLAUSE_START = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*[.)]?\s|\(?[a-z]{1,3}\)\s|[A-Z]\.\s|(?:clause|para|section|annexure|appendix|schedule)\b)",
+    re.IGNORECASE,
+)
+TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset("""a an and are as at be by for from has have in is it its of on or shall that the this to
+was were will with which what when who whom whose how any all""".split())
+
+
+def tokenize(text: str):
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_clauses(page_text: str):
+    """Group lines into clauses: a numbered/lettered/'Clause X' line starts a new one."""
+    clauses, current = [], []
+    for line in page_text.splitlines():
+        if not line.strip():
+            continue
+        if CLAUSE_START.match(line) and current:
+            clauses.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        clauses.append("\n".join(current))
+    return clauses
+
+
+def chunk_pages(pages, target_chars: int = 1200):
+    """
+    pages: page texts in order (index 0 = page 1); any iterable, consumed once, so a page generator
+    is chunked as it is extracted. Returns [{"id": i, "page": n, "text": ...}].
+    Clauses are packed greedily up to target_chars; an oversized clause is hard-split.
+    """
+    chunks = []
+    for page_no, page_text in enumerate(pages, start=1):
+        buf = ""
+        for clause in split_clauses(page_text or ""):
+            while len(clause) > target_chars:
+                if buf:
+                    chunks.append({"page": page_no, "text": buf})
+                    buf = ""
+                chunks.append({"page": page_no, "text": clause[:target_chars]})
+                clause = clause[target_chars:]
+            if buf and len(buf) + len(clause) + 1 > target_chars:
+                chunks.append({"page": page_no, "text": buf})
+                buf = ""
+            buf = f"{buf}\n{clause}" if buf else clause
+        if buf:
+            chunks.append({"page": page_no, "text": buf})
+    for i, chunk in enumerate(chunks):
+        chunk["id"] = i
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks, k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> [(chunk_idx, tf)]
+        self.lengths = []
+        for idx, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk["text"]))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((idx, tf))
+        n = len(chunks)
+        self.avg_len = (sum(self.lengths) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+
+    def search(self, query: str, k: int = 8):
+        scores = {}
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for idx, tf in plist:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[idx] / (self.avg_len or 1))
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [(score, self.chunks[idx]) for idx, score in ranked]
+
+
+class IndexCache:
+    """Keeps the last `max_entries` BM25 indexes in memory so each document is indexed once."""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+    def get(self, key: str):
+        """Cached index or None; a miss is counted by the get_or_build that follows."""
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self.hits += 1
+                self._indexes.move_to_end(key)
+            return index
+
+    def get_or_build(self, key: str, build):
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self.hits += 1
+                self._indexes.move_to_end(key)
+                return index
+            self.misses += 1
+        index = build()
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+
+def format_hits(hits):
+    """Top-k chunks in document order, each tagged with its page for citation."""
+    ordered = sorted((chunk for _, chunk in hits), key=lambda c: c["id"])
+    return "\n\n".join(f"[Page {c['page']}]\n{c['text']}" for c in ordered)
@@ -1,31 +1,42 @@
 
+import io
 import os
 import json
-import shutil
 import time
-import pdfplumber
+import hashlib
+import tempfile
+import asyncio
+import hmac
+import threading
 from typing import Optional
 from fastapi import FastAPI, File, UploadFile, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-import google.generativeai as genai
-from deep_translator import GoogleTranslator
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
-from html2image import Html2Image
-from PIL import Image, ImageOps
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 
 from fastapi.staticfiles import StaticFiles
 
 from fastapi.exceptions import RequestValidationError
 from fastapi.requests import Request
 
+from disk_cache import DiskLRUCache, fingerprint
+from document_store import DocumentStore
+from retrieval import IndexCache, BM25Index, chunk_pages, format_hits
+from jobs import JobManager, TERMINAL as JOB_TERMINAL_STATES
+from translation_memory import TranslationMemory, normalize as normalize_phrase
+from report_layout import TEMPLATE_IMAGE
+from report_html import generate_formatted_html, warm_assets as warm_report_assets
+from browser_pool import BrowserPool
+from tender_analysis import llm, TEXT_ANALYSIS_PROMPT, FILE_ANALYSIS_PROMPT, analyze_document_text, analyze_document_file
+import metrics
+from metrics import track_stage
+from profiler import SamplingProfiler, ProfileStore
+from execution import CPU_WORKERS, run_cpu, run_io, submit_io, preload, shutdown as shutdown_executors
+from ingest import UPLOAD_DIR, MAX_UPLOAD_BYTES, UploadRejected, ResumableUploads, spool_stream, check_size, check_pages, sweep_spool
+from page_selection import ANALYSIS_CHAR_BUDGET, PAGE_SIGNALS, PATTERN_SIGNALS, select_context
+from pdf_extract import EXTRACT_MAX_PAGES, EXTRACT_WORKERS, resolve_backend, count_pages, plan_page_ranges, extract_page_range, iter_page_texts, join_pages
+
 # 1. Setup & Config
 load_dotenv()
 
@@ -48,19 +59,162 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id", "Upload-Offset"],
 )
 
-# Logger Middleware to debug incoming requests
+# Logger Middleware to debug incoming requests (also feeds the /metrics request counters)
 @app.middleware("http")
 async def log_requests(request, call_next):
     print(f"Incoming Request: {request.method} {request.url.path}")
-    response = await call_next(request)
+    metrics.HTTP_IN_FLIGHT.inc()
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
+        # Label by route template (/api/jobs/{job_id}), not the raw path, to keep series bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - t0, request.method, route)
+        metrics.HTTP_REQUESTS.inc(request.method, route, str(status))
     print(f"Response Status: {response.status_code}")
     return response
 
+# Upload size cap, checked on the declared Content-Length before the multipart body is read.
+# Starlette spools the whole form to a temp file before the route runs, so a body without a
+# Content-Length (chunked) is refused outright: its size could only be known after the copy.
+UPLOAD_ROUTES = ("/api/analyze", "/api/jobs/analyze")
+MULTIPART_OVERHEAD = 64 * 1024
+
+@app.middleware("http")
+async def reject_oversized_uploads(request, call_next):
+    if request.method == "POST" and request.url.path in UPLOAD_ROUTES:
+        length = request.headers.get("content-length")
+        if not (length and length.isdigit()):
+            return JSONResponse(status_code=411, content={"detail": "Uploads need a Content-Length header; use /api/uploads for chunked transfers."})
+        if int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+            return JSONResponse(status_code=413, content={"detail": f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit."})
+    return await call_next(request)
+
+# On-demand profiling: /api requests carrying ?profile=<PROFILE_TOKEN> or an X-Profile-Token
+# header run under the sampling profiler; the response gets an X-Profile-Id header and the
+# collapsed stacks are fetched from /api/profiles/{id}. Without PROFILE_TOKEN the middleware
+# is not registered at all.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".cache/profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+profile_store = ProfileStore(PROFILE_DIR) if PROFILE_TOKEN else None
+
+def profile_token_ok(token: Optional[str]):
+    return bool(PROFILE_TOKEN and token) and hmac.compare_digest(token, PROFILE_TOKEN)
+
+async def profile_requests(request, call_next):
+    if not request.url.path.startswith("/api/") or request.url.path.startswith("/api/profiles/"):
+        return await call_next(request)
+    if not profile_token_ok(request.headers.get("x-profile-token") or request.query_params.get("profile")):
+        return await call_next(request)
+
+    profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000).start()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.stop()
+    profile_id = await run_io("storage", profile_store.save, profiler,
+                              {"method": request.method, "path": request.url.path, "status": response.status_code})
+    print(f"Profiled {request.method} {request.url.path}: {profile_id}")
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+if PROFILE_TOKEN:
+    app.middleware("http")(profile_requests)
+
+# Cold start: heavy libraries are imported where they are used (or in the CPU pool workers),
+# so the port binds and /health answers right away; a background thread then warms them up.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+WARM_MODULES = ("pypdfium2", "pdfplumber", "report_pdf", "page_slicing", "deep_translator", "html2image", "google.generativeai")
+
+def warm_up():
+    t0 = time.perf_counter()
+    preload(WARM_MODULES)
+    warm_report_assets()
+    print(f"Warm-up done in {time.perf_counter() - t0:.2f}s")
+
+# Abandoned spool files and resumable sessions past their TTL: swept at startup and then on a
+# timer, like the job pruner, so a long-running server does not fill its disk with them
+UPLOAD_SWEEP_INTERVAL = 3600
+upload_sweeper = None
+
+async def sweep_uploads():
+    while True:
+        removed = await run_io("storage", sweep_spool, UPLOAD_DIR) + await run_io("storage", resumable_uploads.sweep)
+        if removed:
+            print(f"Swept {removed} stale upload file(s)")
+        await asyncio.sleep(UPLOAD_SWEEP_INTERVAL)
+
+@app.on_event("startup")
+async def start_job_workers():
+    global upload_sweeper
+    await job_manager.start()
+    upload_sweeper = asyncio.create_task(sweep_uploads())
+    if STARTUP_WARMUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+async def stop_executors():
+    if upload_sweeper is not None:
+        upload_sweeper.cancel()
+    await job_manager.stop()
+    await browser_pool.close()
+    shutdown_executors()
+
 # Sanitize API Key (Remove potential newlines/spaces)
 GEMINI_API_KEY = (os.getenv("GEMINI_API_KEY") or "").strip()
 
+# Analysis cache: uploads keyed on SHA-256 of their bytes + prompt/model version
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", ".cache/analysis")
+ANALYSIS_CACHE_MAX_MB = int(os.getenv("ANALYSIS_CACHE_MAX_MB", "256"))
+analysis_cache = DiskLRUCache(ANALYSIS_CACHE_DIR, max_bytes=ANALYSIS_CACHE_MAX_MB * 1024 * 1024, suffix=".json")
+
+# Document sessions: extracted text lives server-side, clients refer to it by doc_id
+DOC_STORE_DIR = os.getenv("DOC_STORE_DIR", ".cache/documents")
+DOC_TTL_HOURS = float(os.getenv("DOC_TTL_HOURS", "24"))
+document_store = DocumentStore(DOC_STORE_DIR, ttl_seconds=int(DOC_TTL_HOURS * 3600))
+
+# Q&A retrieval: large documents are chunked + BM25-indexed once, only top-k chunks are prompted
+ASK_TOP_K = int(os.getenv("ASK_TOP_K", "8"))
+ASK_CHUNK_CHARS = int(os.getenv("ASK_CHUNK_CHARS", "1200"))
+ASK_FULL_CONTEXT_CHARS = int(os.getenv("ASK_FULL_CONTEXT_CHARS", "12000"))  # smaller docs go in whole
+ask_indexes = IndexCache(max_entries=int(os.getenv("ASK_INDEX_CACHE_SIZE", "32")))
+
+# Translation memory: (normalized phrase, language) -> translation, persisted with LRU eviction
+TM_PATH = os.getenv("TM_PATH", ".cache/translation_memory.db")
+TM_MAX_ENTRIES = int(os.getenv("TM_MAX_ENTRIES", "50000"))
+translation_memory = TranslationMemory(TM_PATH, max_entries=TM_MAX_ENTRIES)
+
+# Report engines for /api/generate-pdf: "screenshot" (Chromium HTML render) or "vector" (ReportLab)
+REPORT_ENGINES = ("screenshot", "vector")
+REPORT_ENGINE = os.getenv("REPORT_ENGINE", "screenshot")
+
+# Rendered-report cache: finished PDFs keyed on report data + engine + template version
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", ".cache/reports")
+REPORT_CACHE_MAX_MB = int(os.getenv("REPORT_CACHE_MAX_MB", "256"))
+REPORT_LAYOUT_VERSION = "2"  # bump when generate_formatted_html / report_pdf output changes
+report_cache = DiskLRUCache(REPORT_CACHE_DIR, max_bytes=REPORT_CACHE_MAX_MB * 1024 * 1024, suffix=".pdf")
+
+# Screenshot engine: warm Chromium pool (size 0 = spawn a fresh Html2Image browser per report)
+browser_pool = BrowserPool(
+    int(os.getenv("REPORT_BROWSER_POOL_SIZE", "2")),
+    max_renders=int(os.getenv("REPORT_BROWSER_MAX_RENDERS", "100")),
+    max_rss_mb=int(os.getenv("REPORT_BROWSER_MAX_RSS_MB", "768")),
+    render_timeout=float(os.getenv("REPORT_RENDER_TIMEOUT", "60")),
+)
+
+# Background analysis jobs (persisted queue, bounded workers)
+JOBS_DIR = os.getenv("JOBS_DIR", ".cache/jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", "24"))  # finished jobs + events, then pruned
+
 # Serve React Frontend Assets
 if os.path.exists("dist"):
     app.mount("/assets", StaticFiles(directory="dist/assets"), name="assets")
@@ -70,29 +224,53 @@ def health_check():
     return {"status": "ok", "service": "BidAnalyzer Pro API"}
 
 # 2. Text Extraction
-def extract_text_from_file_path(file_path: str):
-    import pdfplumber
-    text_content = ""
+def extract_text_from_file_path(file_path: str, backend: str = None):
+    # backend: "auto" | "pdfium" | "pdfplumber" (see pdf_extract), None = EXTRACT_BACKEND
+    try:
+        # Limit to first EXTRACT_MAX_PAGES pages (0 = all); pages stream through one at a time
+        pages = iter_page_texts(file_path, 0, EXTRACT_MAX_PAGES or None, backend)
+        return join_pages(text for _, text in pages)
+    except Exception as e:
+        print(f"Extraction Error: {e}")
+        return None
+
+def extraction_backend(name: Optional[str]):
+    # ?extractor= on the analyze routes; validated before the upload is read
+    try:
+        return resolve_backend(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def extract_document_pages(file_path: str, progress=None, n_pages: int = None, backend: str = None):
+    # Parallel variant of extract_text_from_file_path: page ranges fan out over the CPU pool,
+    # each worker opens its own handle, pages come back in order (index 0 = page 1).
     try:
-        if file_path.endswith('.txt'):
-             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                 return f.read()
-
-        with pdfplumber.open(file_path) as pdf:
-            if not pdf.pages: return None
-            # Limit to first 20 pages
-            for i, page in enumerate(pdf.pages[:20]): 
-                text = page.extract_text()
-                if text: text_content += text + "\n"
-        return text_content
+        if n_pages is None:  # ingestion already counted them for uploads
+            n_pages = await run_cpu(count_pages, file_path)
+        if not n_pages: return None
+        if EXTRACT_MAX_PAGES:
+            n_pages = min(n_pages, EXTRACT_MAX_PAGES)
+        # One range per pool worker at most: more would only queue behind each other
+        ranges = plan_page_ranges(n_pages, min(EXTRACT_WORKERS, CPU_WORKERS))
+        async def extract_range(start, stop):
+            texts = await run_cpu(extract_page_range, file_path, start, stop, backend)
+            if progress: progress("extracting", f"page {stop} of {n_pages}")
+            return texts
+        parts = await asyncio.gather(*(extract_range(a, b) for a, b in ranges))
+        return [text for part in parts for text in part]
     except Exception as e:
         print(f"Extraction Error: {e}")
         return None
 
+async def extract_document_text(file_path: str):
+    pages = await extract_document_pages(file_path)
+    return join_pages(pages) if pages is not None else None
+
 # API ROUTES moved under /api
 @app.post("/api/analyze")
 async def analyze_document(
     file: UploadFile = File(...), 
+    extractor: Optional[str] = None,
     x_api_key: Optional[str] = Header(None)
 ):
     # Log that we hit the endpoint
@@ -102,73 +280,348 @@ async def analyze_document(
     if not api_key:
         api_key = GEMINI_API_KEY
 
-    if not api_key:
+    if not llm.available(api_key):
         raise HTTPException(
             status_code=400,
-            detail="Gemini API Key missing. Provide X-API-Key or configure server key."
+            detail="LLM API Key missing. Provide X-API-Key or configure a server key (GEMINI_API_KEY / GROQ_API_KEY)."
         )
+    backend = extraction_backend(extractor)
 
-    # 2. Save Upload Temporarily
-    temp_filename = f"temp_{file.filename}"
+    # 2. Ingest: stream into a unique spool file (hash + size on the fly), reject non-PDF / oversized
+    upload = await ingest_upload(file)
     try:
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        print(f"File saved to {temp_filename}")
-        
-        # 3. Hybrid Analysis
-        content_text = extract_text_from_file_path(temp_filename)
-        
-        if content_text and len(content_text.strip()) > 50:
-            print("Analyzing extracted text...")
-            analysis_result = analyze_with_gemini_text(content_text, api_key)
-            full_text_context = content_text
-        else:
-            print("Analyzing file (upload)...")
-            analysis_result, full_text_context = analyze_with_gemini_file_v2(temp_filename, api_key)
-        
+        print(f"File saved to {upload.path} ({upload.size} bytes, {upload.pages} pages)")
+        return await run_analysis(upload.path, upload.sha256, api_key, n_pages=upload.pages, backend=backend)
+
+    except Exception as e:
+        print(f"Analysis Failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
         # Clean up
-        try: os.remove(temp_filename)
-        except: pass
-        
-        # MERGE: Return analysis + HIDDEN full text for Q&A context
-        # We wrap it or just add a field if analysis_result is a dict
-        if isinstance(analysis_result, dict):
-             analysis_result["_full_text_context"] = full_text_context
-        
+        upload.discard()
+
+async def ingest_upload(file: UploadFile, directory: str = UPLOAD_DIR):
+    # Shared by /api/analyze and /api/jobs/analyze. Raises HTTPException for rejected uploads.
+    with track_stage("ingest"):
+        try:
+            if file.size is not None:
+                check_size(file.size)  # declared size: refuse before copying a byte
+            # file.file is Starlette's temp copy, bounded by the Content-Length check above
+            upload = await run_io("ingest", spool_stream, file.file.read, directory, MAX_UPLOAD_BYTES, file.filename)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        await check_upload_pages(upload)
+    return upload
+
+async def check_upload_pages(upload):
+    # Page count (reused by extraction) and page cap; the spool file is dropped on rejection
+    try:
+        try:
+            pages = await run_cpu(count_pages, upload.path)
+        except Exception as e:
+            raise UploadRejected(422, f"Could not read the PDF: {e}")
+        check_pages(pages)
+    except UploadRejected as e:
+        upload.discard()
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    upload.pages = pages
+
+async def run_analysis(file_path: str, sha_hex: str, api_key: str, progress=None, n_pages: int = None, backend: str = None,
+                       full_text: bool = True):
+    # Shared by /api/analyze and background jobs.
+    # progress(stage, detail) is called on the event loop; provider threads report through report_from_thread.
+    # full_text: add "_full_text_context" for older clients. Otherwise the text only ever exists
+    # as the page list (the document store and the cache entry are written from it).
+    loop = asyncio.get_running_loop()
+    def report(stage, detail=""):
+        if progress: progress(stage, detail)
+    def report_from_thread(stage, detail=""):
+        if progress: loop.call_soon_threadsafe(progress, stage, detail)
+
+    doc_id = sha_hex[:32]
+    backend = resolve_backend(backend)
+    cache_key = f"{sha_hex}-{ANALYSIS_CACHE_VERSION}-{backend}"  # backends differ in extracted text
+    cached = await run_io("storage", analysis_cache.get_json, cache_key)
+    if cached is not None:
+        print(f"Analysis cache hit: {cache_key[:12]}")
+        report("cache_hit")
+        analysis_result = cached["analysis"]
+        pages, full_text_context = cached.get("pages"), cached.get("full_text_context")
+        if not await run_io("storage", document_store.refresh, doc_id):
+            await run_io("storage", document_store.put, doc_id, full_text_context, analysis_result, pages)
+        analysis_result["doc_id"] = doc_id
+        if full_text:
+            analysis_result["_full_text_context"] = full_text_context if full_text_context is not None else join_pages(pages)
         return analysis_result
+    
+    # 3. Hybrid Analysis
+    report("extracting")
+    with track_stage("extract"):
+        pages = await extract_document_pages(file_path, progress=report, n_pages=n_pages, backend=backend)
+    
+    selection = None
+    full_text_context = None  # text path: derived from pages only where a caller needs it
+    if pages and sum(len(text.strip()) for text in pages) > 50:
+        # Prompt = best-scoring pages within ANALYSIS_CHAR_BUDGET; Q&A keeps the full text
+        with track_stage("page_selection"):
+            prompt_text, selection = await run_cpu(select_context, pages, ANALYSIS_CHAR_BUDGET)
+        print(f"Analyzing extracted text: {len(selection['analyzed_pages'])} of {selection['total_pages']} pages, {selection['chars']} chars")
+        report("selecting", f"{len(selection['analyzed_pages'])} of {selection['total_pages']} pages")
+        with track_stage("llm"):
+            analysis_result = await run_io("llm", analyze_document_text, prompt_text, api_key, report_from_thread)
+    else:
+        print("Analyzing file (upload)...")
+        with track_stage("llm_file"):
+            analysis_result, full_text_context = await run_io("llm", analyze_document_file, file_path, api_key, report_from_thread)
+        pages = None
+    
+    # MERGE: Return analysis + HIDDEN full text for Q&A context
+    # We wrap it or just add a field if analysis_result is a dict
+    if isinstance(analysis_result, dict):
+         if selection:
+             analysis_result["analyzed_pages"] = selection["analyzed_pages"]
+             analysis_result["total_pages"] = selection["total_pages"]
+         # Text path caches the pages alone; the joined text is rebuilt on a hit that needs it
+         entry = {"analysis": analysis_result, "pages": pages} if pages else {"analysis": analysis_result, "full_text_context": full_text_context}
+         await run_io("storage", analysis_cache.put_json, cache_key, entry)
+         await run_io("storage", document_store.put, doc_id, full_text_context, analysis_result, pages)
+         analysis_result["doc_id"] = doc_id
+         if full_text:
+             # Kept for older clients that still send the text back on /api/ask
+             analysis_result["_full_text_context"] = full_text_context if full_text_context is not None else join_pages(pages)
+    
+    return analysis_result
+
+# Background jobs: POST returns immediately, GET polls, /events streams stage progress (SSE)
+async def run_analysis_job(job, report):
+    payload = job["payload"]
+    # Per-request keys are only kept in memory; after a restart fall back to the server key
+    api_key = job_manager.secret(job["job_id"]) or GEMINI_API_KEY
+    try:
+        if not llm.available(api_key):
+            raise ValueError("LLM API Key unavailable for this job. Resubmit with X-API-Key.")
+        report("saved", payload["filename"])
+        result = await run_analysis(payload["spool_path"], payload["sha256"], api_key, progress=report,
+                                    n_pages=payload.get("pages"), backend=payload.get("extractor"), full_text=False)
+    finally:
+        try: os.remove(payload["spool_path"])
+        except OSError: pass
+    return result  # no _full_text_context: text stays server-side, use doc_id
+
+job_manager = JobManager(os.path.join(JOBS_DIR, "jobs.db"), JOB_WORKERS, run_analysis_job,
+                         ttl_seconds=int(JOB_TTL_HOURS * 3600))
+
+@app.post("/api/jobs/analyze", status_code=202)
+async def submit_analysis_job(
+    file: UploadFile = File(...),
+    extractor: Optional[str] = None,
+    x_api_key: Optional[str] = Header(None)
+):
+    api_key = (x_api_key or "").strip() or GEMINI_API_KEY
+    if not llm.available(api_key):
+        raise HTTPException(
+            status_code=400,
+            detail="LLM API Key missing. Provide X-API-Key or configure a server key (GEMINI_API_KEY / GROQ_API_KEY)."
+        )
 
+    backend = extraction_backend(extractor)
+
+    # Spool under the jobs dir (not cwd) so a restart can pick the file back up
+    upload = await ingest_upload(file, JOBS_DIR)
+    return await queue_analysis_job(upload, x_api_key, backend)
+
+async def queue_analysis_job(upload, x_api_key: Optional[str], backend: str = None):
+    job_id = await job_manager.submit(
+        {"filename": upload.filename, "spool_path": upload.path, "sha256": upload.sha256, "pages": upload.pages,
+         "extractor": backend},
+        secret=(x_api_key or "").strip() or None,
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+# Resumable chunked uploads: POST /api/uploads declares the file, PUT /api/uploads/{id}?offset=N
+# sends one chunk (raw body + X-Chunk-SHA256), GET /api/uploads/{id} tells a client that lost
+# its connection where to resume, and POST /api/uploads/{id}/complete hands the reassembled file
+# to the normal analysis (inline, or as a background job with ?background=true).
+resumable_uploads = ResumableUploads()
+
+def upload_error(e: UploadRejected, upload_id: str = None):
+    headers = None
+    if e.status_code == 409 and upload_id:
+        try:
+            headers = {"Upload-Offset": str(resumable_uploads.status(upload_id)["offset"])}
+        except UploadRejected:
+            pass
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+
+async def read_chunk_body(request: Request, limit: int):
+    # Content-Length may be absent (chunked transfer), so the cap is enforced while reading too
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit:
+        raise UploadRejected(413, f"Chunks are limited to {limit} bytes.")
+    body = bytearray()
+    async for part in request.stream():
+        body += part
+        if len(body) > limit:
+            raise UploadRejected(413, f"Chunks are limited to {limit} bytes.")
+    return bytes(body)
+
+@app.post("/api/uploads", status_code=201)
+def create_resumable_upload(data: dict, x_api_key: Optional[str] = Header(None)):
+    # Refuse up front rather than after the last chunk of a 100 MB bundle
+    if not llm.available((x_api_key or "").strip() or GEMINI_API_KEY):
+        raise HTTPException(
+            status_code=400,
+            detail="LLM API Key missing. Provide X-API-Key or configure a server key (GEMINI_API_KEY / GROQ_API_KEY)."
+        )
+    try:
+        size = int(data.get("size") or 0)
+        return resumable_uploads.create(data.get("filename"), size, data.get("sha256"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size must be an integer number of bytes.")
+    except UploadRejected as e:
+        raise upload_error(e)
+
+@app.get("/api/uploads/{upload_id}")
+def get_resumable_upload(upload_id: str, response: Response):
+    try:
+        state = resumable_uploads.status(upload_id)
+    except UploadRejected as e:
+        raise upload_error(e)
+    response.headers["Upload-Offset"] = str(state["offset"])
+    return state
+
+@app.put("/api/uploads/{upload_id}")
+async def put_upload_chunk(upload_id: str, offset: int, request: Request, response: Response,
+                           x_chunk_sha256: Optional[str] = Header(None)):
+    with track_stage("ingest_chunk"):
+        try:
+            data = await read_chunk_body(request, resumable_uploads.max_chunk)
+            state = await run_io("ingest", resumable_uploads.write_chunk, upload_id, offset, data, x_chunk_sha256)
+        except UploadRejected as e:
+            raise upload_error(e, upload_id)
+    response.headers["Upload-Offset"] = str(state["offset"])
+    return state
+
+@app.delete("/api/uploads/{upload_id}")
+def abort_resumable_upload(upload_id: str):
+    try:
+        resumable_uploads.abort(upload_id)
+    except UploadRejected as e:
+        raise upload_error(e)
+    return {"upload_id": upload_id, "status": "aborted"}
+
+@app.post("/api/uploads/{upload_id}/complete")
+async def complete_resumable_upload(
+    upload_id: str,
+    response: Response,
+    background: bool = False,
+    extractor: Optional[str] = None,
+    x_api_key: Optional[str] = Header(None)
+):
+    api_key = (x_api_key or "").strip() or GEMINI_API_KEY
+    if not llm.available(api_key):
+        raise HTTPException(
+            status_code=400,
+            detail="LLM API Key missing. Provide X-API-Key or configure a server key (GEMINI_API_KEY / GROQ_API_KEY)."
+        )
+    backend = extraction_backend(extractor)
+    with track_stage("ingest"):
+        try:
+            upload = await run_io("ingest", resumable_uploads.complete, upload_id, JOBS_DIR if background else UPLOAD_DIR)
+        except UploadRejected as e:
+            raise upload_error(e, upload_id)
+        await check_upload_pages(upload)
+    print(f"Resumable upload {upload_id} complete ({upload.size} bytes, {upload.pages} pages)")
+
+    if background:
+        response.status_code = 202
+        return await queue_analysis_job(upload, x_api_key, backend)
+    try:
+        return await run_analysis(upload.path, upload.sha256, api_key, n_pages=upload.pages, backend=backend)
     except Exception as e:
-        if os.path.exists(temp_filename):
-            try: os.remove(temp_filename)
-            except: pass
         print(f"Analysis Failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-
-# V2 File analysis that enables text retrieval if possible, 
-# but getting text back from Gemini file API is hard. 
-# Better strategy: We ALWAYS try to extract text locally first (lines 73-87).
-# If local extraction fails (scanned PDF), we might have an issue.
-# But current logic (line 120 server.py view previously) tries to extract text.
-# If that worked, we have 'content_text'. 
-# If it failed, we used 'analyze_with_gemini_file'.
-# In the 'file' case, we DON'T have the text for Q&A. 
-# We should probably force OCR or hope Gemini summary is good enough? 
-# OR, use Gemini's "File API" for Q&A too (uploading file once and persisting)... 
-# But that requires state.
-# Let's stick to the extracted text path. If text extraction failed, Q&A will be limited.
-# But for now, let's just assume we pass whatever text we have.
-
-def analyze_with_gemini_file_v2(file_path, api_key):
-    # Wrapper to match return signature if needed, or just standard
-    # actually existing analyze_with_gemini_file returns just the JSON.
-    # We will modify it to return (json, text_placeholder)
-    # Since we can't easily get text from a "file upload" analysis in Gemini (it just sees pixels/tokens),
-    # we will return an empty string for text context, and the Q&A will have to rely on the summary
-    # OR the user handles re-upload. 
-    # BUT, typically extract_text_pypdf works for most PDFs.
-    res = analyze_with_gemini_file(file_path, api_key)
-    return res, "Text extraction failed or was skipped. Q&A limited to summary."
+    finally:
+        upload.discard()
+
+@app.get("/api/jobs/{job_id}")
+def get_analysis_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["filename"] = job.pop("payload").get("filename")
+    return job
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    if await run_io("storage", job_manager.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        seq = int(last_event_id or 0)
+        while True:
+            # Status before events: the final event commits together with the status, so once
+            # the status reads terminal every event is already readable
+            job = await run_io("storage", job_manager.get, job_id)
+            if job is None:
+                break  # pruned while the client was listening
+            for event in await run_io("storage", job_manager.events_since, job_id, seq):
+                seq = event["seq"]
+                yield f"id: {seq}\nevent: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+            if job["status"] in JOB_TERMINAL_STATES:
+                break
+            await job_manager.wait_for_change(job_id, seq, timeout=15)
+            yield ": keep-alive\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def load_session(doc_id: str):
+    # (text, pages) of a doc_id session; text is None once it has expired
+    return document_store.get_text(doc_id), document_store.get_pages(doc_id)
+
+def build_ask_prompt(question: str, context: str = None, pages=None, index_key: str = None, load=None):
+    # Small documents go in whole. Larger ones: top-k BM25 chunks, tagged with page numbers
+    # when we know them (doc_id sessions), so nothing past the old 100k cut-off is lost.
+    # load() -> (context, pages) is called only when the index is not cached, so repeat
+    # questions on a session never re-read its text. Returns (None, []) if load finds nothing.
+    citations = []
+    cached = ask_indexes.get(index_key) if index_key else None
+    if cached is None and context is None:
+        context, pages = load()
+        if not context:
+            return None, citations
+    if cached is None and len(context) <= ASK_FULL_CONTEXT_CHARS:
+        header, body = "CONTEXT (Full Document Content)", context
+    else:
+        # Cached with the index: whether chunks carry real page numbers
+        index, paged = cached or ask_indexes.get_or_build(
+            index_key or hashlib.sha1(context.encode("utf-8", errors="ignore")).hexdigest(),
+            lambda: (BM25Index(chunk_pages(pages or [context], ASK_CHUNK_CHARS)), bool(pages)),
+        )
+        hits = index.search(question, ASK_TOP_K)
+        if paged:
+            header = "CONTEXT (Most relevant excerpts, tagged with page numbers)"
+            body = format_hits(hits)
+            citations = sorted({chunk["page"] for _, chunk in hits})
+        else:
+            header = "CONTEXT (Most relevant excerpts)"
+            body = "\n\n".join(chunk["text"] for _, chunk in sorted(hits, key=lambda h: h[1]["id"]))
+        if not hits:
+            # Start of the document, rebuilt from the chunks so the session need not be read
+            body = "\n".join(chunk["text"] for chunk in index.chunks)[:ASK_FULL_CONTEXT_CHARS]
+
+    cite_rule = " Cite page numbers like (Page 12) for every fact you use." if citations else ""
+    prompt = f"""
+        You are a helpful expert assistant for a government tender document.
+        
+        {header}:
+        {body}
+        
+        Question: {question}
+        
+        Answer the question concisely based strictly on the provided context.{cite_rule} If the answer is not in the context, say so.
+        """
+    return prompt, citations
 
 @app.post("/api/ask")
 async def ask_question(
@@ -177,9 +630,15 @@ async def ask_question(
 ):
     try:
         question = data.get("question")
-        context = data.get("context") # This will now be the FULL TEXT string
-        
-        if not question or not context:
+        doc_id = data.get("doc_id")
+        # Prefer the server-side session (a stat to keep it alive; its text is read only to build
+        # the index); fall back to FULL TEXT sent by older clients
+        session = bool(doc_id) and await run_io("storage", document_store.refresh, doc_id)
+        context = data.get("context")
+
+        if not question or not (session or context):
+             if doc_id:
+                 raise HTTPException(status_code=404, detail="Document session expired. Re-upload the document or send context.")
              raise HTTPException(status_code=400, detail="Missing question or context")
 
         # Determine API Key (Header > Env)
@@ -187,399 +646,161 @@ async def ask_question(
         if not api_key:
             api_key = GEMINI_API_KEY
 
-        if not api_key:
+        if not llm.available(api_key):
             raise HTTPException(
                 status_code=400,
-                detail="Gemini API Key missing. Provide X-API-Key or configure server key."
+                detail="LLM API Key missing. Provide X-API-Key or configure a server key (GEMINI_API_KEY / GROQ_API_KEY)."
             )
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-       # PROMPT
-        prompt = f"""
-        You are a helpful expert assistant for a government tender document.
-        
-        CONTEXT (Full Document Content):
-        {context[:100000]}  # Safety Truncate to ~100k chars to avoid token limits if very massive
-        
-        Question: {question}
-        
-        Answer the question concisely based strictly on the provided context. If the answer is not in the context, say so.
-        """
-        
-        response = model.generate_content(prompt)
-        return {"answer": response.text}
-
+        prompt, citations = None, []
+        with track_stage("retrieval"):
+            if session:
+                prompt, citations = await run_io("index", build_ask_prompt, question, None, None, doc_id,
+                                                 lambda: load_session(doc_id))
+            if prompt is None and context:
+                prompt, citations = await run_io("index", build_ask_prompt, question, context)
+        if prompt is None:
+            raise HTTPException(status_code=404, detail="Document session expired. Re-upload the document or send context.")
+
+        with track_stage("llm_ask"):
+            answer = await run_io("ask", llm.complete, "", prompt, False, api_key)
+        return {"answer": answer, "citations": citations}
+
+    except HTTPException:
+        raise
     except Exception as e:
-        if os.path.exists(temp_filename):
-            try: os.remove(temp_filename)
-            except: pass
         # DIRECT ERROR RETURN
         print(f"Analysis Failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# 3. Gemini Analysis (Hybrid Text/File)
-def analyze_with_gemini_text(text: str, api_key: str):
-    genai.configure(api_key=api_key)
-    # Use 2.5 Flash as requested, using 'gemini-2.5-flash' alias which is usually safer than models/ path for genai lib
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    prompt = """
-    You are an expert Tender Analyst. Analyze the following tender document text and extract key details.
-    
-    CRITICAL INSTRUCTION: Provide a CONCISE summary. 
-    - Maximum 300 words total.
-    - Use short bullet points.
-    - Avoid long paragraphs.
-    - Focus on the most important constraints and values.
-
-    Output properly formatted JSON matching this structure exactly (do not add markdown code blocks, just raw JSON):
-    {
-        "Executive_Summary": "Short 3-4 sentence summary of the opportunity (Max 60 words).",
-        "Tender_Reference": "Ref No",
-        "Issuing_Authority": "Name of organization",
-        "Project_Name": "Title of work",
-        "Location": "City/State",
-        "Scope_of_Work": "Concise bullet points of main tasks (Max 5 bullets)",
-        "Contract_Period": "Duration",
-        "Technical_Specifications": "Key technical requirements (Brief)",
-        "Estimated_Value": "Value with currency",
-        "EMD_Amount": "EMD value",
-        "Tender_Fee": "Fee amount",
-        "Payment_Terms": "Brief payment structure",
-        "Important_Dates": {
-            "Bid_Submission_Deadline": "DD-MM-YYYY",
-            "Bid_Opening_Date": "DD-MM-YYYY",
-            "Pre_Bid_Meeting": "DD-MM-YYYY or N/A"
-        },
-        "Eligibility": {
-            "Min_Turnover": "Amount",
-            "Experience_Required": "Short description of past exp required",
-            "Other_Eligibility_Criteria": "Any other key constraint"
-        },
-        "Required_Documents": [
-            "Doc 1", "Doc 2", "Doc 3"
-        ],
-        "Submission_Method": "Online/Offline details",
-        "Contact_Details": "Email/Phone of authority"
-    }
-
-    Tender Text:
-    """
-    
-    # Safety truncate
-    safe_text = text[:100000]
-    
-    response = model.generate_content([prompt, safe_text])
-    return clean_and_parse_json(response.text)
-
-def analyze_with_gemini_file(file_path: str, api_key: str):
-    genai.configure(api_key=api_key)
-    sample_file = genai.upload_file(path=file_path, display_name="Tender_Doc")
-    
-    while sample_file.state.name == "PROCESSING":
-        time.sleep(1)
-        sample_file = genai.get_file(sample_file.name)
-        
-    if sample_file.state.name == "FAILED":
-        raise ValueError("Gemini failed to process the file upload.")
-
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    prompt = """
-You are a senior Tender Analyst AI specialized in Government & PSU procurement documents.
-You must READ THE ENTIRE DOCUMENT CAREFULLY before extracting any data.
-
-====================================
-CRITICAL RULES (NON-NEGOTIABLE)
-====================================
-
-1. NO ASSUMPTIONS OR GUESSING
-   - Extract only what is explicitly present in the document.
-   - If a value is unclear or partially visible, state it clearly.
-
-2. REFERENCE RESOLUTION (MANDATORY)
-   When you see phrases like:
-   - "Refer to Para X"
-   - "As per Clause Y"
-   - "See Annexure Z"
-
-   You MUST:
-   a) Search the ENTIRE document
-   b) Try variations:
-      - Para / Paragraph
-      - Clause  / Section
-      - Annexure / Appendix / Schedule
-   c) Search ALL locations:
-      - NIT
-      - GCC / SCC
-      - Technical Specs
-      - BOQ
-      - Annexures
-      - Tables, footnotes, headers
-
-   If found:
-   → Extract the ACTUAL VALUE from the referenced section
-
-   If NOT found after exhaustive search:
-   → Write exactly:
-     "Referenced in <reference> but details not found in extracted text"
-
-3. NEVER write "Not Specified" if a reference exists.
-   Use "Not Specified" ONLY when:
-   - No value
-   - No reference
-   - No implied criteria
-
-4. CONFLICT RESOLUTION
-   - If multiple values exist:
-     Priority order:
-     1) Special Conditions
-     2) Technical Specifications
-     3) NIT
-     4) GCC
-   - Mention conflicts clearly if unresolved.
-
-5. NORMALIZATION RULES
-   - Dates → DD-MM-YYYY
-   - Time → HH:mm (24-hour)
-   - Currency → Preserve original (₹ / Rs / INR / %)
-   - DO NOT convert amounts unless explicitly stated.
-
-====================================
-ELIGIBILITY EXTRACTION (STRICT)
-====================================
-
-For ALL eligibility-related fields:
-- Search referenced clauses deeply
-- Extract COMPLETE criteria including:
-  - Amount
-  - Time period
-  - Financial years
-  - Nature of work
-  - Quantity / value thresholds
-
-If eligibility is split across clauses:
-→ Merge into a single, complete requirement.
-
-====================================
-FIELDS TO EXTRACT (STRICT JSON)
-====================================
-
-Tender_Reference (String)
-Issuing_Authority (String)
-Project_Name (String)
-Location (String)
-Estimated_Value (String)
-EMD_Amount (String)
-Tender_Fee (String)
-
-Important_Dates (Object)
-- Extract ALL dates with exact labels as mentioned
-
-Eligibility (Object with these keys):
-  - Min_Turnover (String: Complete criteria with amount, period, financial years)
-  - Experience_Required (String: Complete criteria with years, nature of work)
-  - Other_Eligibility_Criteria (String: Any other qualifying conditions)
-
-Scope_of_Work (String: MAX 200 characters)
-- Use 2-3 bullet points OR one concise sentence
-- Example: "• PSC sleepers for BG • Monoblock & curve types • RDSO spec compliance"
-
-Contract_Period (String)
-
-Payment_Terms (String: MAX 150 characters)
-- 1-2 sentences only
-
-Technical_Specifications (String: MAX 250 characters)
-- KEY points only, not paragraphs
-- Reference detailed clauses if needed
-
-Submission_Method (String)
-Contact_Details (String)
-
-Required_Documents (Array)
-- Extract EVERY required document
-- Include certificates, affidavits, forms, annexures
-
-Executive_Summary (String)
-- 3-5 sentences
-- Cover:
-  - What is being procured
-  - Value & duration
-  - Key eligibility
-  - Submission mode
-
-====================================
-OUTPUT RULES
-====================================
-
-- OUTPUT ONLY VALID JSON
-- NO markdown
-- NO explanations
-- NO comments
-- NO backticks
-- Preserve exact wording from document wherever possible
-
-Search the ENTIRE document before finalizing ANY field.
-    """
-    
-    response = model.generate_content([sample_file, prompt])
-    return clean_and_parse_json(response.text)
+# 3. LLM Analysis (Hybrid Text/File): prompts and calls live in tender_analysis.py
 
-def clean_and_parse_json(text):
-    clean = text.strip()
-    if clean.startswith("```json"): clean = clean[7:]
-    if clean.endswith("```"): clean = clean[:-3]
-    return json.loads(clean)
+# Cache version tag: any edit to the model, either prompt, the page cap or page selection invalidates old entries
+ANALYSIS_CACHE_VERSION = fingerprint(llm.signature(), TEXT_ANALYSIS_PROMPT, FILE_ANALYSIS_PROMPT, f"pages:{EXTRACT_MAX_PAGES}",
+                                     f"budget:{ANALYSIS_CHAR_BUDGET}", repr(PAGE_SIGNALS), repr(PATTERN_SIGNALS))
 
 # Deprecated single function, kept as proxy if needed or removed.
 # We will use the specific ones in the endpoint.
 
 def extract_text_pypdf(file_path): 
-    # Quick helper if the other one has issues
-    import pdfplumber
+    # Quick helper if the other one has issues (all pages, streamed one page at a time)
     text = ""
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
+        text = "".join(page_text for _, page_text in iter_page_texts(file_path))
     except:
         pass
     return text
 
 
 # 4. Helper: PDF Generation
-
-# 4. Helper: PDF Generation
-def generate_pdf_report(data, filename="report.pdf", language='en'):
-    # Use the template image if it exists
-    bg_image_path = "Bidalert template.png"
-    has_bg = os.path.exists(bg_image_path)
-    
-    doc = SimpleDocTemplate(
-        filename, 
-        pagesize=A4, 
-        rightMargin=50, leftMargin=50, 
-        topMargin=120 if has_bg else 30, # Push content down to avoid header
-        bottomMargin=50
-    )
-    
-    story = []
-    styles = getSampleStyleSheet()
-
-    # Define a background function
-    def add_background(canvas, doc):
-        if has_bg:
-            # Draw image to fill the page or as a header/footer
-            # Assuming A4 size: 595.27 x 841.89
-            canvas.drawImage(bg_image_path, 0, 0, width=A4[0], height=A4[1])
-
-    # Styles
-    title_style = ParagraphStyle('CTitle', parent=styles['Heading1'], fontSize=24, textColor=colors.HexColor('#667eea'), alignment=1, spaceAfter=20)
-    sec_style = ParagraphStyle('SecHeader', parent=styles['Heading3'], fontSize=14, textColor=colors.white, backColor=colors.HexColor('#667eea'), borderPadding=6, spaceBefore=15, spaceAfter=10)
-    norm_style = styles["Normal"]
-
-    if not has_bg:
-        story.append(Paragraph(f"Bid Analysis Report", title_style))
-        story.append(Spacer(1, 12))
-
-    # Exec Summary
-    story.append(Paragraph(f"<b>EXECUTIVE SUMMARY</b>", sec_style))
-    story.append(Paragraph(data.get("Executive_Summary", ""), norm_style))
-    story.append(Spacer(1, 10))
-
-    # Helper Table
-    def make_table(d):
-        tdata = []
-        for k, v in d.items():
-            if isinstance(v, list): v = ", ".join(str(x) for x in v)
-            tdata.append([Paragraph(f"<b>{k}</b>", norm_style), Paragraph(str(v), norm_style)])
-        t = Table(tdata, colWidths=[2.2*inch, 4.2*inch])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (0,-1), colors.HexColor('#f8f9fa')),
-            ('INNERGRID', (0,0), (-1,-1), 0.25, colors.grey),
-            ('BOX', (0,0), (-1,-1), 0.25, colors.grey),
-            ('PADDING', (0,0), (-1,-1), 6),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
-        return t
-
-    # Sections
-    story.append(Paragraph("<b>BASIC INFORMATION</b>", sec_style))
-    story.append(make_table({
-        "Reference": data.get("Tender_Reference"),
-        "Authority": data.get("Issuing_Authority"),
-        "Project": data.get("Project_Name")
-    }))
-
-    story.append(Paragraph("<b>FINANCIALS</b>", sec_style))
-    story.append(make_table({
-        "Value": data.get("Estimated_Value"),
-        "EMD": data.get("EMD_Amount"),
-        "Fee": data.get("Tender_Fee")
-    }))
-    
-    story.append(Paragraph("<b>DATES & ELIGIBILITY</b>", sec_style))
-    story.append(make_table({
-        "Submission": data.get("Bid_Submission_Deadline"),
-        "Opening": data.get("Bid_Opening_Date"),
-        "Turnover": data.get("Min_Turnover"),
-        "Experience": data.get("Experience_Required"),
-        "Documents": data.get("Required_Documents")
-    }))
-
-    doc.build(story, onFirstPage=add_background, onLaterPages=add_background)
-    return filename
+# Vector engine (ReportLab) lives in report_pdf.generate_pdf_report; the screenshot engine is below.
+# Runs in the CPU process pool, so only the workers ever import ReportLab
+def render_vector_report(report_data: dict, language: str):
+    from report_pdf import generate_pdf_report
+    return generate_pdf_report(report_data, None, language)
 
 # Optimized Translation Helper
+# The payload is walked once; every non-empty string leaf is recorded with the slot it lives in.
+# Distinct strings are looked up in the translation memory, the misses (one per normalized phrase)
+# go through the shared "translate" pool, whose size is the process-wide cap on translator calls,
+# and results are written back into the same slots.
+def collect_leaves(data):
+    leaves, stack = [], [data]
+    while stack:
+        node = stack.pop()
+        for key, value in (node.items() if isinstance(node, dict) else enumerate(node)):
+            if isinstance(value, (dict, list)):
+                stack.append(value)
+            elif isinstance(value, str) and value.strip():
+                leaves.append((node, key, value))
+    return leaves
+
+GoogleTranslator = None  # deep_translator is imported on first use (benchmarks swap in a stub here)
+
+def translator_class():
+    global GoogleTranslator
+    if GoogleTranslator is None:
+        from deep_translator import GoogleTranslator
+    return GoogleTranslator
+
+def translate_one(text, target_lang):
+    # GoogleTranslator keeps per-call state on the instance, so never share one across threads
+    try:
+        # Limit length to avoid timeouts on large blocks
+        return translator_class()(source='auto', target=target_lang).translate(text[:4500])
+    except Exception as exc:
+        print(f"Translation failed for {text[:40]!r}: {exc}")
+        return None
+
+def plan_translation(leaves, target_lang):
+    unique = {text for _, _, text in leaves}
+    translations = translation_memory.get_many(unique, target_lang)
+    # Whitespace variants of the same phrase share one translator call
+    pending = {}
+    for text in unique:
+        if text not in translations:
+            pending.setdefault(normalize_phrase(text), []).append(text)
+    return translations, pending
+
+def write_back(leaves, translations, pending, results, target_lang):
+    fresh = {src: dst for src, dst in zip(pending, results) if dst}
+    translation_memory.put_many(fresh, target_lang)
+    for key, originals in pending.items():
+        if key in fresh:
+            for text in originals:
+                translations[text] = fresh[key]
+    # Anything that failed to translate keeps the original text
+    for node, key, text in leaves:
+        node[key] = translations.get(text, text)
+
 def recursive_translate(data, target_lang):
-    translator = GoogleTranslator(source='auto', target=target_lang)
-    
-    # Process dictionary values in parallel to speed up
-    if isinstance(data, dict):
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # Create a map of future -> key
-            future_to_key = {
-                executor.submit(recursive_translate, v, target_lang): k 
-                for k, v in data.items()
-            }
-            results = {}
-            for future in as_completed(future_to_key):
-                key = future_to_key[future]
-                try:
-                    results[key] = future.result()
-                except Exception as exc:
-                    print(f'{key} translation generated an exception: {exc}')
-                    results[key] = data[key] # Fallback to original
-            return results
-
-    elif isinstance(data, list):
-         # Also parallelize list items if they are strings
-         with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(recursive_translate, item, target_lang) for item in data]
-            return [f.result() for f in futures]
-            
-    elif isinstance(data, str) and data.strip():
-        try:
-             # Limit length to avoid timeouts on large blocks
-             return translator.translate(data[:4500])
-        except:
-             return data
-    else:
-        return data
+    # Synchronous entry point (scripts, benchmarks). Translates `data` in place and returns it.
+    box = [data]
+    leaves = collect_leaves(box)
+    translations, pending = plan_translation(leaves, target_lang)
+    futures = [submit_io("translate", translate_one, text, target_lang) for text in pending]
+    write_back(leaves, translations, pending, [f.result() for f in futures], target_lang)
+    return box[0]
+
+async def translate_payload(data, target_lang):
+    # Async entry point for /api/translate: same pipeline, awaited on the shared pool
+    box = [data]
+    leaves = collect_leaves(box)
+    translations, pending = await run_io("translate", plan_translation, leaves, target_lang)
+    results = await asyncio.gather(*(run_io("translate", translate_one, text, target_lang) for text in pending))
+    await run_io("translate", write_back, leaves, translations, pending, results, target_lang)
+    return box[0]
+
+def resolve_report_data(data: dict):
+    # Request body carries either the analysis itself ("data") or a doc_id from /api/analyze
+    report_data = data.get("data")
+    if report_data:
+        return report_data
+    doc_id = data.get("doc_id")
+    if doc_id:
+        report_data = document_store.get_analysis(doc_id)
+        if report_data is None:
+            raise HTTPException(status_code=404, detail="Document session expired. Re-upload the document.")
+        report_data["doc_id"] = doc_id
+    return report_data
 
 @app.post("/api/translate")
 async def translate_text(
-    data: dict, # { "data": {...}, "target_lang": "hi" }
+    data: dict, # { "data": {...} | "doc_id": "...", "target_lang": "hi" }
 ):
     try:
-        input_data = data.get("data")
+        input_data = resolve_report_data(data)
         target_lang = data.get("target_lang", "hi")
         
         if not input_data:
             return {"translated_data": None}
+
+        # Session/internal fields (doc_id, _full_text_context) pass through untranslated
+        hidden = {}
+        if isinstance(input_data, dict):
+            hidden = {k: v for k, v in input_data.items() if k == "doc_id" or k.startswith("_")}
+            input_data = {k: v for k, v in input_data.items() if k not in hidden}
             
         # Standardize language codes if needed, though deep-translator takes names often too.
         # Minimal map for user convenience
@@ -589,386 +810,194 @@ async def translate_text(
         }
         code = lang_map.get(target_lang, target_lang.lower())
         
-        translated_data = recursive_translate(input_data, code)
+        with track_stage("translate"):
+            translated_data = await translate_payload(input_data, code)
+        if hidden:
+            translated_data.update(hidden)
         
         return {"translated_data": translated_data}
+    except HTTPException:
+        raise
     except Exception as e:
          print(f"Translation Error: {e}")
          raise HTTPException(status_code=500, detail=str(e))
 
-import base64
+@metrics.register_collector
+def cache_metrics():
+    caches = {
+        ("analysis",): analysis_cache, ("reports",): report_cache,
+        ("translation",): translation_memory, ("ask_index",): ask_indexes,
+    }
+    hits = {name: c.hits for name, c in caches.items()}
+    misses = {name: c.misses for name, c in caches.items()}
+    ratio = {name: (hits[name] / (hits[name] + misses[name]) if hits[name] + misses[name] else 0.0) for name in caches}
+    return [
+        ("bidanalyzer_cache_hits_total", "counter", "Cache lookups that hit.", ("cache",), hits),
+        ("bidanalyzer_cache_misses_total", "counter", "Cache lookups that missed.", ("cache",), misses),
+        ("bidanalyzer_cache_hit_ratio", "gauge", "Hits / lookups since start.", ("cache",), ratio),
+        ("bidanalyzer_browser_pool_browsers", "gauge", "Warm Chromium instances.", (), {(): browser_pool.stats()["browsers"]}),
+    ]
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/profiles/{profile_id}")
+def get_profile(profile_id: str, meta: bool = False, x_profile_token: Optional[str] = Header(None), profile: Optional[str] = None):
+    # Collapsed stacks (open in speedscope.app or flamegraph.pl), or ?meta=true for the sidecar
+    if not profile_token_ok(x_profile_token or profile):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the profile token is wrong.")
+    path = profile_store.path(profile_id)
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if meta:
+        return profile_store.meta(profile_id)
+    return FileResponse(path, media_type="text/plain", filename=f"profile-{profile_id}.collapsed")
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    return {"analysis": analysis_cache.stats(), "version": ANALYSIS_CACHE_VERSION, "translation": translation_memory.stats(),
+            "reports": report_cache.stats(), "browser_pool": browser_pool.stats(), "llm": llm.stats()}
+
+
+
+def spawn_screenshot(html_content: str):
+    # Legacy render: one short-lived Chromium per report via Html2Image. Returns the PNG bytes.
+    # Html2Image only works through files, so each render gets its own temp dir, removed after.
+    from html2image import Html2Image
+    with tempfile.TemporaryDirectory(prefix="report-") as temp_dir:
+        # Use html2image with CRITICAL flags for Docker/Linux
+        # Set a very large height to capture full content (approx 4 pages worth)
+        hti = Html2Image(
+            output_path=temp_dir,
+            temp_path=temp_dir,
+            size=(1240, 7016), # 4 * 1754 (A4 Height at ~96dpi or similar scale)
+            custom_flags=['--no-sandbox', '--disable-gpu', '--headless', '--disable-dev-shm-usage']
+        )
+        hti.screenshot(html_str=html_content, save_as="report.png")
+        png_path = os.path.join(temp_dir, "report.png")
+        if not os.path.exists(png_path):
+            raise RuntimeError("HTML render failed: PNG snapshot not created.")
+        with open(png_path, "rb") as f:
+            return f.read()
 
-def get_base64_image(image_path):
+async def render_report_png(html_content: str):
+    if browser_pool.enabled:
+        try:
+            return await browser_pool.render(html_content)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Report render timed out after {browser_pool.render_timeout:g}s")  # would wedge a spawned browser too
+        except Exception as e:
+            print(f"Browser pool render failed, spawning a browser instead: {e}")
+    return await run_io("render", spawn_screenshot, html_content)
+
+# Runs in the CPU process pool: keep it module-level and free of request objects
+def slice_screenshot_to_pdf(png, output=None):
+    # Process tall screenshot into Multi-Page PDF
+    # png: file path or PNG bytes; output: path or file object, None returns the PDF bytes
+    from PIL import Image
+    from page_slicing import A4_WIDTH, A4_HEIGHT, plan_page_breaks
+    image = Image.open(io.BytesIO(png) if isinstance(png, bytes) else png)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    # SMART SLICING: break at whitespace / table borders, skip blank pages (see page_slicing)
+    pages = []
+    for top, bottom in plan_page_breaks(image):
+        page = image.crop((0, top, A4_WIDTH, bottom))
+        # Create PDF friendly page (White Background A4)
+        pdf_page = Image.new("RGB", (A4_WIDTH, A4_HEIGHT), (255, 255, 255))
+        pdf_page.paste(page, (0, 0)) # Paste at top
+        pages.append(pdf_page)
+
+    if not pages:
+        raise ValueError("PDF conversion failed: No pages generated.")
+
+    # Save all pages to PDF
+    # First page is the "base", others are appended
+    out = output if output is not None else io.BytesIO()
+    pages[0].save(
+        out, 
+        "PDF", 
+        resolution=100.0, 
+        save_all=True, 
+        append_images=pages[1:]
+    )
+    if output is None:
+        return out.getvalue()
+    return len(pages)
+
+def pdf_response(pdf_bytes: bytes, etag: str = None):
+    # Reports are built in memory; send them as one body (Content-Length set, single write)
+    headers = {"Content-Disposition": 'attachment; filename="Bid_Analysis_Report.pdf"'}
+    if etag:
+        headers["ETag"] = etag
+    return Response(content=pdf_bytes, media_type='application/pdf', headers=headers)
+
+def report_template_version():
+    # Layout version + background template file, so replacing the PNG invalidates cached reports
     try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode('utf-8')
-    except:
-        return ""
-
-
-@app.get("/health")
-def health_check():
-    return {"status": "ok", "service": "BidAnalyzer Pro API"}
-
-
-
-def generate_formatted_html(data):
-    # Load Template
-    bg_base64 = get_base64_image("Bidalert template.png")
-    
-    # Build background CSS rule
-    if bg_base64:
-        bg_rule = "background-image: url('data:image/png;base64," + bg_base64 + "');"
-    else:
-        bg_rule = "background-color: #ffffff;"
-    
-    # CSS - Split into parts to avoid f-string issues
-    css_part1 = """
-    <style>
-        body { 
-            font-family: 'Segoe UI', Tahoma, sans-serif; 
-            margin: 0; padding: 0;
-            background-color: #ffffff;
-        }
-        
-        .page-container {
-            position: relative;
-            width: 1240px;
-            min-height: 1754px; 
-    """
-    
-    css_part2 = """
-            background-repeat: no-repeat;
-            background-size: 1240px 1754px; /* A4 dimensions */
-            box-sizing: border-box;
-            padding: 100px 80px 60px 80px; 
-            display: flex;
-            flex-direction: column;
-        }
-
-        h1 { 
-            text-align: center; 
-            color: #1a202c; 
-            font-size: 3.5rem;
-            margin: 0 0 40px 0; 
-            font-weight: 900;
-            text-transform: uppercase; 
-            letter-spacing: 2px;
-            text-shadow: 2px 2px 4px rgba(255,255,255,1);
-        }
-        
-        .exec-summary { 
-            background: rgba(255, 255, 255, 0.95); 
-            padding: 30px 35px; 
-            border-radius: 12px; 
-            margin-bottom: 35px; 
-            border-left: 8px solid #4c51bf; 
-            box-shadow: 0 4px 6px rgba(0,0,0,0.08);
-        }
-        .exec-summary h4 { color: #4c51bf; margin: 0 0 15px 0; font-size: 1.8rem; border-bottom: 2px solid #e2e8f0; padding-bottom: 10px; }
-        .exec-summary p { font-size: 1.4rem; line-height: 1.6; color: #1a202c; font-weight: 500; margin: 0; }
-
-        .section-header { 
-            color: #2c5282; 
-            font-size: 1.8rem; 
-            font-weight: 800; 
-            margin: 25px 0 15px 0; 
-            border-bottom: 3px solid #aecdbf; 
-            padding-bottom: 8px; 
-            text-transform: uppercase;
-            page-break-after: avoid;
-        }
-        
-        table { 
-            width: 100%; 
-            border-collapse: separate; 
-            border-spacing: 0; 
-            margin-bottom: 20px; 
-            font-size: 1.4rem; 
-            border-radius: 8px; 
-            overflow: hidden;
-            page-break-inside: avoid;
-        }
-        th { background: #2d3748; color: white; padding: 18px 20px; text-align: left; font-weight: 700; width: 35%; border-bottom: 2px solid #ed8936; }
-        td { background: rgba(255, 255, 255, 0.95); color: #000; padding: 18px 20px; border-bottom: 2px solid #e2e8f0; font-weight: 500; }
-        tr:last-child td { border-bottom: none; }
-        
-        /* Force page break before certain sections if needed */
-        .page-break-before {
-            page-break-before: always;
-            margin-top: 0;
-        }
-    </style>
-    """
-    
-    # Combine CSS
-    full_css = css_part1 + bg_rule + css_part2
-    
-    # Helper function to check if value should be shown
-    def should_show_value(val):
-        if not val or val is None:
-            return False
-        val_str = str(val).strip().lower()
-        hide_values = ['not specified', 'n/a', 'null', 'undefined', 'none']
-        return not any(hide in val_str for hide in hide_values)
-    
-    # Helper to build table rows (only if value is valid)
-    def make_row(label, value):
-        if should_show_value(value):
-            return f"<tr><td>{label}</td><td>{value}</td></tr>"
-        return ""
-    
-    # Build dates table dynamically (with filtering)
-    dates_rows = ""
-    if 'Important_Dates' in data and isinstance(data['Important_Dates'], dict):
-        for date_label, date_value in data['Important_Dates'].items():
-            if should_show_value(date_value):
-                dates_rows += f"<tr><td>{date_label}</td><td>{date_value}</td></tr>"
-    
-    # Build HTML content
-    html_content = f"""
-    <html>
-    <head>{full_css}</head>
-    <body>
-        <div class="page-container">
-            <h1>Bid Analysis Report</h1>
-            
-            <div class="exec-summary">
-                <h4>Executive Summary</h4>
-                <p>{data.get('Executive_Summary', 'N/A')}</p>
-            </div>
-
-            <div class="section-header">Basic Information</div>
-            <table>
-                <tr><th>Field</th><th>Value</th></tr>
-                {make_row('Tender Reference', data.get('Tender_Reference', ''))}
-                {make_row('Issuing Authority', data.get('Issuing_Authority', ''))}
-                {make_row('Project Name', data.get('Project_Name', ''))}
-                {make_row('Location', data.get('Location', ''))}
-            </table>
-
-            <div class="section-header">Project Details</div>
-            <table>
-                <tr><th>Field</th><th>Value</th></tr>
-                {make_row('Scope of Work', data.get('Scope_of_Work', ''))}
-                {make_row('Contract Period', data.get('Contract_Period', ''))}
-                {make_row('Technical Specifications', data.get('Technical_Specifications', ''))}
-            </table>
-
-            <div class="section-header">Financials</div>
-            <table style="margin-bottom: 60px;">
-                <tr><th>Field</th><th>Value</th></tr>
-                {make_row('Estimated Value', data.get('Estimated_Value', ''))}
-                {make_row('EMD Amount', data.get('EMD_Amount', ''))}
-                {make_row('Tender Fee', data.get('Tender_Fee', ''))}
-                {make_row('Payment Terms', data.get('Payment_Terms', ''))}
-            </table>
-
-            <div class="section-header">Important Dates</div>
-            <table style="margin-bottom: 80px;">
-                <tr><th>Field</th><th>Value</th></tr>
-                {dates_rows}
-            </table>
-
-            <div class="section-header">Eligibility Criteria</div>
-            <table style="margin-bottom: 60px;">
-                <tr><th>Field</th><th>Value</th></tr>
-                {make_row('Min Turnover', data.get('Eligibility', {}).get('Min_Turnover') if isinstance(data.get('Eligibility'), dict) else data.get('Min_Turnover', ''))}
-                {make_row('Experience Required', data.get('Eligibility', {}).get('Experience_Required') if isinstance(data.get('Eligibility'), dict) else data.get('Experience_Required', ''))}
-                {make_row('Other Criteria', data.get('Eligibility', {}).get('Other_Eligibility_Criteria', ''))}
-                {make_row('Required Docs', str(data.get('Required_Documents', ''))[:400] + '...' if data.get('Required_Documents') else '')}
-            </table>
-
-            <div class="section-header">Submission Information</div>
-            <table>
-                <tr><th>Field</th><th>Value</th></tr>
-                {make_row('Submission Method', data.get('Submission_Method', ''))}
-                {make_row('Contact Details', data.get('Contact_Details', ''))}
-            </table>
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html_content
+        st = os.stat(TEMPLATE_IMAGE)
+        template = f"{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        template = "no-template"
+    return f"{REPORT_LAYOUT_VERSION}:{template}"
+
+def report_cache_key(report_data: dict, engine: str, language: str):
+    canonical = json.dumps(report_data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return fingerprint(report_template_version(), engine, language, canonical)
+
+def etag_matches(if_none_match: Optional[str], etag: str):
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
 
 @app.post("/api/generate-pdf")
 async def generate_pdf(
-    data: dict, # { "data": {...} }
+    data: dict, # { "data": {...} } or { "doc_id": "..." }, optional "engine": "screenshot" | "vector"
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
-        report_data = data.get("data")
+        report_data = resolve_report_data(data)
         if not report_data:
              raise HTTPException(status_code=400, detail="No data provided for report generation")
-             
-        # Generate HTML content
-        html_content = generate_formatted_html(report_data)
-        
-        # Prepare filenames in /tmp (writable in HF Spaces)
-        temp_dir = "/tmp"
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir, exist_ok=True)
-            
-        timestamp = int(time.time())
-        output_pdf = f"Report_{timestamp}.pdf"
-        output_path = os.path.join(temp_dir, output_pdf)
-        
-        # Use html2image with CRITICAL flags for Docker/Linux
-        # Set a very large height to capture full content (approx 4 pages worth)
-        hti = Html2Image(
-            output_path=temp_dir, 
-            temp_path=temp_dir, 
-            size=(1240, 7016), # 4 * 1754 (A4 Height at ~96dpi or similar scale)
-            custom_flags=['--no-sandbox', '--disable-gpu', '--headless', '--disable-dev-shm-usage']
-        )
-        
-        # 1. Screenshot to PNG (Capture full scroll)
-        output_png = f"Report_{timestamp}.png"
-        png_path = os.path.join(temp_dir, output_png)
-        
-        hti.screenshot(html_str=html_content, save_as=output_png)
-        
-        if not os.path.exists(png_path):
-             raise HTTPException(status_code=500, detail="HTML render failed: PNG snapshot not created.")
 
-        # 2. Process image into Multi-Page PDF
-        image = Image.open(png_path)
-        if image.mode == 'RGBA':
-            image = image.convert('RGB')
+        engine = (data.get("engine") or REPORT_ENGINE).lower()
+        if engine not in REPORT_ENGINES:
+             raise HTTPException(status_code=400, detail=f"Unknown report engine '{engine}'. Use one of: {', '.join(REPORT_ENGINES)}")
+
+        # Repeat downloads of the same report: 304 for the client's copy, else a cache file read
+        language = data.get("language", "en")
+        cache_key = report_cache_key(report_data, engine, language)
+        etag = f'"{cache_key}"'
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        cached = await run_io("storage", report_cache.get, cache_key)
+        if cached is not None:
+            return pdf_response(cached, etag)
+
+        if engine == "vector":
+            # Searchable vector PDF, no browser involved
+            with track_stage("report_vector"):
+                pdf_bytes = await run_cpu(render_vector_report, report_data, language)
+        else:
+            # Generate HTML content
+            html_content = generate_formatted_html(report_data)
 
-        A4_WIDTH = 1240
-        A4_HEIGHT = 1754
-        
-        img_width, img_height = image.size
-        pages = []
-        
-        current_y = 0
-        
-        while current_y < img_height:
-            # Determine maximum possible cut point (bottom of A4)
-            # But don't just take A4, looking for a smart break within the last 30% of the page
-            limit_y = min(current_y + A4_HEIGHT, img_height)
-            
-            # If we are near the end (less than half a page left), just take it all if it fits
-            # Or if it fits exactly
-            if limit_y == img_height:
-                box = (0, current_y, A4_WIDTH, limit_y)
-                page = image.crop(box)
-                
-                # Content Check: Is this page empty?
-                # Convert to grayscale, invert, getbbox to find non-white pixels
-                # Or just iterate a few pixels.
-                # Fast check: getbbox() returns None if image is all black (after inverting white to black)
-                # But easiest is:
-                gray = page.convert("L")
-                # Counting whitespace is slow, let's use getbbox on inverted
-                # If page is white, inverted is black. getbbox on black returns valid box ONLY if there are non-black pixels.
-                inverted = ImageOps.invert(gray)
-                if inverted.getbbox():
-                     # Pad to A4
-                    pdf_page = Image.new("RGB", (A4_WIDTH, A4_HEIGHT), (255, 255, 255))
-                    pdf_page.paste(page, (0, 0))
-                    pages.append(pdf_page)
-                break
+            # 1. Screenshot to PNG (warm pooled browser, rendered from the HTML string in memory)
+            with track_stage("report_screenshot"):
+                png = await render_report_png(html_content)
 
-            # SMART SLICING: Scan upwards from limit_y to find a safe break
-            # We prioritize table borders (grey lines) or whitespace
-            
-            found_cut = -1
-            scan_start = limit_y
-            scan_end = max(current_y + 100, limit_y - 600) # Scan up to 600px upwards
-            
-            # We seek a row that is "uniform". 
-            # Uniform White = Best
-            # Uniform Grey (Border) = Good (Cut before it)
-            
-            for test_y in range(scan_start, scan_end, -2): # Scan upwards
-                
-                # Check row uniformity
-                # Sample 20 points across the row
-                row_pixels = []
-                is_uniform = True
-                first_pixel = None
-                
-                # Fast sample (center 70% to ignore side backgrounds)
-                # A4 Width is 1240. Center is ~620. 
-                # Scan from 200 to 1040.
-                for x in range(200, 1040, 20):
-                    p = image.getpixel((x, test_y))
-                    b = sum(p) 
-                    
-                    if first_pixel is None:
-                        first_pixel = b
-                    
-                    # Allow slightly more noise for text vs white
-                    if abs(b - first_pixel) > 40:
-                        is_uniform = False
-                        break
-                
-                if is_uniform:
-                    # We found a uniform row in the center!
-                    # Is it white/light? (Brightness > 700)
-                    if first_pixel > 650:
-                        found_cut = test_y
-                        break
-                    
-                    # Is it a table border? (Grey, Brightness around 500-700 usually, or darker)
-                    # If it's a border, we might want to ensure we cut BEFORE it if we are scanning up, 
-                    # or allow it to be the bottom of the previous page.
-                    # Let's say any uniform row is a potential cut.
-                    found_cut = test_y
-            
-            # Decide where to cut
-            if found_cut != -1:
-                cut_y = found_cut
-            else:
-                cut_y = limit_y # Fallback to hard cut
-            
-            # Perform Crop
-            box = (0, current_y, A4_WIDTH, cut_y)
-            page = image.crop(box)
-            
-            # Content Check before adding
-            gray = page.convert("L")
-            inverted = ImageOps.invert(gray)
-            
-            if inverted.getbbox():
-                # Create PDF friendly page (White Background A4)
-                pdf_page = Image.new("RGB", (A4_WIDTH, A4_HEIGHT), (255, 255, 255))
-                pdf_page.paste(page, (0, 0)) # Paste at top
-                pages.append(pdf_page)
-            else:
-                 # If this page was empty, likely the rest is empty too?
-                 # Don't add, and maybe break?
-                 # But sticking to logic: just don't add.
-                 pass
-            
-            # Move current_y to the cut point
-            current_y = cut_y
-
-        if not pages:
-            raise HTTPException(status_code=500, detail="PDF conversion failed: No pages generated.")
-
-        # Save all pages to PDF
-        # First page is the "base", others are appended
-        pages[0].save(
-            output_path, 
-            "PDF", 
-            resolution=100.0, 
-            save_all=True, 
-            append_images=pages[1:]
-        )
-        
-        if not os.path.exists(output_path):
-             raise HTTPException(status_code=500, detail="PDF conversion failed.")
-
-        # Return the file
-        return FileResponse(
-            output_path, 
-            media_type='application/pdf', 
-            filename="Bid_Analysis_Report.pdf"
-        )
+            # 2. Process image into Multi-Page PDF (CPU heavy, off the event loop), all in memory
+            with track_stage("report_slicing"):
+                pdf_bytes = await run_cpu(slice_screenshot_to_pdf, png)
+
+        await run_io("storage", report_cache.put, cache_key, pdf_bytes)
+        return pdf_response(pdf_bytes, etag)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"PDF Gen Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
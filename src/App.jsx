@@ -26,6 +26,9 @@ const API_BASE_URL = import.meta.env.PROD
 
 console.log('API Base URL:', API_BASE_URL);
 
+// The full document text stays on the server (doc_id session); never post it back
+const withoutContext = ({ _full_text_context, ...rest }) => rest;
+
 function App() {
   const [view, setView] = useState('home'); // 'home' | 'result'
   const [apiKey, setApiKey] = useState('');
@@ -104,11 +107,11 @@ function App() {
       const res = await fetch(`${API_BASE_URL}/translate`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ data: analysisData, target_lang: targetLang })
+        body: JSON.stringify({ data: withoutContext(analysisData), target_lang: targetLang })
       });
       const result = await res.json();
       if (result.translated_data) {
-        setAnalysisData(result.translated_data);
+        setAnalysisData({ ...result.translated_data, _full_text_context: analysisData._full_text_context });
       }
     } catch (e) {
       alert("Translation failed: " + e.message);
@@ -128,7 +131,7 @@ function App() {
       const res = await fetch(`${API_BASE_URL}/generate-pdf`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ data: analysisData })
+        body: JSON.stringify({ data: withoutContext(analysisData) })
       });
 
       if (res.ok) {
@@ -535,14 +538,19 @@ const ResultsView = ({ data, question, setQuestion, history, setHistory, apiKey
 
     try {
       // Use full text context if available (better for Q&A), else fallback to JSON summary
-      const contextToSend = data._full_text_context || JSON.stringify(data);
-
-      const response = await fetch(`${API_BASE_URL}/ask`, {
+      const contextToSend = data._full_text_context || JSON.stringify(withoutContext(data));
+      const ask = (payload) => fetch(`${API_BASE_URL}/ask`, {
         method: 'POST',
         headers,
-        body: JSON.stringify({ question: question, context: contextToSend })
+        body: JSON.stringify({ question: question, ...payload })
       });
 
+      // Server-side session first; only re-send the text if it has expired
+      let response = data.doc_id ? await ask({ doc_id: data.doc_id }) : await ask({ context: contextToSend });
+      if (response.status === 404 && data.doc_id) {
+        response = await ask({ context: contextToSend });
+      }
+
       const ansData = await response.json();
       setHistory(prev => [...prev, { type: 'answer', content: ansData.answer || "No answer found." }]);
 
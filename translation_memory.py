@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+import threading
+
+# Persistent translation memory: (normalized source text, target language) -> translation.
+# Tender analyses repeat the same short phrases constantly ("Not Specified", "Online",
+# document names), so most strings never need to reach the translator twice.
+
+EVICT_SLACK = 0.1  # eviction trims to 90% of max_entries, so COUNT(*) runs once per ~10% of capacity inserted
+
+
+def normalize(text: str):
+    # Collapse runs of spaces/tabs and trim, but keep line structure (bullet lists)
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines())
+
+
+class TranslationMemory:
+    def __init__(self, db_path: str, max_entries: int):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tm (lang TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+            "last_used REAL NOT NULL, PRIMARY KEY (lang, source))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm (last_used)")
+        # Recency bumps are frequent and losing a few on a crash is harmless
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Upper bound on the row count (INSERT OR REPLACE may overwrite): only when it passes
+        # max_entries is the table counted and trimmed
+        self._rows = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+
+    def get_many(self, texts, lang: str):
+        """Returns {text: translation} for every text already in memory; bumps their recency."""
+        found = {}
+        keys = {}
+        for text in texts:
+            keys.setdefault(normalize(text), []).append(text)
+        now = time.time()
+        used = []
+        with self._lock:
+            for key, originals in keys.items():
+                row = self._db.execute("SELECT target FROM tm WHERE lang = ? AND source = ?", (lang, key)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                used.append((now, lang, key))
+                for original in originals:
+                    found[original] = row[0]
+            if used:
+                with self._db:
+                    self._db.execute("BEGIN")
+                    self._db.executemany("UPDATE tm SET last_used = ? WHERE lang = ? AND source = ?", used)
+        return found
+
+    def put_many(self, pairs, lang: str):
+        """pairs: {source text: translation}."""
+        if not pairs:
+            return
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO tm (lang, source, target, last_used) VALUES (?, ?, ?, ?)",
+                [(lang, normalize(src), dst, now) for src, dst in pairs.items()],
+            )
+            self._rows += len(pairs)
+            if self._rows > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+        if count > self.max_entries:
+            excess = count - int(self.max_entries * (1 - EVICT_SLACK))
+            self._db.execute(
+                "DELETE FROM tm WHERE rowid IN (SELECT rowid FROM tm ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+            count -= excess
+        self._rows = count
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }